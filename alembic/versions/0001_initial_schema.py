@@ -0,0 +1,95 @@
+"""initial schema
+
+Tables as created by create_all() in the original release, before stats and
+compressed payloads. Databases without a version table that don't match the
+current models are stamped at this revision instead of running it.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=True),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    
+    op.create_table('crawl_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('target_urls', sa.JSON(), nullable=True),
+    sa.Column('extraction_rules', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('scheduled_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_crawl_jobs_id', 'crawl_jobs', ['id'], unique=False)
+    op.create_index('ix_crawl_jobs_name', 'crawl_jobs', ['name'], unique=False)
+    
+    op.create_table('reports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('crawl_job_ids', sa.JSON(), nullable=True),
+    sa.Column('report_data', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reports_id', 'reports', ['id'], unique=False)
+    
+    op.create_table('extracted_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('crawl_job_id', sa.Integer(), nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('extracted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_extracted_data_id', 'extracted_data', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_extracted_data_id', table_name='extracted_data')
+    
+    op.drop_table('extracted_data')
+    op.drop_index('ix_reports_id', table_name='reports')
+    
+    op.drop_table('reports')
+    op.drop_index('ix_crawl_jobs_name', table_name='crawl_jobs')
+    op.drop_index('ix_crawl_jobs_id', table_name='crawl_jobs')
+    
+    op.drop_table('crawl_jobs')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    
+    op.drop_table('users')
\ No newline at end of file
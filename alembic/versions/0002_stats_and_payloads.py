@@ -0,0 +1,67 @@
+"""stats and payloads
+
+Per-job running stats, compressed payload storage and its dictionaries.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:15:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('crawl_job_stats',
+    sa.Column('crawl_job_id', sa.Integer(), nullable=False),
+    sa.Column('urls_crawled', sa.Integer(), nullable=True),
+    sa.Column('successful_extractions', sa.Integer(), nullable=True),
+    sa.Column('failed_extractions', sa.Integer(), nullable=True),
+    sa.Column('bytes_downloaded', sa.BigInteger(), nullable=True),
+    sa.Column('elapsed_ms_total', sa.BigInteger(), nullable=True),
+    sa.Column('field_fill_counts', sa.JSON(), nullable=True),
+    sa.Column('data_version', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.PrimaryKeyConstraint('crawl_job_id')
+    )
+    op.create_table('payload_dictionaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('crawl_job_id', sa.Integer(), nullable=True),
+    sa.Column('codec', sa.String(), nullable=True),
+    sa.Column('dictionary', sa.LargeBinary(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_payload_dictionaries_id', 'payload_dictionaries', ['id'], unique=False)
+    op.add_column('crawl_jobs', sa.Column('storage_format', sa.String(), nullable=True))
+    
+    # Batch mode, so SQLite gets the foreign key by copying the table
+    with op.batch_alter_table('extracted_data', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('payload', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('payload_codec', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('payload_dictionary_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_extracted_data_payload_dictionary_id', 'payload_dictionaries', ['payload_dictionary_id'], ['id']
+        )
+
+def downgrade() -> None:
+    with op.batch_alter_table('extracted_data', schema=None) as batch_op:
+        batch_op.drop_column('payload_dictionary_id')
+        batch_op.drop_column('payload_codec')
+        batch_op.drop_column('payload')
+    
+    with op.batch_alter_table('crawl_jobs', schema=None) as batch_op:
+        batch_op.drop_column('storage_format')
+    
+    op.drop_index('ix_payload_dictionaries_id', table_name='payload_dictionaries')
+    op.drop_table('payload_dictionaries')
+    op.drop_table('crawl_job_stats')
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""query indexes
+
+Composite indexes for the access paths of the API: job and report listings
+filter by owner and page by id, and every read, export and delete of
+extracted data goes through (crawl_job_id, id).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_index('ix_crawl_jobs_user_id_id', 'crawl_jobs', ['user_id', 'id'], unique=False)
+    op.create_index('ix_crawl_jobs_status', 'crawl_jobs', ['status'], unique=False)
+    op.create_index('ix_extracted_data_crawl_job_id_id', 'extracted_data', ['crawl_job_id', 'id'], unique=False)
+    op.create_index(
+        'ix_payload_dictionaries_crawl_job_id_codec', 'payload_dictionaries', ['crawl_job_id', 'codec'], unique=False
+    )
+    op.create_index('ix_reports_user_id_id', 'reports', ['user_id', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_user_id_id', table_name='reports')
+    op.drop_index('ix_payload_dictionaries_crawl_job_id_codec', table_name='payload_dictionaries')
+    op.drop_index('ix_extracted_data_crawl_job_id_id', table_name='extracted_data')
+    op.drop_index('ix_crawl_jobs_status', table_name='crawl_jobs')
+    op.drop_index('ix_crawl_jobs_user_id_id', table_name='crawl_jobs')
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""fetch timings
+
+Per-stage fetch timings of each extracted row, in a side table so the
+extracted_data rows stay narrow.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 03:43:58
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('fetch_timings',
+    sa.Column('extracted_data_id', sa.Integer(), nullable=False),
+    sa.Column('crawl_job_id', sa.Integer(), nullable=True),
+    sa.Column('host', sa.String(), nullable=True),
+    sa.Column('dns_us', sa.Integer(), nullable=True),
+    sa.Column('connect_us', sa.Integer(), nullable=True),
+    sa.Column('first_byte_us', sa.Integer(), nullable=True),
+    sa.Column('body_us', sa.Integer(), nullable=True),
+    sa.Column('decode_us', sa.Integer(), nullable=True),
+    sa.Column('parse_us', sa.Integer(), nullable=True),
+    sa.Column('extract_us', sa.Integer(), nullable=True),
+    sa.Column('db_us', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.ForeignKeyConstraint(['extracted_data_id'], ['extracted_data.id'], ),
+    sa.PrimaryKeyConstraint('extracted_data_id')
+    )
+    op.create_index('ix_fetch_timings_crawl_job_id_host', 'fetch_timings', ['crawl_job_id', 'host'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_fetch_timings_crawl_job_id_host', table_name='fetch_timings')
+
+    op.drop_table('fetch_timings')
\ No newline at end of file
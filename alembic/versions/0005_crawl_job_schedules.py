@@ -0,0 +1,31 @@
+"""crawl job schedules
+
+Cron schedules for recurring jobs, and the next run time the scheduler
+loads upcoming runs by.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 03:55:31
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('crawl_jobs', sa.Column('schedule', sa.String(), nullable=True))
+    op.add_column('crawl_jobs', sa.Column('next_run_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_crawl_jobs_next_run_at', 'crawl_jobs', ['next_run_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_crawl_jobs_next_run_at', table_name='crawl_jobs')
+    with op.batch_alter_table('crawl_jobs', schema=None) as batch_op:
+        batch_op.drop_column('next_run_at')
+        batch_op.drop_column('schedule')
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""crawl job priority
+
+Per-job priority, weighting a job's share of its owner's crawl slots.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 03:58:21
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('crawl_jobs', sa.Column('priority', sa.Integer(), server_default='1', nullable=False))
+
+def downgrade() -> None:
+    with op.batch_alter_table('crawl_jobs', schema=None) as batch_op:
+        batch_op.drop_column('priority')
\ No newline at end of file
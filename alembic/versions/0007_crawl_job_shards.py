@@ -0,0 +1,43 @@
+"""crawl job shards
+
+Shards of jobs fanned out to Celery workers; the job's status is
+aggregated from them.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 04:02:27
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('crawl_job_shards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('crawl_job_id', sa.Integer(), nullable=True),
+    sa.Column('shard_index', sa.Integer(), nullable=True),
+    sa.Column('urls', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('urls_crawled', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_crawl_job_shards_crawl_job_id_status', 'crawl_job_shards', ['crawl_job_id', 'status'], unique=False)
+    op.create_index('ix_crawl_job_shards_id', 'crawl_job_shards', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_crawl_job_shards_id', table_name='crawl_job_shards')
+    op.drop_index('ix_crawl_job_shards_crawl_job_id_status', table_name='crawl_job_shards')
+
+    op.drop_table('crawl_job_shards')
\ No newline at end of file
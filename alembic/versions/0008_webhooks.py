@@ -0,0 +1,66 @@
+"""webhooks
+
+Webhook targets and the outbox of their deliveries
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 04:16:32
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('webhooks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('crawl_job_id', sa.Integer(), nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('secret', sa.String(), nullable=True),
+    sa.Column('events', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhooks_crawl_job_id', 'webhooks', ['crawl_job_id'], unique=False)
+    op.create_index('ix_webhooks_id', 'webhooks', ['id'], unique=False)
+    op.create_index('ix_webhooks_user_id_id', 'webhooks', ['user_id', 'id'], unique=False)
+
+    op.create_table('webhook_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('webhook_id', sa.Integer(), nullable=True),
+    sa.Column('event_type', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['webhook_id'], ['webhooks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhook_deliveries_id', 'webhook_deliveries', ['id'], unique=False)
+    op.create_index('ix_webhook_deliveries_status_next_attempt_at', 'webhook_deliveries', ['status', 'next_attempt_at'], unique=False)
+    op.create_index('ix_webhook_deliveries_webhook_id_id', 'webhook_deliveries', ['webhook_id', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_deliveries_webhook_id_id', table_name='webhook_deliveries')
+    op.drop_index('ix_webhook_deliveries_status_next_attempt_at', table_name='webhook_deliveries')
+    op.drop_index('ix_webhook_deliveries_id', table_name='webhook_deliveries')
+
+    op.drop_table('webhook_deliveries')
+    op.drop_index('ix_webhooks_user_id_id', table_name='webhooks')
+    op.drop_index('ix_webhooks_id', table_name='webhooks')
+    op.drop_index('ix_webhooks_crawl_job_id', table_name='webhooks')
+
+    op.drop_table('webhooks')
\ No newline at end of file
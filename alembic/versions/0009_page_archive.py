@@ -0,0 +1,48 @@
+"""page archive
+
+Raw page archive locations, and the per-job switch that fills it
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 04:24:14
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('archived_pages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('crawl_job_id', sa.Integer(), nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('segment', sa.String(), nullable=True),
+    sa.Column('offset', sa.BigInteger(), nullable=True),
+    sa.Column('length', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['crawl_job_id'], ['crawl_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_pages_content_hash', 'archived_pages', ['content_hash'], unique=False)
+    op.create_index('ix_archived_pages_crawl_job_id_id', 'archived_pages', ['crawl_job_id', 'id'], unique=False)
+    op.create_index('ix_archived_pages_id', 'archived_pages', ['id'], unique=False)
+
+    op.add_column('crawl_jobs', sa.Column('archive_pages', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+def downgrade() -> None:
+    with op.batch_alter_table('crawl_jobs', schema=None) as batch_op:
+        batch_op.drop_column('archive_pages')
+
+    op.drop_index('ix_archived_pages_id', table_name='archived_pages')
+    op.drop_index('ix_archived_pages_crawl_job_id_id', table_name='archived_pages')
+    op.drop_index('ix_archived_pages_content_hash', table_name='archived_pages')
+
+    op.drop_table('archived_pages')
\ No newline at end of file
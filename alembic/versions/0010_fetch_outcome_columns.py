@@ -0,0 +1,41 @@
+"""fetch outcome columns
+
+Per-fetch outcome columns on extracted_data
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 04:27:40
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('extracted_data', sa.Column('http_status', sa.Integer(), nullable=True))
+    op.add_column('extracted_data', sa.Column('error_class', sa.String(length=32), nullable=True))
+    op.add_column('extracted_data', sa.Column('error', sa.Text(), nullable=True))
+    op.add_column('extracted_data', sa.Column('bytes', sa.Integer(), nullable=True))
+    op.add_column('extracted_data', sa.Column('elapsed_ms', sa.Integer(), nullable=True))
+    op.add_column('extracted_data', sa.Column('final_url', sa.String(), nullable=True))
+    op.add_column('extracted_data', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_extracted_data_crawl_job_id_outcome', 'extracted_data', ['crawl_job_id', 'http_status', 'error_class'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_extracted_data_crawl_job_id_outcome', table_name='extracted_data')
+    
+    with op.batch_alter_table('extracted_data', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('final_url')
+        batch_op.drop_column('elapsed_ms')
+        batch_op.drop_column('bytes')
+        batch_op.drop_column('error')
+        batch_op.drop_column('error_class')
+        batch_op.drop_column('http_status')
\ No newline at end of file
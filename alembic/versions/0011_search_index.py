@@ -0,0 +1,42 @@
+"""search index
+
+Full-text index of extracted data: FTS5 on SQLite, tsvector and GIN on Postgres
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 05:02:11
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Rows stored before this revision are indexed by scripts/index_extracted_data.py
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE extracted_data_search USING fts5("
+            "document, crawl_job_id UNINDEXED, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+    elif dialect == 'postgresql':
+        op.create_table('extracted_data_search',
+            sa.Column('extracted_data_id', sa.Integer(), nullable=False),
+            sa.Column('crawl_job_id', sa.Integer(), nullable=False),
+            sa.Column('document', postgresql.TSVECTOR(), nullable=False),
+            sa.PrimaryKeyConstraint('extracted_data_id')
+        )
+        op.create_index('ix_extracted_data_search_document', 'extracted_data_search', ['document'], unique=False, postgresql_using='gin')
+        op.create_index('ix_extracted_data_search_crawl_job_id', 'extracted_data_search', ['crawl_job_id'], unique=False)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        op.execute("DROP TABLE IF EXISTS extracted_data_search")
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""crawl job shard leases
+
+Lease of a running shard, renewed by its worker, and the claim it belongs to
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 06:12:31
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('crawl_job_shards', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('crawl_job_shards', sa.Column('attempt', sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('crawl_job_shards', schema=None) as batch_op:
+        batch_op.drop_column('attempt')
+        batch_op.drop_column('lease_expires_at')
\ No newline at end of file
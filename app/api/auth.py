@@ -1,36 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from ..database import get_db
+from ..database import get_async_db
 from ..schemas.user import UserCreate, User, Token
-from ..services.user_service import UserService
-from ..core.security import create_access_token
+from ..services.user_service import AsyncUserService
+from ..core.user_cache import UserSnapshot
+from ..core.security import create_access_token, get_password_hash_async, verify_password_async
 from ..config import settings
 
 router = APIRouter()
 
 @router.post("/signup", response_model=User)
-async def sign_up(user: UserCreate, db: Session = Depends(get_db)):
-    user_service = UserService(db)
+async def sign_up(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
     
-    if user_service.get_user_by_email(user.email):
+    if await user_service.get_user_by_email(user.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    # Don't hold a pooled connection while waiting for the hash
+    await db.rollback()
     
-    return user_service.create_user(user)
+    hashed_password = await get_password_hash_async(user.password)
+    return await user_service.create_user(user, hashed_password)
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_service = UserService(db)
-    user = user_service.authenticate_user(form_data.username, form_data.password)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_email(form_data.username)
     
-    if not user:
+    # End the read transaction before the (queued) bcrypt check so a login
+    # storm cannot exhaust the connection pool while waiting on hashes
+    hashed_password = user.hashed_password if user else None
+    user = UserSnapshot.from_user(user) if user else None
+    await db.rollback()
+    
+    if not user or not await verify_password_async(form_data.password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -39,7 +49,8 @@ async def login(
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id, "act": user.is_active},
+        expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -1,34 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..schemas.crawl_job import CrawlJob, CrawlJobCreate, CrawlJobUpdate, ExtractedDataResponse
-from ..services.crawl_service import CrawlService
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from ..database import get_async_db, get_async_read_db, AsyncSessionLocal, ReadSessionLocal, SessionLocal
+from ..schemas.crawl_job import CrawlJob, CrawlJobCreate, CrawlJobUpdate, ExtractedDataResponse, ReextractRequest
+from ..services.crawl_service import AsyncCrawlService, CrawlService
+from ..services.profile_service import AsyncProfileService
+from ..services.schedule_service import scheduler
+from ..core.progress import progress_hub
+from ..config import settings
 from ..dependencies import get_current_active_user
-from ..models.user import User
+from ..core.user_cache import UserSnapshot
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def run_crawl_job_sync(job_id: int, db: Session):
-    """Background task to run crawl job"""
-    crawl_service = CrawlService(db)
-    result = crawl_service.execute_crawl_job(job_id)
+# Page size of /data when a cursor is given without a limit
+DEFAULT_DATA_PAGE_SIZE = 1000
+
+def run_crawl_job_sync(job_id: int) -> bool:
+    """Background task to run crawl job on its own session and worker thread"""
+    db = SessionLocal()
+    try:
+        result = CrawlService(db).execute_crawl_job(job_id)
+    finally:
+        db.close()
     logger.info(f"Background crawl job {job_id} completed with result: {result}")
+    return result
+
+def run_reextract_job_sync(job_id: int, extraction_rules: Optional[Dict[str, str]]) -> bool:
+    """Background task to re-extract a job from its archive on its own session"""
+    db = SessionLocal()
+    try:
+        result = CrawlService(db).reextract_crawl_job(job_id, extraction_rules)
+    finally:
+        db.close()
+    logger.info(f"Background re-extraction of crawl job {job_id} completed with result: {result}")
+    return result
 
 @router.post("/", response_model=CrawlJob)
 async def create_crawl_job(
     crawl_job: CrawlJobCreate,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    crawl_service = CrawlService(db)
-    job = crawl_service.create_crawl_job(crawl_job, current_user.id)
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.create_crawl_job(crawl_job, current_user.id)
     
-    # Add background task to execute crawl job
-    background_tasks.add_task(run_crawl_job_sync, job.id, db)
+    # Scheduled and recurring jobs are left to the scheduler; others run now
+    if job.next_run_at is None:
+        background_tasks.add_task(run_crawl_job_sync, job.id)
+    else:
+        scheduler.notify(job.id, job.next_run_at)
     
     logger.info(f"Created crawl job {job.id} for user {current_user.id}")
     return job
@@ -36,20 +63,22 @@ async def create_crawl_job(
 @router.post("/{job_id}/execute", response_model=dict)
 async def execute_crawl_job_now(
     job_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute a crawl job immediately (for testing)"""
-    crawl_service = CrawlService(db)
-    job = crawl_service.get_crawl_job(job_id, current_user.id)
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Crawl job not found")
     
-    if job.status == "running":
+    if job.status in ("running", "paused"):
         raise HTTPException(status_code=400, detail="Job is already running")
     
-    success = crawl_service.execute_crawl_job(job_id)
+    # The crawl runs on its own session; don't keep this one's connection meanwhile
+    await db.rollback()
+    success = await run_in_threadpool(run_crawl_job_sync, job_id)
     
     return {
         "message": "Job execution completed",
@@ -57,26 +86,109 @@ async def execute_crawl_job_now(
         "job_id": job_id
     }
 
+@router.post("/{job_id}/cancel", response_model=dict)
+async def cancel_crawl_job(
+    job_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stop a running or paused job; in-flight requests are aborted, collected results kept"""
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    if not await crawl_service.cancel_crawl_job(job_id, current_user.id):
+        raise HTTPException(status_code=400, detail=f"Job is {job.status}, not running")
+    
+    return {"message": "Job cancelled", "job_id": job_id, "status": "cancelled"}
+
+@router.post("/{job_id}/pause", response_model=dict)
+async def pause_crawl_job(
+    job_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stop dispatching a running job's URLs until it is resumed"""
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    if not await crawl_service.pause_crawl_job(job_id, current_user.id):
+        raise HTTPException(status_code=400, detail=f"Job is {job.status}, not running")
+    
+    return {"message": "Job paused", "job_id": job_id, "status": "paused"}
+
+@router.post("/{job_id}/resume", response_model=dict)
+async def resume_crawl_job(
+    job_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    if not await crawl_service.resume_crawl_job(job_id, current_user.id):
+        raise HTTPException(status_code=400, detail=f"Job is {job.status}, not paused")
+    
+    return {"message": "Job resumed", "job_id": job_id, "status": "running"}
+
+@router.post("/{job_id}/re-extract", response_model=dict)
+async def reextract_crawl_job(
+    job_id: int,
+    request: ReextractRequest,
+    background_tasks: BackgroundTasks,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Rebuild the job's data from its archived pages, with new extraction rules if given"""
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    if job.status in ("running", "paused"):
+        raise HTTPException(status_code=400, detail="Job is already running")
+    
+    pages = await crawl_service.count_archived_pages(job_id)
+    if not pages:
+        raise HTTPException(status_code=400, detail="Job has no archived pages; crawl it with archive_pages first")
+    
+    background_tasks.add_task(run_reextract_job_sync, job_id, request.extraction_rules)
+    return {"message": "Re-extraction started", "job_id": job_id, "archived_pages": pages}
+
 @router.get("/", response_model=List[CrawlJob])
 async def get_crawl_jobs(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    crawl_service = CrawlService(db)
-    jobs = crawl_service.get_crawl_jobs(current_user.id, skip, limit)
+    """List jobs in id order; pass the ``X-Next-Cursor`` header as ``after_id`` for the next page"""
+    crawl_service = AsyncCrawlService(db)
+    jobs = await crawl_service.get_crawl_jobs(current_user.id, skip, limit, after_id)
+    if len(jobs) == limit:
+        response.headers["X-Next-Cursor"] = str(jobs[-1].id)
     logger.info(f"Retrieved {len(jobs)} crawl jobs for user {current_user.id}")
     return jobs
 
 @router.get("/{job_id}", response_model=CrawlJob)
 async def get_crawl_job(
     job_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    crawl_service = CrawlService(db)
-    job = crawl_service.get_crawl_job(job_id, current_user.id)
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Crawl job not found")
@@ -87,60 +199,165 @@ async def get_crawl_job(
 async def update_crawl_job(
     job_id: int,
     job_update: CrawlJobUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    crawl_service = CrawlService(db)
-    job = crawl_service.update_crawl_job(job_id, current_user.id, job_update)
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.update_crawl_job(job_id, current_user.id, job_update)
     
     if not job:
         raise HTTPException(status_code=404, detail="Crawl job not found")
     
+    scheduler.notify(job.id, job.next_run_at)
     logger.info(f"Updated crawl job {job_id}")
     return job
 
 @router.delete("/{job_id}")
 async def delete_crawl_job(
     job_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    crawl_service = CrawlService(db)
-    if not crawl_service.delete_crawl_job(job_id, current_user.id):
+    crawl_service = AsyncCrawlService(db)
+    if not await crawl_service.delete_crawl_job(job_id, current_user.id):
         raise HTTPException(status_code=404, detail="Crawl job not found")
     
     logger.info(f"Deleted crawl job {job_id}")
     return {"message": "Crawl job deleted successfully"}
 
+def stream_extracted_data(job_id: int, after_id: Optional[int]) -> Iterator[str]:
+    """Serialize a job's extracted data as NDJSON, one row per line"""
+    db = ReadSessionLocal()
+    try:
+        crawl_service = CrawlService(db)
+        for row in crawl_service.iter_extracted_data(job_id, after_id):
+            yield ExtractedDataResponse.model_validate(row).model_dump_json() + "\n"
+    finally:
+        db.close()
+
 @router.get("/{job_id}/data", response_model=List[ExtractedDataResponse])
 async def get_extracted_data(
     job_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    crawl_service = CrawlService(db)
-    data = crawl_service.get_extracted_data(job_id, current_user.id)
+    """Page through extracted data by id.
+    
+    Pass the ``X-Next-Cursor`` header of a page as ``after_id`` to get the
+    next one. ``format=ndjson`` streams every remaining row instead. Without
+    ``after_id`` or ``limit`` every row is returned, as before paging existed.
+    """
+    crawl_service = AsyncCrawlService(db)
+    if not await crawl_service.get_crawl_job(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_extracted_data(job_id, after_id),
+            media_type="application/x-ndjson"
+        )
+    
+    if limit is None and after_id is not None:
+        limit = DEFAULT_DATA_PAGE_SIZE
+    data = await crawl_service.get_extracted_data(job_id, current_user.id, after_id, limit)
+    if limit is not None and len(data) == limit:
+        response.headers["X-Next-Cursor"] = str(data[-1].id)
+    
     logger.info(f"Retrieved {len(data)} extracted records for job {job_id}")
     return data
 
 @router.get("/{job_id}/status")
 async def get_crawl_job_status(
     job_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    crawl_service = CrawlService(db)
-    job = crawl_service.get_crawl_job(job_id, current_user.id)
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Crawl job not found")
     
-    return {
+    stats = await crawl_service.get_job_stats(job.id)
+    total_urls = len(job.target_urls or [])
+    completed_urls = stats.urls_crawled if stats else 0
+    
+    status = {
         "id": job.id,
         "name": job.name,
         "status": job.status,
         "started_at": job.started_at,
         "completed_at": job.completed_at,
         "created_at": job.created_at,
-        "updated_at": job.updated_at
-    }
\ No newline at end of file
+        "updated_at": job.updated_at,
+        "progress": {
+            "total_urls": total_urls,
+            "completed_urls": completed_urls,
+            "successful_urls": stats.successful_extractions if stats else 0,
+            "failed_urls": stats.failed_extractions if stats else 0,
+            "bytes_downloaded": stats.bytes_downloaded if stats else 0,
+            "percentage": round(completed_urls / total_urls * 100, 1) if total_urls else 0.0
+        }
+    }
+    
+    # Jobs fanned out to workers also report how many of their shards are done
+    shards = await crawl_service.get_shard_counts(job.id)
+    if shards:
+        status["shards"] = shards
+    return status
+
+async def load_job_progress(job_id: int) -> Optional[Dict[str, Any]]:
+    """Progress counters from the database, for jobs crawled by another process"""
+    async with AsyncSessionLocal() as db:
+        return await AsyncCrawlService(db).get_job_progress(job_id)
+
+async def progress_events(job_id: int, total_urls: int) -> AsyncIterator[str]:
+    """Server-Sent Events of a job's progress; the last one carries its final status"""
+    async for snapshot in progress_hub.subscribe(job_id, total_urls, load_job_progress,
+                                                 settings.progress_heartbeat_seconds):
+        if snapshot is None:
+            yield ": keepalive\n\n"
+        else:
+            yield f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+
+@router.get("/{job_id}/progress")
+async def stream_crawl_job_progress(
+    job_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream progress as Server-Sent Events instead of polling ``/status``.
+    
+    All clients following a job share one feed, updated by the crawler
+    itself while the job runs in this process.
+    """
+    crawl_service = AsyncCrawlService(db)
+    job = await crawl_service.get_crawl_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    total_urls = len(job.target_urls or [])
+    # The stream can stay open for the whole job; don't hold a connection meanwhile
+    await db.rollback()
+    return StreamingResponse(
+        progress_events(job_id, total_urls),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{job_id}/profile")
+async def get_crawl_job_profile(
+    job_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Per-stage timing percentiles (DNS through DB write) for the job and each host"""
+    if not await AsyncCrawlService(db).get_crawl_job(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    return await AsyncProfileService(db).get_job_profile(job_id)
\ No newline at end of file
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterator, List, Optional
+from ..database import get_async_read_db, ReadSessionLocal
+from ..services.crawl_service import AsyncCrawlService
+from ..services.export_service import ExportService, ExportError, MEDIA_TYPES
+from ..dependencies import get_current_active_user
+from ..core.user_cache import UserSnapshot
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+FILE_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+def stream_export(job_ids: List[int], 
+                  format: str, 
+                  compression: str, 
+                  fields: Optional[List[str]]) -> Iterator[bytes]:
+    """Run an export on its own session, which stays open while the response streams"""
+    db = ReadSessionLocal()
+    try:
+        yield from ExportService(db).export(job_ids, format, compression, fields)
+    finally:
+        db.close()
+
+@router.get("/")
+async def export_extracted_data(
+    job_ids: List[int] = Query(...),
+    format: str = Query("csv", pattern="^(csv|jsonl|parquet)$"),
+    compression: str = Query("none", pattern="^(none|gzip|zstd)$"),
+    fields: Optional[List[str]] = Query(None),
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Stream the extracted data of one or more crawl jobs as CSV, JSONL or Parquet"""
+    crawl_service = AsyncCrawlService(db)
+    for job_id in set(job_ids):
+        if not await crawl_service.get_crawl_job(job_id, current_user.id):
+            raise HTTPException(status_code=404, detail=f"Crawl job {job_id} not found")
+    
+    # Validate options up front so errors are reported before streaming starts
+    try:
+        await db.run_sync(
+            lambda session: ExportService(session).export(job_ids, format, compression, fields)
+        )
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Parquet compresses internally, so the file itself is never wrapped
+    extension = format if format == "parquet" else format + FILE_EXTENSIONS[compression]
+    filename = f"crawl-export-{'-'.join(str(job_id) for job_id in job_ids)}.{extension}"
+    
+    logger.info(f"Exporting jobs {job_ids} for user {current_user.id} as {filename}")
+    return StreamingResponse(
+        stream_export(job_ids, format, compression, fields),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
\ No newline at end of file
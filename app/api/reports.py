@@ -1,41 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db, get_async_read_db
 from ..schemas.report import Report, ReportCreate
-from ..services.report_service import ReportService
+from ..services.report_service import AsyncReportService
 from ..dependencies import get_current_active_user
-from ..models.user import User
+from ..core.user_cache import UserSnapshot
 
 router = APIRouter()
 
 @router.post("/", response_model=Report)
 async def create_report(
     report: ReportCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
 ):
-    report_service = ReportService(db)
-    return report_service.create_report(report, current_user.id)
+    report_service = AsyncReportService(db, read_db)
+    return await report_service.create_report(report, current_user.id)
 
 @router.get("/", response_model=List[Report])
 async def get_reports(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    report_service = ReportService(db)
-    return report_service.get_reports(current_user.id, skip, limit)
+    """List reports in id order; pass the ``X-Next-Cursor`` header as ``after_id`` for the next page"""
+    report_service = AsyncReportService(db)
+    reports = await report_service.get_reports(current_user.id, skip, limit, after_id)
+    if len(reports) == limit:
+        response.headers["X-Next-Cursor"] = str(reports[-1].id)
+    return reports
 
 @router.get("/{report_id}", response_model=Report)
 async def get_report(
     report_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    report_service = ReportService(db)
-    report = report_service.get_report(report_id, current_user.id)
+    report_service = AsyncReportService(db)
+    report = await report_service.get_report(report_id, current_user.id)
     
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
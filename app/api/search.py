@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_read_db
+from ..schemas.crawl_job import ExtractedDataResponse, SearchResult
+from ..services.crawl_service import AsyncCrawlService
+from ..services.search_service import AsyncSearchService, SearchNotSupportedError, encode_cursor
+from ..dependencies import get_current_active_user
+from ..core.user_cache import UserSnapshot
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchResult])
+async def search_extracted_data(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    job_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Search the extracted data of the user's jobs, best matches first.
+    
+    Pass the ``X-Next-Cursor`` header of a page as ``cursor`` to get the
+    next one.
+    """
+    if job_id is not None and not await AsyncCrawlService(db).get_crawl_job(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    try:
+        hits = await AsyncSearchService(db).search(current_user.id, q, job_id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except SearchNotSupportedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    if len(hits) == limit:
+        row, score = hits[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(score, row.id)
+    
+    logger.info(f"Search by user {current_user.id} returned {len(hits)} results")
+    return [
+        SearchResult(
+            **ExtractedDataResponse.model_validate(row).model_dump(), crawl_job_id=row.crawl_job_id, score=score
+        )
+        for row, score in hits
+    ]
\ No newline at end of file
@@ -1,24 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..schemas.user import User, UserUpdate
-from ..services.user_service import UserService
+from ..services.user_service import AsyncUserService
 from ..dependencies import get_current_active_user
+from ..core.user_cache import UserSnapshot
+from ..core.security import get_password_hash_async
 
 router = APIRouter()
 
 @router.get("/profile", response_model=User)
-async def get_profile(current_user: User = Depends(get_current_active_user)):
-    return current_user
+async def get_profile(
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # The authenticated user may come from the token cache; read the full
+    # profile from the database
+    user = await AsyncUserService(db).get_user(current_user.id)
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return user
 
 @router.put("/profile", response_model=User)
 async def update_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_service = UserService(db)
-    updated_user = user_service.update_user(current_user.id, user_update)
+    user_service = AsyncUserService(db)
+    hashed_password = None
+    if user_update.password:
+        hashed_password = await get_password_hash_async(user_update.password)
+    
+    updated_user = await user_service.update_user(current_user.id, user_update, hashed_password)
     
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
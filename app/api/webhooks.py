@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..database import get_async_db
+from ..schemas.webhook import Webhook, WebhookCreate, WebhookDelivery
+from ..services.crawl_service import AsyncCrawlService
+from ..services.webhook_service import AsyncWebhookService
+from ..dependencies import get_current_active_user
+from ..core.user_cache import UserSnapshot
+
+router = APIRouter()
+
+@router.post("/", response_model=Webhook)
+async def create_webhook(
+    webhook: WebhookCreate,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Follow one job, or every job of the user when ``crawl_job_id`` is left out"""
+    if webhook.crawl_job_id is not None:
+        job = await AsyncCrawlService(db).get_crawl_job(webhook.crawl_job_id, current_user.id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Crawl job not found")
+    
+    webhook_service = AsyncWebhookService(db)
+    return await webhook_service.create_webhook(webhook, current_user.id)
+
+@router.get("/", response_model=List[Webhook])
+async def get_webhooks(
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    webhook_service = AsyncWebhookService(db)
+    return await webhook_service.get_webhooks(current_user.id)
+
+@router.delete("/{webhook_id}")
+async def delete_webhook(
+    webhook_id: int,
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    webhook_service = AsyncWebhookService(db)
+    success = await webhook_service.delete_webhook(webhook_id, current_user.id)
+    
+    if not success:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    
+    return {"message": "Webhook deleted successfully"}
+
+@router.get("/{webhook_id}/deliveries", response_model=List[WebhookDelivery])
+async def get_webhook_deliveries(
+    webhook_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: UserSnapshot = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Most recent deliveries first, with their attempts and last error"""
+    webhook_service = AsyncWebhookService(db)
+    webhook = await webhook_service.get_webhook(webhook_id, current_user.id)
+    
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    
+    return await webhook_service.get_deliveries(webhook_id, limit)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
@@ -15,7 +16,65 @@ class Settings(BaseSettings):
     max_concurrent_requests: int 
     request_delay: float
     respect_robots: bool
+    robots_cache_size: int = 10000  # hosts whose robots.txt is kept per crawler
+    robots_cache_ttl: float = 3600  # robots.txt is read again after this long
+    robots_failure_ttl: float = 60  # unreachable robots.txt or 5xx: retried after this long
     environment: str
+    ingest_batch_size: int = 50
+    cache_redis_url: Optional[str] = None
+    report_cache_size: int = 256
+    report_cache_ttl: int = 3600
+    report_slowest_hosts: int = 10  # hosts listed in a report's fetch outcomes
+    search_enabled: bool = True  # index extracted data for full-text search at ingest
+    search_language: str = "english"  # Postgres text search configuration
+    export_chunk_size: int = 5000
+    payload_dictionary_samples: int = 200
+    payload_dictionary_size: int = 16384
+    user_cache_size: int = 10000
+    user_cache_ttl: int = 60
+    trust_token_claims: bool = False
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+    async_database_url: Optional[str] = None
+    auto_migrate: bool = True
+    read_database_url: Optional[str] = None
+    async_read_database_url: Optional[str] = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_pre_ping: bool = False
+    db_pool_recycle: int = -1
+    user_max_concurrent_requests: Optional[int] = None  # defaults to half of max_concurrent_requests
+    scheduler_enabled: bool = True
+    scheduler_refresh_seconds: float = 30
+    celery_broker_url: Optional[str] = None  # jobs are never sharded when unset (unless eager)
+    celery_broker_folder: str = ".celery"  # queue directory of the filesystem:// broker
+    celery_task_always_eager: bool = False
+    crawl_shard_size: int = 1000
+    shard_lease_seconds: float = 300  # a running shard whose worker stopped renewing this long is crawled again
+    job_control_poll_seconds: float = 2  # how soon a crawl sees cancel/pause requests from other processes
+    progress_interval: float = 0.5  # at most one progress event per job per interval
+    progress_poll_seconds: float = 2  # database polling for jobs crawled by other processes
+    progress_heartbeat_seconds: float = 15
+    fetch_cache_enabled: bool = True  # coalesce identical fetches of concurrent jobs and cache their pages
+    fetch_cache_ttl: float = 60  # 0 keeps coalescing but caches nothing
+    fetch_cache_max_bytes: int = 64 * 1024 * 1024
+    fetch_cache_max_page_bytes: int = 2 * 1024 * 1024
+    fetch_cache_shared: bool = False  # also keep pages in CACHE_REDIS_URL for other processes
+    archive_folder: str = "archive"  # WARC segments of jobs with archive_pages
+    archive_segment_bytes: int = 1024 ** 3
+    reextract_workers: int = 0  # parsing processes for re-extraction; 0: one per CPU
+    reextract_chunk_size: int = 200  # archived pages per task, and per stored batch
+    metrics_max_hosts: int = 200  # hosts with their own per-host metric series; the rest are "other"
+    webhooks_enabled: bool = True
+    webhook_batch_size: int = 100  # events per request to one webhook
+    webhook_batch_window: float = 1.0  # wait after a job finishes so events that end together share a request
+    webhook_poll_seconds: float = 10  # retries and events of other processes
+    webhook_timeout: float = 10
+    webhook_max_connections: int = 20
+    webhook_max_attempts: int = 8
+    webhook_retry_base_seconds: float = 10  # doubled after each failed attempt
+    webhook_retry_max_seconds: float = 3600
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,197 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+class LRUCache:
+    """Thread-safe, size-bounded in-process LRU cache with optional TTL"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats.misses += 1
+                return default
+            
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats.misses += 1
+                return default
+            
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+    
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether an unexpired entry exists; not counted as a lookup"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and (entry[1] is None or entry[1] > time.monotonic())
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._stats.as_dict()
+        stats.update({"size": len(self._data), "maxsize": self.maxsize, "backend": "memory"})
+        return stats
+
+class RedisCache:
+    """Shared cache backend storing JSON-serializable values in Redis"""
+    
+    def __init__(self, url: str, namespace: str, ttl: Optional[float] = None):
+        import redis
+        
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+        self._stats = CacheStats()
+    
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for {self.namespace}: {e}")
+            raw = None
+        
+        if raw is None:
+            self._stats.misses += 1
+            return default
+        
+        self._stats.hits += 1
+        return json.loads(raw)
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        try:
+            self.client.set(self._key(key), json.dumps(value, default=str), ex=int(ttl) if ttl else None)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed for {self.namespace}: {e}")
+    
+    def delete(self, key: Hashable):
+        try:
+            self.client.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed for {self.namespace}: {e}")
+    
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(f"{self.namespace}:*"):
+                self.client.delete(key)
+        except Exception as e:
+            logger.warning(f"Shared cache clear failed for {self.namespace}: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._stats.as_dict()
+        stats["backend"] = "redis"
+        return stats
+
+class TieredCache:
+    """In-process LRU in front of a shared backend; local misses fall through to the shared tier"""
+    
+    def __init__(self, local: LRUCache, shared: RedisCache):
+        self.local = local
+        self.shared = shared
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        
+        self.local.set(key, value)
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+        self.shared.set(key, value, ttl)
+    
+    def delete(self, key: Hashable):
+        self.local.delete(key)
+        self.shared.delete(key)
+    
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"local": self.local.stats(), "shared": self.shared.stats()}
+
+_registry: Dict[str, Any] = {}
+
+def create_cache(name: str, maxsize: int, ttl: Optional[float] = None, shared_url: Optional[str] = None):
+    """Build a named cache and register it so its hit rates are reported.
+    
+    With ``shared_url`` set the cache is backed by Redis as well, so entries
+    are shared between API processes; values must then be JSON-serializable.
+    """
+    cache = LRUCache(maxsize=maxsize, ttl=ttl)
+    if shared_url:
+        try:
+            cache = TieredCache(cache, RedisCache(shared_url, namespace=name, ttl=ttl))
+        except ImportError:
+            logger.warning(f"redis is not installed, cache '{name}' is in-process only")
+    
+    return register_cache(name, cache)
+
+def register_cache(name: str, cache: Any) -> Any:
+    """Report the hit rates of a cache built elsewhere; it needs a ``stats()`` method"""
+    _registry[name] = cache
+    return cache
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
\ No newline at end of file
@@ -1,40 +1,131 @@
 import asyncio
 import aiohttp
+import hashlib
 import ssl
-from typing import List, Dict, Optional
+import time
+from typing import Callable, List, Dict, Optional
+from urllib.parse import urlsplit
 import logging
 from fake_useragent import UserAgent
 import random
 import certifi
 from .robots_checker import RobotsChecker
 from .data_extractor import DataExtractor
+from .fetch_cache import FetchCache
+from .metrics import BYTES_DOWNLOADED, FETCH_DURATION, IN_FLIGHT, QUEUE_DEPTH, RESPONSES, LabelLimiter
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-host metrics keep a series for at most this many hosts per process
+host_labels = LabelLimiter(settings.metrics_max_hosts)
+
+def _micros(seconds: float) -> int:
+    return max(round(seconds * 1_000_000), 0)
+
+def _stage_trace_config() -> aiohttp.TraceConfig:
+    """Trace hooks that record DNS, connect and first-byte timestamps of a request.
+    
+    Marks are written into the dict passed as ``trace_request_ctx``; DNS and
+    connect durations are summed over redirects.
+    """
+    async def on_request_start(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx.setdefault("request_start", time.perf_counter())
+    
+    async def on_dns_start(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx["dns_start"] = time.perf_counter()
+    
+    async def on_dns_end(session, context, params):
+        marks = context.trace_request_ctx
+        if marks is not None and "dns_start" in marks:
+            marks["dns"] = marks.get("dns", 0.0) + time.perf_counter() - marks.pop("dns_start")
+    
+    async def on_connect_start(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx["connect_start"] = time.perf_counter()
+    
+    async def on_connect_end(session, context, params):
+        marks = context.trace_request_ctx
+        if marks is not None and "connect_start" in marks:
+            marks["connect"] = marks.get("connect", 0.0) + time.perf_counter() - marks.pop("connect_start")
+    
+    async def on_request_end(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx["headers"] = time.perf_counter()
+    
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connect_start)
+    trace_config.on_connection_create_end.append(on_connect_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+def network_timings(marks: Dict[str, float], body_done: Optional[float] = None) -> Dict[str, int]:
+    """Per-stage durations in microseconds from the marks of ``_stage_trace_config``.
+    
+    aiohttp resolves DNS inside connection creation, so DNS is subtracted
+    from connect; connect includes the TLS handshake. First byte is the
+    remaining wait from sending the request to receiving response headers.
+    """
+    dns = marks.get("dns", 0.0)
+    connect = marks.get("connect", 0.0)
+    timings = {"dns_us": _micros(dns), "connect_us": _micros(connect - dns)}
+    if "request_start" in marks and "headers" in marks:
+        timings["first_byte_us"] = _micros(marks["headers"] - marks["request_start"] - connect)
+        if body_done is not None:
+            timings["body_us"] = _micros(body_done - marks["headers"])
+    return timings
+
+def classify_error(error: BaseException) -> str:
+    """Coarse class of a failed fetch, stored with its result for error breakdowns"""
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, aiohttp.ClientSSLError):
+        return "ssl"
+    if isinstance(error, aiohttp.ClientConnectionError):
+        return "connection"
+    if isinstance(error, aiohttp.ClientError):
+        return "client"
+    return "other"
+
 class SimpleCrawler:
     def __init__(self, 
                  max_concurrent: int = 5, 
                  delay_range: tuple = (1, 2),
                  user_agent: Optional[str] = None,
                  respect_robots: bool = True,
-                 verify_ssl: bool = True):
+                 verify_ssl: bool = True,
+                 fetch_cache: Optional[FetchCache] = None):
         self.max_concurrent = max_concurrent
         self.delay_range = delay_range
         self.session = None
         self.ua = UserAgent()
+        self._configured_user_agent = user_agent
         self.user_agent = user_agent or self.ua.random
         self.respect_robots = respect_robots
         self.verify_ssl = verify_ssl
         self.robots_checker = RobotsChecker(self.user_agent, verify_ssl) if respect_robots else None
         self.data_extractor = DataExtractor()
+        self.fetch_cache = fetch_cache
+        self._resumed: Optional[asyncio.Event] = None
         
         # Create SSL context
         if verify_ssl:
             self.ssl_context = ssl.create_default_context(cafile=certifi.where())
         else:
             self.ssl_context = False  # Disable SSL verification
-        
+    
+    def pick_user_agent(self) -> str:
+        """User-Agent for a new job: the configured one, else a fresh random one"""
+        return self._configured_user_agent or self.ua.random
+    
     async def __aenter__(self):
+        self._resumed = asyncio.Event()
+        self._resumed.set()
         timeout = aiohttp.ClientTimeout(total=30)
         
         # Create connector with SSL context
@@ -47,7 +138,8 @@ class SimpleCrawler:
         
         self.session = aiohttp.ClientSession(
             timeout=timeout,
-            connector=connector
+            connector=connector,
+            trace_configs=[_stage_trace_config()]
         )
         return self
     
@@ -55,8 +147,24 @@ class SimpleCrawler:
         if self.session:
             await self.session.close()
     
-    async def crawl_urls(self, urls: List[str], extraction_rules: Dict[str, str]) -> List[Dict]:
-        """Crawl multiple URLs with extraction rules"""
+    def pause(self):
+        """Hold back URLs of ``crawl_urls`` that haven't started; in-flight ones finish"""
+        self._resumed.clear()
+    
+    def resume(self):
+        self._resumed.set()
+    
+    async def crawl_urls(self, 
+                         urls: List[str], 
+                         extraction_rules: Dict[str, str],
+                         on_result: Optional[Callable[[Dict], None]] = None,
+                         keep_html: bool = False) -> List[Dict]:
+        """Crawl multiple URLs with extraction rules.
+        
+        ``on_result`` is called with each result as soon as its URL finishes,
+        so callers can persist results incrementally instead of waiting for
+        the whole batch. ``keep_html`` adds each page's HTML to its result.
+        """
         if self.respect_robots:
             allowed_urls = []
             for url in urls:
@@ -73,7 +181,7 @@ class SimpleCrawler:
         
         semaphore = asyncio.Semaphore(self.max_concurrent)
         tasks = [
-            self._crawl_single_url(semaphore, url, extraction_rules) 
+            self._crawl_and_report(semaphore, url, extraction_rules, on_result, keep_html)
             for url in allowed_urls
         ]
         
@@ -87,6 +195,7 @@ class SimpleCrawler:
                 valid_results.append({
                     "url": "unknown",
                     "error": str(result),
+                    "error_class": classify_error(result),
                     "data": {}
                 })
             else:
@@ -94,44 +203,152 @@ class SimpleCrawler:
         
         return valid_results
     
-    async def _crawl_single_url(self, semaphore, url: str, extraction_rules: Dict) -> Dict:
-        """Crawl a single URL and extract data"""
+    async def _crawl_and_report(self, semaphore, url: str, extraction_rules: Dict,
+                                on_result: Optional[Callable[[Dict], None]], keep_html: bool = False) -> Dict:
+        """Crawl a single URL and hand the result to ``on_result``"""
+        try:
+            result = await self._crawl_single_url(semaphore, url, extraction_rules, keep_html)
+        except Exception as e:
+            logger.error(f"Crawl task failed: {e}")
+            result = {"url": url, "error": str(e), "error_class": classify_error(e), "data": {}}
+        
+        if on_result:
+            on_result(result)
+        return result
+    
+    async def _crawl_single_url(self, semaphore, url: str, extraction_rules: Dict, keep_html: bool = False) -> Dict:
+        """Crawl a single URL once a slot of ``semaphore`` is free"""
+        QUEUE_DEPTH.inc()
         async with semaphore:
-            try:
-                headers = {
-                    'User-Agent': self.user_agent,
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Cache-Control': 'max-age=0'
+            await self._resumed.wait()
+            QUEUE_DEPTH.dec()
+            return await self.crawl_url(url, extraction_rules, keep_html)
+    
+    async def crawl_url(self,
+                        url: str,
+                        extraction_rules: Dict,
+                        keep_html: bool = False,
+                        user_agent: Optional[str] = None) -> Dict:
+        """Fetch one URL and extract data, followed by the politeness delay.
+        
+        Callers limit concurrency themselves; robots.txt is not checked here.
+        With a fetch cache the page may come from another job's request, in
+        which case the site wasn't contacted and there is no delay.
+        ``user_agent`` overrides the crawler's for this request.
+        """
+        started = time.monotonic()
+        IN_FLIGHT.inc()
+        marks: Dict[str, float] = {}
+        fetched = True
+        cancelled = False
+        try:
+            if self.fetch_cache is not None:
+                page, source = await self.fetch_cache.fetch(url, lambda: self._fetch_page(url, marks, user_agent))
+                fetched = source == "network"
+            else:
+                page = await self._fetch_page(url, marks, user_agent)
+            # Network stages belong to the request that fetched the page
+            timings = dict(page.get("timings") or {}) if fetched else {}
+            
+            if page["status"] != 200:
+                return {
+                    "url": url, 
+                    "error": page["error"],
+                    "error_class": page.get("error_class"),
+                    "http_status": page["status"],
+                    "final_url": page.get("final_url"),
+                    "data": {},
+                    "bytes": 0,
+                    "elapsed_ms": self._elapsed_ms(started),
+                    "timings": timings
                 }
-                
-                logger.info(f"Crawling URL: {url}")
-                
-                async with self.session.get(url, headers=headers, ssl=self.ssl_context) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        result = self.data_extractor.extract_data(html, url, extraction_rules)
-                        logger.info(f"Successfully crawled: {url} (Content length: {len(html)})")
-                        return result
-                    else:
-                        error_msg = f"HTTP {response.status}"
-                        logger.warning(f"Failed to crawl {url}: {error_msg}")
-                        return {
-                            "url": url, 
-                            "error": error_msg,
-                            "data": {}
-                        }
-                        
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"Error crawling {url}: {error_msg}")
-                return {"url": url, "error": error_msg, "data": {}}
-            finally:
+            
+            result = self.data_extractor.extract_data(page["html"], url, extraction_rules)
+            timings.update(result.pop("timings", {}))
+            result["timings"] = timings
+            result["http_status"] = 200
+            result["error_class"] = "parse" if result.get("error") else None
+            result["final_url"] = page.get("final_url")
+            result["content_hash"] = page.get("content_hash")
+            result["bytes"] = page["bytes"]
+            result["elapsed_ms"] = self._elapsed_ms(started)
+            if keep_html:
+                result["html"] = page["html"]
+            return result
+        
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            IN_FLIGHT.dec()
+            # A cancelled request frees its slot at once, and a page fetched
+            # by another request needs no delay
+            if fetched and not cancelled:
                 delay = random.uniform(*self.delay_range)
-                await asyncio.sleep(delay)
\ No newline at end of file
+                await asyncio.sleep(delay)
+    
+    async def _fetch_page(self, url: str, marks: Dict[str, float], user_agent: Optional[str] = None) -> Dict:
+        """GET one URL; failures are returned as a page with an ``error``, not raised.
+        
+        ``final_url`` is where redirects ended; ``content_hash`` is the
+        SHA-256 of the response body, so unchanged pages can be spotted.
+        """
+        host = host_labels(urlsplit(url).hostname or "unknown")
+        started = time.monotonic()
+        try:
+            headers = {
+                'User-Agent': user_agent or self.user_agent,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Sec-Fetch-Dest': 'document',
+                'Sec-Fetch-Mode': 'navigate',
+                'Sec-Fetch-Site': 'none',
+                'Cache-Control': 'max-age=0'
+            }
+            
+            logger.info(f"Crawling URL: {url}")
+            
+            async with self.session.get(url, headers=headers, ssl=self.ssl_context,
+                                        trace_request_ctx=marks) as response:
+                RESPONSES.labels(host, response.status).inc()
+                if response.status == 200:
+                    body = await response.read()
+                    body_done = time.perf_counter()
+                    FETCH_DURATION.labels(host).observe(time.monotonic() - started)
+                    BYTES_DOWNLOADED.labels(host).inc(len(body))
+                    html = await response.text()
+                    timings = network_timings(marks, body_done)
+                    timings["decode_us"] = _micros(time.perf_counter() - body_done)
+                    logger.info(f"Successfully crawled: {url} (Content length: {len(html)})")
+                    return {
+                        "status": 200,
+                        "html": html,
+                        "bytes": len(body),
+                        "error": None,
+                        "final_url": str(response.url),
+                        "content_hash": hashlib.sha256(body).hexdigest(),
+                        "timings": timings
+                    }
+                else:
+                    error_msg = f"HTTP {response.status}"
+                    logger.warning(f"Failed to crawl {url}: {error_msg}")
+                    return {
+                        "status": response.status,
+                        "error": error_msg,
+                        "error_class": "http",
+                        "final_url": str(response.url),
+                        "timings": network_timings(marks)
+                    }
+        
+        except Exception as e:
+            RESPONSES.labels(host, "error").inc()
+            error_msg = str(e) or type(e).__name__
+            logger.error(f"Error crawling {url}: {error_msg}")
+            return {"status": None, "error": error_msg, "error_class": classify_error(e), "timings": network_timings(marks)}
+    
+    @staticmethod
+    def _elapsed_ms(started: float) -> int:
+        return int((time.monotonic() - started) * 1000)
\ No newline at end of file
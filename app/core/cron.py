@@ -0,0 +1,99 @@
+from typing import FrozenSet, Optional
+import datetime
+
+# Five-field cron expressions: minute hour day-of-month month day-of-week.
+# Fields accept *, numbers, ranges (1-5), lists (1,15) and steps (*/10, 8-18/2).
+# Day-of-week is 0-6 from Sunday; 7 is accepted as Sunday too. As in cron,
+# when both day fields are restricted a day matches if either one does.
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+FIELD_NAMES = ("minute", "hour", "day of month", "month", "day of week")
+
+# Every valid expression matches at least once within this many years
+MAX_SEARCH_YEARS = 8
+
+def _parse_field(text: str, low: int, high: int, name: str) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(","):
+        range_part, _, step_part = part.partition("/")
+        step = int(step_part) if step_part else 1
+        if range_part == "*":
+            start, end = low, high
+        elif "-" in range_part:
+            start, end = (int(value) for value in range_part.split("-", 1))
+        else:
+            start = end = int(range_part)
+            if step_part:
+                end = high
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Invalid {name} field in cron expression: '{text}'")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+class CronSchedule:
+    """A parsed cron expression that computes its next occurrence"""
+    
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expression}'")
+        
+        try:
+            parsed = [
+                _parse_field(text, low, high, name)
+                for text, (low, high), name in zip(fields, FIELD_RANGES, FIELD_NAMES)
+            ]
+        except ValueError as e:
+            if "cron expression" in str(e):
+                raise
+            raise ValueError(f"Invalid cron expression '{expression}': {e}")
+        
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+        
+        if self.next_after(datetime.datetime(2000, 1, 1)) is None:
+            raise ValueError(f"Cron expression never matches: '{expression}'")
+    
+    def _day_matches(self, day: datetime.datetime) -> bool:
+        day_match = day.day in self.days
+        # isoweekday() is 1-7 from Monday; cron counts 0-6 from Sunday
+        weekday_match = day.isoweekday() % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+    
+    def next_after(self, after: datetime.datetime) -> Optional[datetime.datetime]:
+        """The first matching minute strictly after ``after`` (naive, same timezone)"""
+        current = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = after.replace(year=after.year + MAX_SEARCH_YEARS, month=1, day=1)
+        
+        # Jump a whole month, day or hour at a time when that unit cannot match
+        while current < limit:
+            if current.month not in self.months:
+                year, month = divmod(current.month, 12)
+                current = current.replace(year=current.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + datetime.timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += datetime.timedelta(minutes=1)
+            else:
+                return current
+        return None
+    
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
\ No newline at end of file
@@ -1,6 +1,8 @@
 from bs4 import BeautifulSoup
 from typing import Dict, Any
+from .metrics import EXTRACT_DURATION, PARSE_DURATION
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +13,9 @@ class DataExtractor:
     def extract_data(self, html: str, url: str, rules: Dict[str, str]) -> Dict[str, Any]:
         """Extract data from HTML using CSS selectors"""
         try:
+            started = time.perf_counter()
             self.soup = BeautifulSoup(html, 'html.parser')
+            parsed = time.perf_counter()
             extracted = {"url": url, "data": {}, "error": None}
             
             for field, selector in rules.items():
@@ -21,8 +25,15 @@ class DataExtractor:
                     logger.error(f"Error extracting field '{field}' from {url}: {e}")
                     extracted["data"][field] = None
             
+            finished = time.perf_counter()
+            PARSE_DURATION.observe(parsed - started)
+            EXTRACT_DURATION.observe(finished - parsed)
+            extracted["timings"] = {
+                "parse_us": int((parsed - started) * 1_000_000),
+                "extract_us": int((finished - parsed) * 1_000_000)
+            }
             return extracted
-            
+        
         except Exception as e:
             logger.error(f"Error parsing HTML from {url}: {e}")
             return {"url": url, "data": {}, "error": str(e)}
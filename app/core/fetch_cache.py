@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .cache import CacheStats, RedisCache, register_cache
+from .metrics import FETCH_SOURCES
+from ..config import settings
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+Page = Dict[str, Any]
+
+class FetchCache:
+    """Process-wide front of the crawler's GET requests, shared by every job.
+    
+    Concurrent fetches of one URL collapse into a single request whose page
+    all callers receive, whichever event loop they run on. Successful pages
+    are then kept for ``ttl`` seconds in an LRU bounded by total body size,
+    so jobs crawling the same URLs minutes apart hit the site once. With
+    ``shared_url`` pages are kept in Redis too, for other processes; from
+    ``fetch()`` its blocking calls run in a thread, off the event loop. Each
+    job still applies its own extraction rules to the page.
+    
+    Pages are dicts with ``status``, ``html``, ``bytes``, ``error``,
+    ``final_url`` and ``content_hash``; only 200 responses no larger than
+    ``max_page_bytes`` are cached.
+    """
+    
+    def __init__(self,
+                 max_bytes: int,
+                 ttl: float,
+                 max_page_bytes: Optional[int] = None,
+                 shared_url: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_page_bytes = max_page_bytes or max_bytes
+        self.shared: Optional[RedisCache] = None
+        if shared_url:
+            try:
+                self.shared = RedisCache(shared_url, namespace="fetch", ttl=ttl)
+            except ImportError:
+                logger.warning("redis is not installed, the fetch cache is in-process only")
+        self._pages: "OrderedDict[str, Tuple[Page, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._flights: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._coalesced = 0
+    
+    async def fetch(self, url: str, fetch: Callable[[], Awaitable[Page]]) -> Tuple[Page, str]:
+        """The page of ``url`` and where it came from: "network", "cache" or "coalesced".
+        
+        ``fetch()`` is only awaited when the page is neither cached nor
+        already being fetched. If the caller doing the fetch is cancelled,
+        the callers waiting on it start a fetch of their own.
+        """
+        while True:
+            page = self._get_local(url)
+            if page is None and self.shared is not None:
+                page = await asyncio.to_thread(self._get_shared, url)
+            if page is not None:
+                FETCH_SOURCES.labels("cache").inc()
+                return page, "cache"
+            
+            with self._lock:
+                flight = self._flights.get(url)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[url] = concurrent.futures.Future()
+            
+            if not leader:
+                # Shielded, so a waiter that is cancelled doesn't cancel the flight
+                page = await asyncio.shield(asyncio.wrap_future(flight))
+                if page is None:
+                    continue
+                with self._lock:
+                    self._coalesced += 1
+                FETCH_SOURCES.labels("coalesced").inc()
+                return page, "coalesced"
+            
+            page = None
+            try:
+                page = await fetch()
+                if self.is_cacheable(page):
+                    shared_page = self._set_local(url, page)
+                    if self.shared is not None:
+                        await asyncio.to_thread(self.shared.set, url, shared_page)
+                FETCH_SOURCES.labels("network").inc()
+                return page, "network"
+            finally:
+                # The page is cached before the flight ends, so no caller finds neither
+                with self._lock:
+                    del self._flights[url]
+                flight.set_result(page)
+    
+    def is_cacheable(self, page: Page) -> bool:
+        return page.get("status") == 200 and self.ttl > 0 and page.get("bytes", 0) <= self.max_page_bytes
+    
+    def get(self, url: str) -> Optional[Page]:
+        page = self._get_local(url)
+        if page is None and self.shared is not None:
+            page = self._get_shared(url)
+        return page
+    
+    def set(self, url: str, page: Page):
+        page = self._set_local(url, page)
+        if self.shared is not None:
+            self.shared.set(url, page)
+    
+    def _get_local(self, url: str) -> Optional[Page]:
+        with self._lock:
+            entry = self._pages.get(url)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._discard(url)
+                entry = None
+            if entry is not None:
+                self._pages.move_to_end(url)
+                self._stats.hits += 1
+                return entry[0]
+            self._stats.misses += 1
+        return None
+    
+    def _get_shared(self, url: str) -> Optional[Page]:
+        page = self.shared.get(url)
+        if page is not None:
+            self._store(url, page)
+        return page
+    
+    def _set_local(self, url: str, page: Page) -> Page:
+        """Cache the page in this process; returns the stored copy, for the shared cache"""
+        page = {key: page.get(key) for key in ("status", "html", "bytes", "error", "final_url", "content_hash")}
+        self._store(url, page)
+        return page
+    
+    def _store(self, url: str, page: Page):
+        size = page.get("bytes") or 0
+        with self._lock:
+            self._discard(url)
+            self._pages[url] = (page, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._pages:
+                _, (_, evicted, _) = self._pages.popitem(last=False)
+                self._bytes -= evicted
+                self._stats.evictions += 1
+    
+    def _discard(self, url: str):
+        entry = self._pages.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+    
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._stats.as_dict()
+        stats.update({
+            "size": len(self._pages),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._flights),
+            "backend": "memory"
+        })
+        if self.shared is not None:
+            return {"local": stats, "shared": self.shared.stats()}
+        return stats
+
+fetch_cache = register_cache("fetch", FetchCache(
+    max_bytes=settings.fetch_cache_max_bytes,
+    ttl=settings.fetch_cache_ttl,
+    max_page_bytes=settings.fetch_cache_max_page_bytes,
+    shared_url=settings.cache_redis_url if settings.fetch_cache_shared else None
+))
\ No newline at end of file
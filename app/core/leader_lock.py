@@ -0,0 +1,104 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from typing import Optional
+import logging
+import os
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class LeaderLock:
+    """A non-blocking lock that elects one process among API instances.
+    
+    PostgreSQL uses a session advisory lock and MySQL ``GET_LOCK``, both held
+    on a dedicated connection, so a crashed leader releases the lock when its
+    connection drops. File-based SQLite locks a file next to the database,
+    which covers several workers on one host. Other databases (and in-memory
+    SQLite) have a single process by construction, which is always leader.
+    """
+    
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.name = name
+        self.key = zlib.crc32(name.encode())
+        self._connection = None
+        self._file = None
+        self.held = False
+    
+    def try_acquire(self) -> bool:
+        """Take the lock if it is free; returns whether this process holds it"""
+        if self.held:
+            return self.is_held()
+        
+        dialect = self.engine.dialect.name
+        try:
+            if dialect == "postgresql":
+                self.held = self._acquire_on_connection("SELECT pg_try_advisory_lock(:key)", {"key": self.key})
+            elif dialect == "mysql":
+                self.held = self._acquire_on_connection("SELECT GET_LOCK(:name, 0)", {"name": self.name})
+            else:
+                self.held = self._acquire_file()
+        except Exception as e:
+            logger.warning(f"Could not acquire leader lock '{self.name}': {e}")
+            self.release()
+        return self.held
+    
+    def is_held(self) -> bool:
+        """Whether the lock is still held; a dropped lock connection loses it"""
+        if self.held and self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+            except Exception as e:
+                logger.warning(f"Lost leader lock '{self.name}': {e}")
+                self.release()
+        return self.held
+    
+    def release(self):
+        if self._connection is not None:
+            try:
+                if self.held and self.engine.dialect.name == "postgresql":
+                    self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                elif self.held and self.engine.dialect.name == "mysql":
+                    self._connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.name})
+            except Exception:
+                pass
+            self._connection.close()
+            self._connection = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.held = False
+    
+    def _acquire_on_connection(self, statement: str, parameters: dict) -> bool:
+        # AUTOCOMMIT so the held connection doesn't sit idle in a transaction
+        connection = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        if connection.execute(text(statement), parameters).scalar():
+            self._connection = connection
+            return True
+        connection.close()
+        return False
+    
+    def _acquire_file(self) -> bool:
+        path = self._lock_path()
+        if path is None or fcntl is None:
+            return True
+        
+        lock_file = open(path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+    
+    def _lock_path(self) -> Optional[str]:
+        database = self.engine.url.database
+        if self.engine.dialect.name != "sqlite" or not database or database == ":memory:":
+            return None
+        return f"{os.path.abspath(database)}.{self.name}.lock"
\ No newline at end of file
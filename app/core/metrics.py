@@ -0,0 +1,266 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Set, Tuple
+import math
+
+# Counters and histograms are plain attribute updates without locks: under the
+# GIL a rare lost update from concurrent threads is an acceptable trade for
+# keeping instrumentation off the crawler's hot path. Children are created
+# once per label set and reused, so recording is a dict lookup plus an add.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+class _CounterChild:
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1):
+        self.value += amount
+    
+    def set_total(self, value: float):
+        """Mirror a cumulative count kept elsewhere (pool or cache statistics)"""
+        self.value = value
+
+class _GaugeChild:
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1):
+        self.value += amount
+    
+    def dec(self, amount: float = 1):
+        self.value -= amount
+    
+    def set(self, value: float):
+        self.value = value
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+    
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * len(upper_bounds)
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+class _Metric:
+    type_name = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+        REGISTRY.append(self)
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values) -> object:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def clear(self):
+        self._children.clear()
+        if not self.labelnames:
+            self._default = self.labels()
+    
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ] + self.samples()
+
+class Counter(_Metric):
+    type_name = "counter"
+    
+    def _new_child(self):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+    
+    def set_total(self, value: float):
+        self._default.set_total(value)
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+class Gauge(_Metric):
+    type_name = "gauge"
+    
+    def _new_child(self):
+        return _GaugeChild()
+    
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+    
+    def dec(self, amount: float = 1):
+        self._default.dec(amount)
+    
+    def set(self, value: float):
+        self._default.set(value)
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+class Histogram(_Metric):
+    type_name = "histogram"
+    
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+    
+    def observe(self, value: float):
+        self._default.observe(value)
+    
+    def samples(self) -> List[str]:
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for upper_bound, count in zip(self.upper_bounds, list(child.counts)):
+                cumulative += count
+                labels = _format_labels(bucket_labels, key + (_format_value(upper_bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class LabelLimiter:
+    """Caps the distinct values of an open-ended label such as a host.
+    
+    The first ``max_values`` values seen keep their own series; later ones
+    are all recorded under ``overflow`` so a crawl of many hosts can't grow
+    the registry without bound.
+    """
+    
+    def __init__(self, max_values: int, overflow: str = "other"):
+        self.max_values = max_values
+        self.overflow = overflow
+        self._values: Set[str] = set()
+    
+    def __call__(self, value: str) -> str:
+        if value in self._values:
+            return value
+        if len(self._values) >= self.max_values:
+            return self.overflow
+        self._values.add(value)
+        return value
+    
+    def clear(self):
+        self._values.clear()
+
+REGISTRY: List[_Metric] = []
+_collectors: List[Callable[[], None]] = []
+
+def register_collector(collector: Callable[[], None]):
+    """Register a callback that refreshes gauges from other sources before each scrape"""
+    _collectors.append(collector)
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    for collector in _collectors:
+        collector()
+    
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Crawl pipeline
+FETCH_DURATION = Histogram(
+    "crawler_fetch_duration_seconds", "Time from request start to full response body, per host", ["host"]
+)
+RESPONSES = Counter(
+    "crawler_responses_total", "Fetched responses by host and HTTP status ('error' for failed requests)",
+    ["host", "status"]
+)
+BYTES_DOWNLOADED = Counter("crawler_bytes_downloaded_total", "Response body bytes downloaded, per host", ["host"])
+PARSE_DURATION = Histogram("crawler_parse_duration_seconds", "Time spent parsing HTML documents")
+EXTRACT_DURATION = Histogram("crawler_extract_duration_seconds", "Time spent applying extraction rules to a document")
+QUEUE_DEPTH = Gauge("crawler_queue_depth", "URLs waiting for a free crawler slot")
+IN_FLIGHT = Gauge("crawler_in_flight_requests", "Requests currently being fetched")
+FETCH_SOURCES = Counter(
+    "crawler_fetch_source_total", "Pages by where they came from (network, cache, coalesced)", ["source"]
+)
+ROBOTS_CACHE = Counter("crawler_robots_cache_total", "robots.txt lookups by cache result", ["result"])
+DB_WRITE_DURATION = Histogram("crawler_db_write_batch_duration_seconds", "Time to persist one batch of crawl results")
+DB_WRITE_ROWS = Counter("crawler_db_write_rows_total", "Crawl results persisted")
+
+# Dispatcher shared by all running jobs
+# (not labelled by user: ids would leak, and each user would add a series)
+DISPATCH_QUEUE_WAIT = Histogram(
+    "crawler_dispatch_queue_wait_seconds", "Time a job's next URL waited for a crawl slot"
+)
+DISPATCH_IN_FLIGHT = Gauge("crawler_dispatch_in_flight_requests", "Crawl slots in use")
+DISPATCH_PENDING_URLS = Gauge("crawler_dispatch_pending_urls", "URLs of running jobs not yet dispatched")
+DISPATCH_ACTIVE_JOBS = Gauge("crawler_dispatch_active_jobs", "Jobs with URLs pending or in flight")
+
+# Scheduler
+SCHEDULER_LEADER = Gauge("scheduler_leader", "1 while this instance holds the crawl scheduler leader lock")
+SCHEDULER_RUNS = Counter("scheduler_runs_total", "Scheduled crawl runs by result (started, skipped)", ["result"])
+
+# API
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "API request latency by route template", ["method", "route", "status"]
+)
+PASSWORD_QUEUE_DEPTH = Gauge("auth_password_queue_depth", "Password hash operations queued or running")
+PROGRESS_SUBSCRIBERS = Gauge("progress_stream_subscribers", "Clients following job progress streams")
+PROGRESS_FEEDS = Gauge("progress_stream_feeds", "Jobs with an active progress feed, shared by their subscribers")
+
+# Webhooks
+WEBHOOK_DELIVERIES = Counter("webhook_deliveries_total", "Webhook delivery attempts by result (delivered, retried, failed)", ["result"])
+WEBHOOK_BATCH_SIZE = Histogram("webhook_batch_size", "Events sent per webhook request", buckets=(1, 2, 5, 10, 25, 50, 100, 250))
+
+# Refreshed from the pool and cache statistics at scrape time
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out_connections", "Connections checked out of the pool", ["engine"])
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Pool checkouts", ["engine"])
+DB_POOL_WAIT = Counter("db_pool_checkout_wait_seconds_total", "Time spent waiting for pool checkouts", ["engine"])
+DB_POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Pool checkouts that timed out", ["engine"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
\ No newline at end of file
@@ -0,0 +1,133 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from .data_extractor import DataExtractor
+import datetime
+import gzip
+import hashlib
+import mmap
+import os
+import socket
+import threading
+import uuid
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+def warc_record(url: str, body: bytes, digest: str, archived_at: datetime.datetime) -> bytes:
+    """One gzip member holding a WARC resource record, so records can be read on their own"""
+    headers = [
+        "WARC/1.1",
+        "WARC-Type: resource",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {archived_at.strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        f"WARC-Target-URI: {url}",
+        f"WARC-Block-Digest: sha256:{digest}",
+        "Content-Type: text/html; charset=utf-8",
+        f"Content-Length: {len(body)}"
+    ]
+    record = ("\r\n".join(headers) + "\r\n\r\n").encode() + body + b"\r\n\r\n"
+    return gzip.compress(record, compresslevel=6)
+
+def parse_warc_record(data: bytes) -> Tuple[Dict[str, str], bytes]:
+    """Headers and block of a record written by ``warc_record``"""
+    record = gzip.decompress(data)
+    head, _, rest = record.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode().split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+    return headers, rest[:int(headers["Content-Length"])]
+
+class PageArchive:
+    """Raw HTML of crawled pages in append-only, gzip-per-record WARC files.
+    
+    Each process appends to its own segment, named after host and pid, so
+    API instances and shard workers never write the same file; a segment
+    is closed at ``segment_bytes``. Records are read back by offset through
+    memory-mapped segments, without reading whole files.
+    """
+    
+    def __init__(self, root: str, segment_bytes: int = 1024 ** 3):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._segment: Optional[str] = None
+        self._file = None
+        self._maps: Dict[str, mmap.mmap] = {}
+    
+    def write(self, url: str, body: bytes, digest: str) -> Tuple[str, int, int]:
+        """Append a page; returns its segment, offset and length"""
+        record = warc_record(url, body, digest, datetime.datetime.utcnow())
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.segment_bytes:
+                self._open_segment()
+            offset = self._file.tell()
+            self._file.write(record)
+            self._file.flush()
+            return self._segment, offset, len(record)
+    
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.root, exist_ok=True)
+        stamp = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        self._segment = f"{stamp}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.warc.gz"
+        self._file = open(os.path.join(self.root, self._segment), "ab")
+    
+    def read(self, segment: str, offset: int, length: int) -> bytes:
+        """The HTML body of one record, as written"""
+        with self._lock:
+            data = self._map(segment, offset + length)[offset:offset + length]
+        return parse_warc_record(data)[1]
+    
+    def _map(self, segment: str, needed: int) -> mmap.mmap:
+        mapped = self._maps.get(segment)
+        # A segment still being written may have grown since it was mapped
+        if mapped is None or len(mapped) < needed:
+            if mapped is not None:
+                mapped.close()
+            with open(os.path.join(self.root, segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+# Archives opened by re-extraction worker processes, kept across chunks
+_worker_archives: Dict[str, PageArchive] = {}
+
+def extract_archived_pages(root: str,
+                           pages: Iterable[Tuple[str, str, int, int]],
+                           rules: Dict[str, str]) -> List[Dict]:
+    """Run extraction rules over archived pages of (url, segment, offset, length).
+    
+    Module-level so it can run in a process pool; results look like the
+    crawler's, without network timings, final URL or content hash.
+    """
+    archive = _worker_archives.get(root)
+    if archive is None:
+        archive = _worker_archives[root] = PageArchive(root)
+    extractor = DataExtractor()
+    
+    results = []
+    for url, segment, offset, length in pages:
+        try:
+            body = archive.read(segment, offset, length)
+        except Exception as e:
+            results.append({
+                "url": url, "error": f"Archived page unreadable: {e}", "error_class": "archive", "data": {}, "bytes": 0
+            })
+            continue
+        result = extractor.extract_data(body.decode("utf-8"), url, rules)
+        # Only successful fetches are archived
+        result["http_status"] = 200
+        result["error_class"] = "parse" if result.get("error") else None
+        result["bytes"] = len(body)
+        results.append(result)
+    return results
\ No newline at end of file
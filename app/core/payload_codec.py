@@ -0,0 +1,89 @@
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# "json" keeps payloads in the plain JSON column; the others store a compressed blob
+STORAGE_FORMATS = ("json", "zlib", "zstd")
+
+ZSTD_LEVEL = 3
+MAX_CACHED_DICTIONARIES = 64
+
+_local = threading.local()
+
+class PayloadCodecError(ValueError):
+    """Raised when a payload cannot be encoded or decoded with the requested codec"""
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+def _require_zstd():
+    if zstandard is None:
+        raise PayloadCodecError("The zstd storage format requires the 'zstandard' package")
+
+def _zstd_dict(dictionary: Optional[bytes]):
+    return zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+
+def _zstd_compressor(dictionary: Optional[bytes]):
+    # zstandard (de)compressors are not safe for concurrent use, so they are
+    # cached per thread, keyed by the dictionary they were built with
+    compressors = _local.__dict__.setdefault("compressors", {})
+    if dictionary not in compressors:
+        if len(compressors) >= MAX_CACHED_DICTIONARIES:
+            compressors.clear()
+        compressors[dictionary] = zstandard.ZstdCompressor(
+            level=ZSTD_LEVEL, dict_data=_zstd_dict(dictionary)
+        )
+    return compressors[dictionary]
+
+def _zstd_decompressor(dictionary: Optional[bytes]):
+    decompressors = _local.__dict__.setdefault("decompressors", {})
+    if dictionary not in decompressors:
+        if len(decompressors) >= MAX_CACHED_DICTIONARIES:
+            decompressors.clear()
+        decompressors[dictionary] = zstandard.ZstdDecompressor(dict_data=_zstd_dict(dictionary))
+    return decompressors[dictionary]
+
+def encode_payload(data: Dict[str, Any], codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    """Serialize extracted data to a compressed blob"""
+    raw = _dumps(data)
+    if codec == "zlib":
+        return zlib.compress(raw, 6)
+    if codec == "zstd":
+        _require_zstd()
+        return _zstd_compressor(dictionary).compress(raw)
+    raise PayloadCodecError(f"Unknown payload codec: {codec}")
+
+def decode_payload(payload: bytes, codec: str, dictionary: Optional[bytes] = None) -> Dict[str, Any]:
+    """Inverse of ``encode_payload``"""
+    if codec == "zlib":
+        raw = zlib.decompress(payload)
+    elif codec == "zstd":
+        _require_zstd()
+        raw = _zstd_decompressor(dictionary).decompress(payload)
+    else:
+        raise PayloadCodecError(f"Unknown payload codec: {codec}")
+    return json.loads(raw)
+
+def train_dictionary(samples: List[Dict[str, Any]], size: int) -> Optional[bytes]:
+    """Train a zstd dictionary on sample payloads of one job.
+    
+    Payloads of the same job share field names, link structures and
+    boilerplate text, which a dictionary captures once instead of per row.
+    Returns None when there are too few samples to train on.
+    """
+    _require_zstd()
+    try:
+        trained = zstandard.train_dictionary(size, [_dumps(sample) for sample in samples])
+    except zstandard.ZstdError as e:
+        logger.info(f"Could not train zstd dictionary from {len(samples)} samples: {e}")
+        return None
+    return trained.as_bytes()
\ No newline at end of file
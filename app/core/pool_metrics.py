@@ -0,0 +1,90 @@
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Any, Dict
+import threading
+import time
+
+class PoolMetrics:
+    """Checkout counts and wait times of one connection pool"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self._lock = threading.Lock()
+    
+    def record_checkout(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "average_wait_ms": self.wait_seconds_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000
+        }
+
+class _TimedPoolMixin:
+    """Times each checkout: waiting for a free connection, or opening a new one"""
+    
+    metrics = None
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+    
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+_registry: Dict[str, Any] = {}
+
+def attach_pool_metrics(engine, name: str):
+    """Start recording checkout metrics for an engine created with a timed pool class"""
+    pool = engine.pool
+    if isinstance(pool, _TimedPoolMixin):
+        pool.metrics = PoolMetrics(name)
+    _registry[name] = engine
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Current usage and checkout metrics of every registered engine's pool"""
+    stats = {}
+    for name, engine in _registry.items():
+        pool = engine.pool
+        pool_stats = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            pool_stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "idle": pool.checkedin()
+            })
+        if getattr(pool, "metrics", None) is not None:
+            pool_stats.update(pool.metrics.as_dict())
+        stats[name] = pool_stats
+    return stats
\ No newline at end of file
@@ -0,0 +1,236 @@
+from .metrics import PROGRESS_FEEDS, PROGRESS_SUBSCRIBERS
+from ..config import settings
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+import asyncio
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a job makes no more progress
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Reads a job's status and counters from the database; None if the job is gone
+ProgressLoader = Callable[[int], Awaitable[Optional[Dict[str, Any]]]]
+
+class JobProgress:
+    """Live counters of a job crawled by this process, written by its crawl thread"""
+    
+    __slots__ = ("status", "done", "failed", "bytes_downloaded")
+    
+    def __init__(self, done: int = 0, failed: int = 0, bytes_downloaded: int = 0):
+        self.status = "running"
+        self.done = done
+        self.failed = failed
+        self.bytes_downloaded = bytes_downloaded
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "done": self.done,
+            "failed": self.failed,
+            "bytes_downloaded": self.bytes_downloaded
+        }
+
+class _Feed:
+    """The one upstream of a job's progress, fanned out to all of its subscribers"""
+    
+    def __init__(self, job_id: int, total_urls: int, loop: asyncio.AbstractEventLoop):
+        self.job_id = job_id
+        self.total_urls = total_urls
+        self.loop = loop
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.changed = asyncio.Event()
+        self.notified = False
+        self.last: Optional[Dict[str, Any]] = None
+        self.samples: Deque[Tuple[float, int]] = collections.deque()
+        self.task: Optional[asyncio.Task] = None
+
+class ProgressHub:
+    """In-process pub/sub of crawl job progress.
+    
+    Crawl threads update a job's counters as results arrive (``start``,
+    ``record``, ``finish``); that costs no database work. Every job that
+    is being watched has one feed task on the event loop, however many
+    clients subscribe. It wakes when the counters change, at most every
+    ``interval`` seconds, and sends each subscriber the latest snapshot
+    with rate and ETA. Jobs crawled by another process (other API
+    instances, shard workers) have no local counters; their feed reads
+    the database through the subscriber's loader every ``poll_interval``
+    seconds instead, once per job rather than once per client.
+    """
+    
+    def __init__(self, interval: float = 0.5, poll_interval: float = 2.0, rate_window: float = 10.0):
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.rate_window = rate_window
+        self._jobs: Dict[int, JobProgress] = {}
+        self._feeds: Dict[int, _Feed] = {}
+        self._lock = threading.Lock()
+    
+    def start(self, job_id: int, done: int = 0, failed: int = 0, bytes_downloaded: int = 0):
+        """Track a job this process starts crawling, from its current totals"""
+        with self._lock:
+            self._jobs[job_id] = JobProgress(done, failed, bytes_downloaded)
+        self._notify(job_id)
+    
+    def record(self, job_id: int, successful: bool, bytes_downloaded: int = 0):
+        """Count one finished URL of a tracked job"""
+        with self._lock:
+            progress = self._jobs.get(job_id)
+            if progress is None:
+                return
+            progress.done += 1
+            progress.failed += 0 if successful else 1
+            progress.bytes_downloaded += bytes_downloaded
+        self._notify(job_id)
+    
+    def set_status(self, job_id: int, status: str):
+        with self._lock:
+            progress = self._jobs.get(job_id)
+            if progress is None:
+                return
+            progress.status = status
+        self._notify(job_id)
+    
+    def finish(self, job_id: int):
+        """Stop tracking a job; its feed reads the final status from the database"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+        self._notify(job_id)
+    
+    def _notify(self, job_id: int):
+        feed = self._feeds.get(job_id)
+        # One wakeup per interval, however many results arrive meanwhile
+        if feed is not None and not feed.notified:
+            feed.notified = True
+            feed.loop.call_soon_threadsafe(feed.changed.set)
+    
+    async def subscribe(self,
+                        job_id: int,
+                        total_urls: int,
+                        loader: ProgressLoader,
+                        heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield snapshots of a job's progress as it changes, ending after its final status.
+        
+        Yields None after ``heartbeat`` seconds without a change, so
+        callers can keep idle connections alive.
+        """
+        feed = self._feeds.get(job_id)
+        if feed is None or feed.task.done():
+            feed = self._feeds[job_id] = _Feed(job_id, total_urls, asyncio.get_running_loop())
+            feed.task = asyncio.create_task(self._run_feed(feed, loader))
+            PROGRESS_FEEDS.set(len(self._feeds))
+        
+        # Only the latest snapshot matters; slow clients skip intermediate ones
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if feed.last is not None:
+            queue.put_nowait((feed.last, False))
+        feed.subscribers.add(queue)
+        PROGRESS_SUBSCRIBERS.inc()
+        try:
+            while True:
+                try:
+                    snapshot, final = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield snapshot
+                if final:
+                    return
+        finally:
+            PROGRESS_SUBSCRIBERS.dec()
+            feed.subscribers.discard(queue)
+            if not feed.subscribers:
+                # Dropped as it is cancelled, so the next subscriber starts
+                # a new feed rather than joining one that is shutting down
+                if self._feeds.get(job_id) is feed:
+                    del self._feeds[job_id]
+                    PROGRESS_FEEDS.set(len(self._feeds))
+                feed.task.cancel()
+    
+    async def _run_feed(self, feed: _Feed, loader: ProgressLoader):
+        try:
+            while feed.subscribers:
+                feed.notified = False
+                feed.changed.clear()
+                
+                with self._lock:
+                    progress = self._jobs.get(feed.job_id)
+                    counters = progress.snapshot() if progress is not None else None
+                if counters is None:
+                    counters = await loader(feed.job_id)
+                
+                snapshot = self._snapshot(feed, counters)
+                final = snapshot["status"] in FINAL_STATUSES or snapshot["status"] == "deleted"
+                if snapshot != feed.last or final:
+                    feed.last = snapshot
+                    self._broadcast(feed, snapshot, final)
+                if final:
+                    return
+                
+                # Coalesce bursts of updates, then wait for the next change
+                await asyncio.sleep(self.interval)
+                timeout = self.poll_interval if progress is None else max(self.rate_window / 2, self.interval)
+                try:
+                    await asyncio.wait_for(feed.changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Progress feed of crawl job {feed.job_id} failed: {e}")
+        finally:
+            if self._feeds.get(feed.job_id) is feed:
+                del self._feeds[feed.job_id]
+            PROGRESS_FEEDS.set(len(self._feeds))
+    
+    def _snapshot(self, feed: _Feed, counters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Counters with totals, a rate over the last ``rate_window`` seconds and an ETA"""
+        if counters is None:
+            return {"job_id": feed.job_id, "status": "deleted"}
+        
+        now = time.monotonic()
+        done = counters["done"]
+        feed.samples.append((now, done))
+        # Keep one sample at or before the window's start to measure against
+        while len(feed.samples) > 2 and feed.samples[1][0] <= now - self.rate_window:
+            feed.samples.popleft()
+        started_at, started_done = feed.samples[0]
+        rate = (done - started_done) / (now - started_at) if now > started_at else 0.0
+        
+        remaining = max(feed.total_urls - done, 0)
+        if counters["status"] in FINAL_STATUSES or not remaining:
+            eta = 0.0
+        else:
+            eta = round(remaining / rate, 1) if rate > 0 else None
+        
+        return {
+            "job_id": feed.job_id,
+            "status": counters["status"],
+            "total_urls": feed.total_urls,
+            "done": done,
+            "failed": counters["failed"],
+            "bytes_downloaded": counters["bytes_downloaded"],
+            "rate": round(rate, 2),
+            "eta_seconds": eta,
+            "percentage": round(done / feed.total_urls * 100, 1) if feed.total_urls else 0.0
+        }
+    
+    @staticmethod
+    def _broadcast(feed: _Feed, snapshot: Dict[str, Any], final: bool):
+        for queue in feed.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((snapshot, final))
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "tracked_jobs": len(self._jobs),
+            "feeds": len(self._feeds),
+            "subscribers": sum(len(feed.subscribers) for feed in list(self._feeds.values()))
+        }
+
+progress_hub = ProgressHub(settings.progress_interval, settings.progress_poll_seconds)
\ No newline at end of file
@@ -2,16 +2,28 @@ import requests
 import certifi
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urljoin, urlparse
-from typing import Dict, Optional
+from typing import Optional
+from .cache import LRUCache
+from .metrics import ROBOTS_CACHE
+from ..config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class RobotsChecker:
+    """robots.txt rules per host, kept for ``robots_cache_ttl`` seconds.
+    
+    A missing robots.txt (4xx) allows every URL of the host. One that could
+    not be read (network error, 5xx) allows them too, but only for
+    ``robots_failure_ttl`` seconds before it is tried again.
+    """
+    
     def __init__(self, user_agent: str = "*", verify_ssl: bool = True):
         self.user_agent = user_agent
         self.verify_ssl = verify_ssl
-        self.robots_cache: Dict[str, RobotFileParser] = {}
+        self.robots_cache = LRUCache(maxsize=settings.robots_cache_size, ttl=settings.robots_cache_ttl)
         
         # Configure requests session with SSL
         self.session = requests.Session()
@@ -23,31 +35,39 @@ class RobotsChecker:
             import urllib3
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     
-    def can_crawl(self, url: str) -> bool:
-        """Check if URL can be crawled according to robots.txt"""
+    def is_cached(self, url: str) -> bool:
+        """Whether ``can_crawl`` can answer for this URL without fetching robots.txt"""
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}" in self.robots_cache
+    
+    def can_crawl(self, url: str, user_agent: Optional[str] = None) -> bool:
+        """Check if URL can be crawled according to robots.txt, as ``user_agent`` (default: the checker's)"""
         try:
             parsed_url = urlparse(url)
             base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
             
-            if base_url not in self.robots_cache:
-                self._load_robots_txt(base_url)
+            robots_parser = self.robots_cache.get(base_url, _MISSING)
+            if robots_parser is not _MISSING:
+                ROBOTS_CACHE.labels("hit").inc()
+            else:
+                ROBOTS_CACHE.labels("miss").inc()
+                robots_parser = self._load_robots_txt(base_url)
             
-            robots_parser = self.robots_cache.get(base_url)
             if robots_parser:
-                can_fetch = robots_parser.can_fetch(self.user_agent, url)
+                can_fetch = robots_parser.can_fetch(user_agent or self.user_agent, url)
                 logger.info(f"Robots.txt check for {url}: {'ALLOWED' if can_fetch else 'BLOCKED'}")
                 return can_fetch
             
             # If no robots.txt found, allow crawling
             logger.info(f"No robots.txt found for {base_url}, allowing crawl")
             return True
-            
+        
         except Exception as e:
             logger.warning(f"Error checking robots.txt for {url}: {e}")
             return True
     
-    def _load_robots_txt(self, base_url: str):
-        """Load and parse robots.txt for a domain"""
+    def _load_robots_txt(self, base_url: str) -> Optional[RobotFileParser]:
+        """Load, parse and cache robots.txt for a domain; None when there is none to apply"""
         try:
             robots_url = urljoin(base_url, "/robots.txt")
             logger.info(f"Loading robots.txt from: {robots_url}")
@@ -68,16 +88,21 @@ class RobotsChecker:
                 
                 # Parse the content
                 robots_parser.read()
-                self.robots_cache[base_url] = robots_parser
+                self.robots_cache.set(base_url, robots_parser)
                 
                 logger.info(f"Successfully loaded robots.txt for {base_url}")
-            else:
-                logger.info(f"No robots.txt found for {base_url} (HTTP {response.status_code})")
-                self.robots_cache[base_url] = None
-                
+                return robots_parser
+            
+            logger.info(f"No robots.txt found for {base_url} (HTTP {response.status_code})")
+            # Server errors are transient; a missing robots.txt is not
+            self.robots_cache.set(
+                base_url, None, ttl=settings.robots_failure_ttl if response.status_code >= 500 else None
+            )
+        
         except Exception as e:
             logger.warning(f"Failed to load robots.txt from {base_url}: {e}")
-            self.robots_cache[base_url] = None
+            self.robots_cache.set(base_url, None, ttl=settings.robots_failure_ttl)
+        return None
     
     def get_robots_content(self, base_url: str) -> Optional[str]:
         """Get the raw robots.txt content for debugging"""
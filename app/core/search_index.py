@@ -0,0 +1,62 @@
+from sqlalchemy import text
+from typing import Any, Iterator
+
+# Full-text index of extracted data, keyed by ExtractedData id. It is created
+# with dialect-specific DDL (an FTS5 virtual table on SQLite, a tsvector
+# column with a GIN index on Postgres), so it is not part of the ORM metadata.
+SEARCH_TABLE = "extracted_data_search"
+SEARCH_DIALECTS = ("sqlite", "postgresql")
+
+SQLITE_DDL = [
+    # Stemmed and case/diacritic-folded; the document text is kept for deletes
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "document, crawl_job_id UNINDEXED, tokenize = 'porter unicode61 remove_diacritics 2')",
+]
+
+POSTGRESQL_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    "extracted_data_id INTEGER PRIMARY KEY, crawl_job_id INTEGER NOT NULL, document TSVECTOR NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING gin (document)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_crawl_job_id ON {SEARCH_TABLE} (crawl_job_id)",
+]
+
+def create_search_index(target, connection, **kw):
+    """Create the search index for the connection's dialect; other databases get none.
+    
+    Has the signature of a table ``after_create`` event, so ``create_all``
+    builds the index along with the extracted_data table.
+    """
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRESQL_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+def drop_search_index(target, connection, **kw):
+    if connection.dialect.name in SEARCH_DIALECTS:
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+def include_name(name: str, type_: str, parent_names) -> bool:
+    """Alembic filter that leaves the search index (and FTS5's shadow tables) out of autogenerate"""
+    return not (type_ == "table" and name is not None and name.startswith(SEARCH_TABLE))
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+def document_text(data: Any) -> str:
+    """The searchable text of extracted data: every string field, nested ones included"""
+    return "\n".join(value.strip() for value in _strings(data) if value.strip())
+
+def sqlite_match_query(query: str) -> str:
+    """An FTS5 query matching rows that contain all words of ``query``.
+    
+    Each word is quoted, so FTS5 operators and punctuation in user input are
+    searched for as text rather than parsed. Empty when no word is left.
+    """
+    terms = [term.replace('"', '""') for term in query.split() if any(char.isalnum() for char in term)]
+    return " AND ".join(f'"{term}"' for term in terms)
\ No newline at end of file
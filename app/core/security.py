@@ -1,17 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..config import settings
+import asyncio
+import threading
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps the
+# event loop responsive without the overhead of a process pool
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
+_password_pending = 0
+_password_pending_lock = threading.Lock()
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many password operations are already queued"""
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def _run_password_work(func: Callable[..., T], *args) -> T:
+    """Run a bcrypt operation on the password pool instead of the event loop.
+    
+    At most ``password_hash_max_pending`` operations may be queued or running
+    at once; beyond that PasswordHashingBusy is raised so a login storm is
+    shed instead of queueing without bound.
+    """
+    global _password_pending
+    with _password_pending_lock:
+        if _password_pending >= settings.password_hash_max_pending:
+            raise PasswordHashingBusy()
+        _password_pending += 1
+    
+    try:
+        future = _password_executor.submit(func, *args)
+    except BaseException:
+        _release_password_slot()
+        raise
+    # Released when the work itself ends, not when the caller stops waiting:
+    # a cancelled request leaves its hash running or queued on the pool
+    future.add_done_callback(_release_password_slot)
+    return await asyncio.wrap_future(future)
+
+def _release_password_slot(future=None):
+    global _password_pending
+    with _password_pending_lock:
+        _password_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_work(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_work(get_password_hash, password)
+
+def get_password_queue_depth() -> int:
+    return _password_pending
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -23,12 +77,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def verify_token(token: str, credentials_exception):
+def decode_token_claims(token: str, credentials_exception) -> dict:
+    """Verify a token and return its claims; ``sub`` is always present"""
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
+        if payload.get("sub") is None:
             raise credentials_exception
-        return email
+        return payload
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+def verify_token(token: str, credentials_exception):
+    return decode_token_claims(token, credentials_exception)["sub"]
\ No newline at end of file
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+from .cache import create_cache
+from ..config import settings
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Lightweight, session-independent copy of the fields request handlers need"""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    is_active: bool = True
+    is_verified: bool = False
+    created_at: Optional[datetime] = None
+    
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            created_at=user.created_at
+        )
+    
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "UserSnapshot":
+        return cls(id=claims["uid"], email=claims["sub"], is_active=claims["act"])
+
+# Verified token subject (email) -> UserSnapshot. Kept in-process and short
+# lived; entries are dropped explicitly when a user is updated or deactivated.
+user_cache = create_cache(
+    "users",
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl
+)
+
+def invalidate_user(email: str):
+    user_cache.delete(email)
\ No newline at end of file
@@ -1,19 +1,98 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .core.pool_metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, attach_pool_metrics
+from typing import Any, AsyncIterator, Dict, Optional
+import os
 
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(
-        settings.database_url, 
-        connect_args={"check_same_thread": False}
+def is_memory_database(url: str) -> bool:
+    return url.split("?")[0].endswith(("://", ":memory:"))
+
+def engine_options(url: str, async_engine: bool = False) -> Dict[str, Any]:
+    """Pool settings for a database URL.
+    
+    In-memory SQLite databases keep SQLAlchemy's single-connection pools,
+    since each new connection would see an empty database.
+    """
+    options: Dict[str, Any] = {}
+    if url.startswith("sqlite") and not async_engine:
+        options["connect_args"] = {"check_same_thread": False}
+    if is_memory_database(url):
+        return options
+    
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if async_engine else TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle
     )
+    return options
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+attach_pool_metrics(engine, "primary")
+
+# Read-only paths (listings, extracted data, reports, exports) can be routed to
+# a replica so analytics reads don't compete with ingestion writes
+if settings.read_database_url:
+    read_engine = create_engine(settings.read_database_url, **engine_options(settings.read_database_url))
+    attach_pool_metrics(read_engine, "replica")
 else:
-    engine = create_engine(settings.database_url)
+    read_engine = engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+# Async drivers for the sync URL schemes, used when ASYNC_DATABASE_URL is unset
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database URL scheme '{scheme}'")
+    return f"{ASYNC_DRIVERS[scheme]}{separator}{rest}"
+
+_async_session_factories: Dict[str, async_sessionmaker] = {}
+
+def _async_session_factory(name: str) -> async_sessionmaker:
+    """Create the async engines on first use, so the driver is only required by the API"""
+    if name not in _async_session_factories:
+        if name == "replica" and settings.read_database_url:
+            url = settings.async_read_database_url or get_async_database_url(settings.read_database_url)
+        elif name == "replica":
+            return _async_session_factory("primary")
+        else:
+            url = settings.async_database_url or get_async_database_url(settings.database_url)
+        
+        async_engine = create_async_engine(url, **engine_options(url, async_engine=True))
+        attach_pool_metrics(async_engine.sync_engine, f"{name}_async")
+        # Objects stay usable after commit; lazy loads would need a greenlet
+        _async_session_factories[name] = async_sessionmaker(
+            bind=async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factories[name]
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_session_factory("primary")()
+
+def AsyncReadSessionLocal() -> AsyncSession:
+    return _async_session_factory("replica")()
+
+async def dispose_async_engines():
+    """Close pooled async connections; their driver threads would otherwise outlive the app"""
+    for factory in set(_async_session_factories.values()):
+        await factory.kw["bind"].dispose()
+    _async_session_factories.clear()
+
 def get_db():
     db = SessionLocal()
     try:
@@ -21,5 +100,48 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """Session for read-only requests; the primary database unless a replica is configured"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_REVISION = "0001"
+
+def migrate_database(database_engine: Optional[Engine] = None):
+    """Upgrade the database to the latest Alembic revision.
+    
+    Databases created by ``create_tables()`` have no version table; they are
+    stamped at head when they already match the models, and at the baseline
+    revision (the original release's tables) otherwise so only the later
+    migrations run.
+    """
+    from alembic import command
+    from alembic.autogenerate import compare_metadata
+    from alembic.config import Config
+    from alembic.migration import MigrationContext
+    from .core.search_index import include_name
+    
+    database_engine = database_engine or engine
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    config.set_main_option(
+        "sqlalchemy.url", database_engine.url.render_as_string(hide_password=False).replace("%", "%%")
+    )
+    config.attributes["configure_logger"] = False
+    
+    table_names = inspect(database_engine).get_table_names()
+    if "crawl_jobs" in table_names and "alembic_version" not in table_names:
+        with database_engine.connect() as connection:
+            context = MigrationContext.configure(connection, opts={"include_name": include_name})
+            up_to_date = not compare_metadata(context, Base.metadata)
+        command.stamp(config, "head" if up_to_date else BASELINE_REVISION)
+    
+    command.upgrade(config, "head")
\ No newline at end of file
@@ -1,33 +1,53 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
-from .core.security import verify_token
-from .services.user_service import UserService
-from .models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db
+from .core.security import decode_token_claims
+from .core.user_cache import UserSnapshot, user_cache
+from .services.user_service import AsyncUserService
+from .config import settings
 
 security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
+    """Resolve the bearer token to a user snapshot.
+    
+    Snapshots are cached per token subject for a short TTL, so polling
+    clients don't cost a user lookup per request. With ``trust_token_claims``
+    enabled, tokens that carry the user id and active flag skip the lookup
+    entirely (deactivation then only takes effect when the token expires).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    email = verify_token(credentials.credentials, credentials_exception)
-    user_service = UserService(db)
-    user = user_service.get_user_by_email(email)
+    claims = decode_token_claims(credentials.credentials, credentials_exception)
+    email = claims["sub"]
+    
+    if settings.trust_token_claims and "uid" in claims and "act" in claims:
+        return UserSnapshot.from_claims(claims)
     
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        user_service = AsyncUserService(db)
+        db_user = await user_service.get_user_by_email(email)
+        
+        if db_user is None:
+            raise credentials_exception
+        
+        user = UserSnapshot.from_user(db_user)
+        user_cache.set(email, user)
+        # The snapshot is detached from the session; release the connection
+        await db.rollback()
     
     return user
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
\ No newline at end of file
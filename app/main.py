@@ -1,16 +1,26 @@
 from http.client import HTTPException
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import logging
 import datetime
+import time
 
-from .api import auth, users, crawl_jobs, reports
-from .database import create_tables
+from .api import auth, users, crawl_jobs, reports, exports, webhooks, search
+from .database import dispose_async_engines, migrate_database
 from .config import settings
+from .core.cache import get_cache_stats
+from .core.pool_metrics import get_pool_stats
+from .core.security import PasswordHashingBusy, get_password_queue_depth
+from .core import metrics
+from .core.user_cache import UserSnapshot
+from .dependencies import get_current_active_user
+from .services.dispatch_service import dispatcher
+from .services.schedule_service import scheduler
+from .services.webhook_service import webhook_sender
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,9 +28,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create tables on startup
-create_tables()
-
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["1000/hour"]
@@ -48,11 +55,72 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def run_migrations():
+    if settings.auto_migrate:
+        migrate_database()
+
+@app.on_event("startup")
+async def start_scheduler():
+    if settings.scheduler_enabled:
+        scheduler.start(crawl_jobs.run_crawl_job_sync)
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await scheduler.stop()
+
+@app.on_event("startup")
+async def start_webhook_sender():
+    if settings.webhooks_enabled:
+        webhook_sender.start()
+
+@app.on_event("shutdown")
+async def stop_webhook_sender():
+    await webhook_sender.stop()
+
+@app.on_event("shutdown")
+async def close_database_connections():
+    await dispose_async_engines()
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    # Unhandled errors propagate past this middleware and are answered with a 500
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so ids don't explode the series
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_DURATION.labels(
+            request.method, route.path if route else "unmatched", status_code
+        ).observe(time.perf_counter() - started)
+
+def collect_runtime_metrics():
+    metrics.PASSWORD_QUEUE_DEPTH.set(get_password_queue_depth())
+    for name, stats in get_pool_stats().items():
+        metrics.DB_POOL_CHECKED_OUT.labels(name).set(stats.get("checked_out", 0))
+        metrics.DB_POOL_CHECKOUTS.labels(name).set_total(stats.get("checkouts", 0))
+        metrics.DB_POOL_WAIT.labels(name).set_total(stats.get("wait_seconds_total", 0.0))
+        metrics.DB_POOL_TIMEOUTS.labels(name).set_total(stats.get("timeouts", 0))
+    for name, stats in get_cache_stats().items():
+        # Tiered caches report their local tier, which sees every lookup
+        stats = stats.get("local", stats)
+        metrics.CACHE_LOOKUPS.labels(name, "hit").set_total(stats["hits"])
+        metrics.CACHE_LOOKUPS.labels(name, "miss").set_total(stats["misses"])
+
+metrics.register_collector(collect_runtime_metrics)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(crawl_jobs.router, prefix="/crawl-jobs", tags=["Crawl Jobs"])
 app.include_router(reports.router, prefix="/reports", tags=["Reports"])
+app.include_router(exports.router, prefix="/exports", tags=["Exports"])
+app.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
+app.include_router(search.router, prefix="/search", tags=["Search"])
 
 @app.get("/")
 async def root():
@@ -73,6 +141,26 @@ async def health_check():
         "timestamp": datetime.datetime.utcnow().isoformat()
     }
 
+@app.get("/cache/stats")
+async def cache_stats(current_user: UserSnapshot = Depends(get_current_active_user)):
+    """Hit rates and sizes of the in-process caches"""
+    return get_cache_stats()
+
+@app.get("/db/pool/stats")
+async def pool_stats(current_user: UserSnapshot = Depends(get_current_active_user)):
+    """Connection pool usage and checkout wait times per database engine"""
+    return get_pool_stats()
+
+@app.get("/dispatch/stats")
+async def dispatch_stats(current_user: UserSnapshot = Depends(get_current_active_user)):
+    """Crawl slots in use, running jobs and undispatched URLs of the current user"""
+    return dispatcher.get_stats(current_user.id)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Crawler, database and API metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/debug/info")
 async def debug_info():
     """Debug endpoint for local development"""
@@ -86,6 +174,14 @@ async def debug_info():
         "rate_limit": f"{settings.rate_limit_requests}/{settings.rate_limit_window}s"
     }
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many authentication requests, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {exc}")
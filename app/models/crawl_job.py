@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, Integer, BigInteger, String, DateTime, Text, ForeignKey, Index, JSON, LargeBinary, event, false
 from sqlalchemy.orm import relationship
 from ..database import Base
+from ..core.payload_codec import decode_payload
+from ..core.search_index import create_search_index, drop_search_index
 import datetime
 
 class CrawlJob(Base):
     __tablename__ = "crawl_jobs"
+    __table_args__ = (
+        # Job listings filter by owner and page by id
+        Index("ix_crawl_jobs_user_id_id", "user_id", "id"),
+        # The scheduler loads the earliest upcoming runs
+        Index("ix_crawl_jobs_next_run_at", "next_run_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -12,8 +20,13 @@ class CrawlJob(Base):
     description = Column(Text)
     target_urls = Column(JSON)
     extraction_rules = Column(JSON)
-    status = Column(String, default="pending")  # pending, running, completed, failed
+    status = Column(String, default="pending", index=True)  # pending, running, paused, completed, failed, cancelled
+    storage_format = Column(String, default="json")  # json, zlib, zstd
+    priority = Column(Integer, nullable=False, default=1, server_default="1")  # 1-10, share of the user's crawl slots
+    archive_pages = Column(Boolean, nullable=False, default=False, server_default=false())  # keep raw HTML for re-extraction
     scheduled_at = Column(DateTime)
+    schedule = Column(String)  # cron expression for recurring jobs
+    next_run_at = Column(DateTime)  # maintained by the scheduler; NULL when nothing is due
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -21,14 +34,146 @@ class CrawlJob(Base):
     
     user = relationship("User", back_populates="crawl_jobs")
     extracted_data = relationship("ExtractedData", back_populates="crawl_job")
+    stats = relationship("CrawlJobStats", back_populates="crawl_job", uselist=False)
 
 class ExtractedData(Base):
     __tablename__ = "extracted_data"
+    __table_args__ = (
+        # Reads, exports and deletes of a job's rows go through (crawl_job_id, id)
+        Index("ix_extracted_data_crawl_job_id_id", "crawl_job_id", "id"),
+        # Status and error breakdowns of reports are counted from this index alone
+        Index("ix_extracted_data_crawl_job_id_outcome", "crawl_job_id", "http_status", "error_class"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"))
     url = Column(String)
-    data = Column(JSON)
+    raw_data = Column("data", JSON)
+    payload = Column(LargeBinary)  # compressed data for jobs with a compressed storage format
+    payload_codec = Column(String)
+    payload_dictionary_id = Column(Integer, ForeignKey("payload_dictionaries.id"))
+    # Outcome of the fetch; NULL on rows stored before these were recorded
+    http_status = Column(Integer)  # NULL when no response was received
+    error_class = Column(String(32))  # http, timeout, ssl, connection, client, parse, archive, other
+    error = Column(Text)
+    bytes = Column(Integer)
+    elapsed_ms = Column(Integer)
+    final_url = Column(String)  # after redirects
+    content_hash = Column(String(64))  # SHA-256 of the response body
     extracted_at = Column(DateTime, default=datetime.datetime.utcnow)
     
-    crawl_job = relationship("CrawlJob", back_populates="extracted_data")
\ No newline at end of file
+    crawl_job = relationship("CrawlJob", back_populates="extracted_data")
+    payload_dictionary = relationship("PayloadDictionary", lazy="selectin")
+    timing = relationship("FetchTiming", uselist=False)
+    
+    @property
+    def data(self):
+        """Extracted fields, decompressed transparently when stored as a payload"""
+        if self.payload is None:
+            return self.raw_data
+        
+        dictionary = self.payload_dictionary.dictionary if self.payload_dictionary else None
+        return decode_payload(self.payload, self.payload_codec, dictionary)
+    
+    @data.setter
+    def data(self, value):
+        self.raw_data = value
+        self.payload = None
+        self.payload_codec = None
+        self.payload_dictionary_id = None
+
+# The full-text index lives outside the metadata; migrations create it as well
+event.listen(ExtractedData.__table__, "after_create", create_search_index)
+event.listen(ExtractedData.__table__, "before_drop", drop_search_index)
+
+class PayloadDictionary(Base):
+    """Compression dictionary trained on the payloads of one crawl job"""
+    __tablename__ = "payload_dictionaries"
+    __table_args__ = (
+        Index("ix_payload_dictionaries_crawl_job_id_codec", "crawl_job_id", "codec"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"))
+    codec = Column(String)
+    dictionary = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class FetchTiming(Base):
+    """Per-stage durations of fetching and processing one URL, in microseconds.
+    
+    Stages a fetch never reached (e.g. body for a failed request) are NULL.
+    """
+    __tablename__ = "fetch_timings"
+    __table_args__ = (
+        Index("ix_fetch_timings_crawl_job_id_host", "crawl_job_id", "host"),
+    )
+    
+    extracted_data_id = Column(Integer, ForeignKey("extracted_data.id"), primary_key=True)
+    crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"))
+    host = Column(String)
+    dns_us = Column(Integer)
+    connect_us = Column(Integer)  # includes the TLS handshake
+    first_byte_us = Column(Integer)
+    body_us = Column(Integer)
+    decode_us = Column(Integer)
+    parse_us = Column(Integer)
+    extract_us = Column(Integer)
+    db_us = Column(Integer)
+
+class ArchivedPage(Base):
+    """Where a fetched page's HTML sits in the raw page archive.
+    
+    Bodies are content-addressed: a page whose hash is already archived
+    points at the existing record instead of writing another one.
+    """
+    __tablename__ = "archived_pages"
+    __table_args__ = (
+        Index("ix_archived_pages_crawl_job_id_id", "crawl_job_id", "id"),
+        Index("ix_archived_pages_content_hash", "content_hash"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"))
+    url = Column(String)
+    content_hash = Column(String(64))  # SHA-256 of the UTF-8 HTML
+    segment = Column(String)  # WARC file, relative to the archive folder
+    offset = Column(BigInteger)
+    length = Column(Integer)  # compressed record size
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class CrawlJobShard(Base):
+    """A slice of a large job's URLs, crawled by one worker task"""
+    __tablename__ = "crawl_job_shards"
+    __table_args__ = (
+        # Job status is aggregated from the shard counts per status
+        Index("ix_crawl_job_shards_crawl_job_id_status", "crawl_job_id", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"))
+    shard_index = Column(Integer)
+    urls = Column(JSON)
+    status = Column(String, default="pending")  # pending, running, completed, failed
+    urls_crawled = Column(Integer, default=0)
+    error = Column(Text)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    lease_expires_at = Column(DateTime)  # renewed while running; a stale running shard can be re-claimed
+    attempt = Column(Integer, default=0)  # claims so far; only the worker of the latest one may renew or finish
+
+class CrawlJobStats(Base):
+    """Running totals for a crawl job, updated in the same transaction as each result batch"""
+    __tablename__ = "crawl_job_stats"
+    
+    crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"), primary_key=True)
+    urls_crawled = Column(Integer, default=0)
+    successful_extractions = Column(Integer, default=0)
+    failed_extractions = Column(Integer, default=0)
+    bytes_downloaded = Column(BigInteger, default=0)
+    elapsed_ms_total = Column(BigInteger, default=0)
+    field_fill_counts = Column(JSON, default=dict)
+    data_version = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    crawl_job = relationship("CrawlJob", back_populates="stats")
\ No newline at end of file
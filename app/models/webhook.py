@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, JSON
+from ..database import Base
+import datetime
+
+class Webhook(Base):
+    """An endpoint told when the user's jobs, or one of them, finish"""
+    __tablename__ = "webhooks"
+    __table_args__ = (
+        Index("ix_webhooks_user_id_id", "user_id", "id"),
+        Index("ix_webhooks_crawl_job_id", "crawl_job_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    crawl_job_id = Column(Integer, ForeignKey("crawl_jobs.id"))  # NULL: every job of the user
+    url = Column(String)
+    secret = Column(String)  # signs each request body with HMAC-SHA256 when set
+    events = Column(JSON)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class WebhookDelivery(Base):
+    """Outbox of webhook events, written in the transaction that finishes the job"""
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # The sender claims pending deliveries in due order
+        Index("ix_webhook_deliveries_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_webhook_deliveries_webhook_id_id", "webhook_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    webhook_id = Column(Integer, ForeignKey("webhooks.id"))
+    event_type = Column(String)
+    payload = Column(JSON)
+    status = Column(String, default="pending")  # pending, delivered, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    delivered_at = Column(DateTime)
\ No newline at end of file
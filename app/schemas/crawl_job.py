@@ -1,6 +1,10 @@
 from pydantic import BaseModel, validator
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from ..core.cron import CronSchedule
+from ..core.payload_codec import STORAGE_FORMATS
+
+MAX_PRIORITY = 10
 
 class CrawlJobBase(BaseModel):
     name: str
@@ -8,6 +12,28 @@ class CrawlJobBase(BaseModel):
     target_urls: List[str]
     extraction_rules: Dict[str, str]
     scheduled_at: Optional[datetime] = None
+    schedule: Optional[str] = None
+    priority: int = 1
+    storage_format: Optional[str] = "json"
+    archive_pages: bool = False
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Times are stored as naive UTC, like the rest of the timestamps"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def validate_priority(value: Optional[int]) -> Optional[int]:
+    if value is not None and not 1 <= value <= MAX_PRIORITY:
+        raise ValueError(f"priority must be between 1 and {MAX_PRIORITY}")
+    return value
+
+def validate_schedule(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = " ".join(value.split())
+    CronSchedule(value)
+    return value
 
 class CrawlJobCreate(CrawlJobBase):
     @validator('target_urls')
@@ -15,6 +41,16 @@ class CrawlJobCreate(CrawlJobBase):
         if not v:
             raise ValueError('At least one URL is required')
         return v
+    
+    _scheduled_at_utc = validator('scheduled_at', allow_reuse=True)(to_utc_naive)
+    _valid_schedule = validator('schedule', allow_reuse=True)(validate_schedule)
+    _valid_priority = validator('priority', allow_reuse=True)(validate_priority)
+    
+    @validator('storage_format')
+    def validate_storage_format(cls, v):
+        if v not in STORAGE_FORMATS:
+            raise ValueError(f"storage_format must be one of: {', '.join(STORAGE_FORMATS)}")
+        return v
 
 class CrawlJobUpdate(BaseModel):
     name: Optional[str] = None
@@ -22,6 +58,13 @@ class CrawlJobUpdate(BaseModel):
     target_urls: Optional[List[str]] = None
     extraction_rules: Optional[Dict[str, str]] = None
     scheduled_at: Optional[datetime] = None
+    schedule: Optional[str] = None
+    priority: Optional[int] = None
+    archive_pages: Optional[bool] = None
+    
+    _scheduled_at_utc = validator('scheduled_at', allow_reuse=True)(to_utc_naive)
+    _valid_schedule = validator('schedule', allow_reuse=True)(validate_schedule)
+    _valid_priority = validator('priority', allow_reuse=True)(validate_priority)
 
 class CrawlJob(CrawlJobBase):
     id: int
@@ -31,15 +74,30 @@ class CrawlJob(CrawlJobBase):
     updated_at: datetime
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    next_run_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+class ReextractRequest(BaseModel):
+    extraction_rules: Optional[Dict[str, str]] = None  # None keeps the job's rules
+
 class ExtractedDataResponse(BaseModel):
     id: int
     url: str
     data: Dict[str, Any]
+    http_status: Optional[int] = None
+    error_class: Optional[str] = None
+    error: Optional[str] = None
+    bytes: Optional[int] = None
+    elapsed_ms: Optional[int] = None
+    final_url: Optional[str] = None
+    content_hash: Optional[str] = None
     extracted_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SearchResult(ExtractedDataResponse):
+    crawl_job_id: int
+    score: float  # relevance to the query, higher is better; comparable within one search only
\ No newline at end of file
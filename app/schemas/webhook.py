@@ -0,0 +1,52 @@
+from pydantic import BaseModel, validator
+from typing import List, Optional
+from datetime import datetime
+from urllib.parse import urlsplit
+
+WEBHOOK_EVENTS = ("job.completed", "job.failed", "job.cancelled")
+
+class WebhookBase(BaseModel):
+    url: str
+    crawl_job_id: Optional[int] = None  # None: every job of the user
+    events: List[str] = list(WEBHOOK_EVENTS)
+
+class WebhookCreate(WebhookBase):
+    secret: Optional[str] = None
+    
+    @validator('url')
+    def validate_url(cls, v):
+        parts = urlsplit(v)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError('url must be an http or https URL')
+        return v
+    
+    @validator('events')
+    def validate_events(cls, v):
+        if not v:
+            raise ValueError('At least one event is required')
+        unknown = set(v) - set(WEBHOOK_EVENTS)
+        if unknown:
+            raise ValueError(f"events must be among: {', '.join(WEBHOOK_EVENTS)}")
+        return sorted(set(v))
+
+class Webhook(WebhookBase):
+    id: int
+    user_id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class WebhookDelivery(BaseModel):
+    id: int
+    webhook_id: int
+    event_type: str
+    status: str
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
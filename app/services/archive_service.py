@@ -0,0 +1,107 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.crawl_job import ArchivedPage
+from ..core.page_archive import PageArchive, content_hash, extract_archived_pages
+from ..config import settings
+from ..database import PROJECT_ROOT
+from typing import Dict, Iterator, List, Optional, Tuple
+from itertools import repeat
+import concurrent.futures
+import datetime
+import multiprocessing
+import os
+
+page_archive = PageArchive(os.path.join(PROJECT_ROOT, settings.archive_folder), settings.archive_segment_bytes)
+
+class ArchiveService:
+    """Raw HTML archive of crawl jobs that have ``archive_pages`` set"""
+    
+    def __init__(self, db: Session, archive: Optional[PageArchive] = None):
+        self.db = db
+        self.archive = archive or page_archive
+    
+    def archive_results(self, job_id: int, results: List[Dict]) -> int:
+        """Archive the ``html`` that crawl results carry, dropping it from them.
+        
+        A body that is already archived, by this job or another one, is not
+        written again. Rows are added to the session; the caller commits.
+        """
+        pages = [(result["url"], result.pop("html")) for result in results if "html" in result]
+        pages = [(url, html.encode("utf-8")) for url, html in pages if html is not None]
+        if not pages:
+            return 0
+        
+        digests = [content_hash(body) for _, body in pages]
+        known = {
+            digest: (segment, offset, length)
+            for digest, segment, offset, length in self.db.query(
+                ArchivedPage.content_hash, ArchivedPage.segment, ArchivedPage.offset, ArchivedPage.length
+            ).filter(ArchivedPage.content_hash.in_(set(digests)))
+        }
+        
+        now = datetime.datetime.utcnow()
+        rows = []
+        for (url, body), digest in zip(pages, digests):
+            location = known.get(digest)
+            if location is None:
+                location = known[digest] = self.archive.write(url, body, digest)
+            segment, offset, length = location
+            rows.append(ArchivedPage(
+                crawl_job_id=job_id,
+                url=url,
+                content_hash=digest,
+                segment=segment,
+                offset=offset,
+                length=length,
+                archived_at=now
+            ))
+        self.db.add_all(rows)
+        return len(rows)
+    
+    def count_pages(self, job_id: int) -> int:
+        return self.db.query(func.count(ArchivedPage.id)).filter(ArchivedPage.crawl_job_id == job_id).scalar()
+    
+    def get_latest_pages(self, job_id: int) -> List[Tuple[str, str, int, int]]:
+        """(url, segment, offset, length) of the most recent copy of each URL the job archived"""
+        latest = self.db.query(func.max(ArchivedPage.id)).filter(
+            ArchivedPage.crawl_job_id == job_id
+        ).group_by(ArchivedPage.url)
+        
+        return [
+            tuple(row) for row in self.db.query(
+                ArchivedPage.url, ArchivedPage.segment, ArchivedPage.offset, ArchivedPage.length
+            ).filter(ArchivedPage.id.in_(latest.scalar_subquery())).order_by(ArchivedPage.id)
+        ]
+    
+    def extract_pages(self,
+                      pages: List[Tuple[str, str, int, int]],
+                      rules: Dict[str, str],
+                      chunk_size: Optional[int] = None,
+                      workers: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Run extraction rules over archived pages, yielding results chunk by chunk in order.
+        
+        Parsing is CPU-bound, so chunks go to a pool of ``workers`` processes
+        (``reextract_workers``, by default one per CPU); each maps the segment
+        files it reads. Closing the iterator early drops chunks not started.
+        """
+        chunk_size = chunk_size or settings.reextract_chunk_size
+        workers = workers or settings.reextract_workers or os.cpu_count() or 1
+        chunks = [pages[start:start + chunk_size] for start in range(0, len(pages), chunk_size)]
+        
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                yield extract_archived_pages(self.archive.root, chunk, rules)
+            return
+        
+        # Spawned, not forked: the API process runs threads that hold locks
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)), mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            yield from pool.map(extract_archived_pages, repeat(self.archive.root), chunks, repeat(rules))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def delete_job_pages(self, job_id: int):
+        """Forget a job's archived pages; their records stay in the append-only segments"""
+        self.db.query(ArchivedPage).filter(ArchivedPage.crawl_job_id == job_id).delete()
\ No newline at end of file
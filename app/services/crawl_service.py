@@ -1,11 +1,28 @@
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..models.crawl_job import CrawlJob, ExtractedData
+from ..models.crawl_job import CrawlJob, CrawlJobShard, CrawlJobStats, ExtractedData, FetchTiming, PayloadDictionary
 from ..schemas.crawl_job import CrawlJobCreate, CrawlJobUpdate
 from ..core.crawler import SimpleCrawler
-from typing import Dict, List, Optional
+from ..core.fetch_cache import fetch_cache
+from ..core.progress import progress_hub
+from ..core.metrics import DB_WRITE_DURATION, DB_WRITE_ROWS
+from ..config import settings
+from .stats_service import StatsService, is_successful_result
+from .payload_service import PayloadService
+from .profile_service import ProfileService
+from .schedule_service import next_run_time
+from .dispatch_service import dispatcher
+from .shard_service import ShardLeaseHeld, ShardService
+from .webhook_service import WebhookService, webhook_sender
+from .archive_service import ArchiveService
+from .search_service import SearchService
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from contextlib import closing
 import asyncio
 import logging
 import datetime
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +37,35 @@ class CrawlService:
             description=crawl_job.description,
             target_urls=crawl_job.target_urls,
             extraction_rules=crawl_job.extraction_rules,
-            scheduled_at=crawl_job.scheduled_at
+            scheduled_at=crawl_job.scheduled_at,
+            schedule=crawl_job.schedule,
+            priority=crawl_job.priority,
+            next_run_at=next_run_time(crawl_job.scheduled_at, crawl_job.schedule, datetime.datetime.utcnow()),
+            storage_format=crawl_job.storage_format,
+            archive_pages=crawl_job.archive_pages
         )
         self.db.add(db_crawl_job)
+        self.db.flush()
+        StatsService(self.db).create_job_stats(db_crawl_job.id)
         self.db.commit()
         self.db.refresh(db_crawl_job)
         return db_crawl_job
     
-    def get_crawl_jobs(self, user_id: int, skip: int = 0, limit: int = 100) -> List[CrawlJob]:
-        return self.db.query(CrawlJob).filter(
-            CrawlJob.user_id == user_id
-        ).offset(skip).limit(limit).all()
+    def get_crawl_jobs(self, 
+                       user_id: int, 
+                       skip: int = 0, 
+                       limit: int = 100, 
+                       after_id: Optional[int] = None) -> List[CrawlJob]:
+        """Return a page of the user's jobs in id order.
+        
+        Pass the last id of a page as ``after_id`` to get the next one; this
+        seeks on the (user_id, id) index instead of scanning past ``skip`` rows.
+        """
+        query = self.db.query(CrawlJob).filter(CrawlJob.user_id == user_id)
+        if after_id is not None:
+            query = query.filter(CrawlJob.id > after_id)
+        
+        return query.order_by(CrawlJob.id).offset(skip).limit(limit).all()
     
     def get_crawl_job(self, job_id: int, user_id: int) -> Optional[CrawlJob]:
         return self.db.query(CrawlJob).filter(
@@ -46,6 +81,8 @@ class CrawlService:
         update_data = job_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(job, field, value)
+        if "scheduled_at" in update_data or "schedule" in update_data:
+            job.next_run_at = next_run_time(job.scheduled_at, job.schedule, datetime.datetime.utcnow())
         
         job.updated_at = datetime.datetime.utcnow()
         self.db.commit()
@@ -53,83 +90,540 @@ class CrawlService:
         return job
     
     def delete_crawl_job(self, job_id: int, user_id: int) -> bool:
-        job = self.get_crawl_job(job_id, user_id)
+        # Locked like store_results does, so a batch being written waits for
+        # the delete (and then drops its rows) instead of orphaning them
+        job = self.db.query(CrawlJob).filter(
+            CrawlJob.id == job_id,
+            CrawlJob.user_id == user_id
+        ).with_for_update().populate_existing().first()
         if not job:
+            self.db.rollback()
             return False
         
         # Delete associated extracted data
-        self.db.query(ExtractedData).filter(
-            ExtractedData.crawl_job_id == job_id
+        self._delete_results(job_id)
+        self.db.query(PayloadDictionary).filter(
+            PayloadDictionary.crawl_job_id == job_id
         ).delete()
+        self.db.query(CrawlJobShard).filter(
+            CrawlJobShard.crawl_job_id == job_id
+        ).delete()
+        StatsService(self.db).delete_job_stats(job_id)
+        WebhookService(self.db).delete_job_webhooks(job_id)
+        ArchiveService(self.db).delete_job_pages(job_id)
         
+        running = job.status in ("running", "paused")
         self.db.delete(job)
         self.db.commit()
+        
+        # Stop the crawl too; results it still flushes are dropped by store_results
+        if running:
+            dispatcher.cancel(job_id)
         return True
     
+    def cancel_crawl_job(self, job_id: int, user_id: int) -> bool:
+        """Stop a running or paused job; results collected so far are kept"""
+        return self._control_crawl_job(job_id, user_id, ("running", "paused"), "cancelled")
+    
+    def pause_crawl_job(self, job_id: int, user_id: int) -> bool:
+        return self._control_crawl_job(job_id, user_id, ("running",), "paused")
+    
+    def resume_crawl_job(self, job_id: int, user_id: int) -> bool:
+        return self._control_crawl_job(job_id, user_id, ("paused",), "running")
+    
+    def _control_crawl_job(self, job_id: int, user_id: int, from_statuses: tuple, status: str) -> bool:
+        """Move a job to ``status`` if it is in one of ``from_statuses`` and signal its crawl.
+        
+        The status is the signal: a job crawled in this process is told
+        right away, crawls elsewhere (other API instances, shard workers)
+        poll it every ``job_control_poll_seconds``.
+        """
+        now = datetime.datetime.utcnow()
+        values = {"status": status, "updated_at": now}
+        if status == "cancelled":
+            values["completed_at"] = now
+        
+        changed = self.db.execute(
+            update(CrawlJob).where(
+                CrawlJob.id == job_id,
+                CrawlJob.user_id == user_id,
+                CrawlJob.status.in_(from_statuses)
+            ).values(**values)
+        ).rowcount == 1
+        notified = changed and status == "cancelled" and WebhookService(self.db).enqueue_job_event(job_id, status)
+        self.db.commit()
+        
+        if notified:
+            webhook_sender.notify()
+        if changed:
+            logger.info(f"Crawl job {job_id} is now {status}")
+            self._signal_dispatcher(job_id, status)
+        return changed
+    
+    @staticmethod
+    def _signal_dispatcher(job_id: int, status: Optional[str]):
+        """Bring the dispatcher in line with the job's status (None: the job was deleted)"""
+        if status is not None:
+            progress_hub.set_status(job_id, status)
+        if status in (None, "cancelled"):
+            dispatcher.cancel(job_id)
+        elif status == "paused":
+            dispatcher.pause(job_id)
+        elif status == "running":
+            dispatcher.resume(job_id)
+    
+    def get_job_status(self, job_id: int) -> Optional[str]:
+        """Current status of a job from the database; None if it was deleted"""
+        status = self.db.query(CrawlJob.status).filter(CrawlJob.id == job_id).scalar()
+        # Don't hold the read transaction open while the crawl goes on
+        self.db.commit()
+        return status
+    
+    def _finish_job(self, job_id: int, status: str) -> Optional[str]:
+        """Set the final status of a job that is still running; returns the status it ends with.
+        
+        A job cancelled meanwhile stays cancelled, and a deleted one gives None.
+        Webhooks following the job are queued in the same transaction.
+        """
+        finished = self.db.execute(
+            update(CrawlJob).where(
+                CrawlJob.id == job_id,
+                CrawlJob.status.in_(("running", "paused"))
+            ).values(status=status, completed_at=datetime.datetime.utcnow())
+        ).rowcount == 1
+        notified = finished and WebhookService(self.db).enqueue_job_event(job_id, status)
+        self.db.commit()
+        
+        if notified:
+            webhook_sender.notify()
+        return self.get_job_status(job_id)
+    
     def execute_crawl_job(self, job_id: int) -> bool:
-        """Execute a crawl job synchronously"""
+        """Execute a crawl job synchronously.
+        
+        Jobs with more than ``crawl_shard_size`` URLs are fanned out to Celery
+        workers instead when a broker (or eager mode) is configured; this then
+        returns once the shards are queued, and the last shard to finish sets
+        the job's final status.
+        """
         job = self.db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
         if not job:
             logger.error(f"Crawl job {job_id} not found")
             return False
         
+        if self._should_shard(job):
+            return self.fan_out_crawl_job(job)
+        
         try:
             # Update job status
             job.status = "running"
             job.started_at = datetime.datetime.utcnow()
+            job.completed_at = None
             self.db.commit()
             
             logger.info(f"Starting crawl job {job_id}: {job.name}")
             
-            # Execute crawling synchronously
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Live counters for progress streams, continuing from the stored totals
+            stats = StatsService(self.db).get_job_stats(job_id)
+            if stats:
+                progress_hub.start(job_id, stats.urls_crawled, stats.failed_extractions, stats.bytes_downloaded)
+            else:
+                progress_hub.start(job_id)
             
-            try:
-                results = loop.run_until_complete(self._run_crawler(job))
-            finally:
-                loop.close()
+            # Results are written in batches as they arrive, so progress
+            # counters are visible while the job is still running
+            pending = []
             
-            # Store extracted data
-            for result in results:
-                extracted_data = ExtractedData(
-                    crawl_job_id=job.id,
-                    url=result["url"],
-                    data=result.get("data", {})
-                )
-                self.db.add(extracted_data)
+            def on_result(result: Dict):
+                progress_hub.record(job_id, is_successful_result(result), result.get("bytes") or 0)
+                pending.append(result)
+                if len(pending) >= settings.ingest_batch_size:
+                    self.store_results(job_id, pending)
+                    pending.clear()
             
-            # Update job status
-            job.status = "completed"
-            job.completed_at = datetime.datetime.utcnow()
+            # Picks up cancel/pause requests that were made in another process
+            def on_poll():
+                self._signal_dispatcher(job_id, self.get_job_status(job_id))
+            
+            # URLs are fetched by the process-wide dispatcher, which shares
+            # crawl slots fairly with other running jobs
+            crawled = dispatcher.crawl(
+                job_id, job.user_id, job.priority, job.target_urls, job.extraction_rules, on_result,
+                on_poll, settings.job_control_poll_seconds, keep_html=job.archive_pages
+            )
+            
+            # Results collected before a cancel are kept
+            if pending:
+                self.store_results(job_id, pending)
+            
+            status = self._finish_job(job_id, "completed")
+            if status == "completed":
+                logger.info(f"Crawl job {job_id} completed successfully. Extracted {crawled} records.")
+            else:
+                logger.info(f"Crawl job {job_id} stopped ({status or 'deleted'}) after {crawled} records.")
+            return True
+        
+        except Exception as e:
+            self.db.rollback()
+            self._finish_job(job_id, "failed")
+            
+            logger.error(f"Crawl job {job_id} failed: {e}")
+            return False
+        
+        finally:
+            progress_hub.finish(job_id)
+    
+    def reextract_crawl_job(self, job_id: int, extraction_rules: Optional[Dict[str, str]] = None) -> bool:
+        """Rebuild a job's extracted data from its archived pages, without fetching anything.
+        
+        The latest archived copy of each URL is run through the job's rules,
+        replaced by ``extraction_rules`` when given, and the results replace
+        the job's previous ones. Like a crawl, the job is running meanwhile
+        and can be paused or cancelled; a job that is already running is
+        left alone.
+        """
+        now = datetime.datetime.utcnow()
+        values = {"status": "running", "started_at": now, "completed_at": None, "updated_at": now}
+        if extraction_rules is not None:
+            values["extraction_rules"] = extraction_rules
+        claimed = self.db.execute(
+            update(CrawlJob).where(
+                CrawlJob.id == job_id,
+                CrawlJob.status.notin_(("running", "paused"))
+            ).values(**values)
+        ).rowcount == 1
+        self.db.commit()
+        if not claimed:
+            logger.warning(f"Not re-extracting crawl job {job_id}: missing or running")
+            return False
+        
+        try:
+            job = self.db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+            archive_service = ArchiveService(self.db)
+            pages = archive_service.get_latest_pages(job_id)
+            self._delete_results(job_id)
+            StatsService(self.db).reset_job_stats(job_id)
             self.db.commit()
             
-            logger.info(f"Crawl job {job_id} completed successfully. Extracted {len(results)} records.")
+            logger.info(f"Re-extracting crawl job {job_id} from {len(pages)} archived pages")
+            progress_hub.start(job_id)
+            extracted = 0
+            with closing(archive_service.extract_pages(pages, job.extraction_rules)) as batches:
+                for results in batches:
+                    for result in results:
+                        progress_hub.record(job_id, is_successful_result(result), result.get("bytes") or 0)
+                    self.store_results(job_id, results)
+                    extracted += len(results)
+                    
+                    status = self.get_job_status(job_id)
+                    while status == "paused":
+                        time.sleep(settings.job_control_poll_seconds)
+                        status = self.get_job_status(job_id)
+                    if status != "running":
+                        break
+            
+            status = self._finish_job(job_id, "completed")
+            logger.info(f"Re-extraction of crawl job {job_id} {status or 'deleted'} after {extracted} records")
             return True
+        
+        except Exception as e:
+            self.db.rollback()
+            self._finish_job(job_id, "failed")
+            
+            logger.error(f"Re-extraction of crawl job {job_id} failed: {e}")
+            return False
+        
+        finally:
+            progress_hub.finish(job_id)
+    
+    def _delete_results(self, job_id: int):
+        SearchService(self.db).delete_job_documents(job_id)
+        self.db.query(FetchTiming).filter(
+            FetchTiming.crawl_job_id == job_id
+        ).delete()
+        self.db.query(ExtractedData).filter(
+            ExtractedData.crawl_job_id == job_id
+        ).delete()
+    
+    def count_archived_pages(self, job_id: int) -> int:
+        return ArchiveService(self.db).count_pages(job_id)
+    
+    @staticmethod
+    def _should_shard(job: CrawlJob) -> bool:
+        celery_configured = bool(settings.celery_broker_url) or settings.celery_task_always_eager
+        return celery_configured and len(job.target_urls or []) > settings.crawl_shard_size
+    
+    def fan_out_crawl_job(self, job: CrawlJob) -> bool:
+        """Split a job into shards and queue one Celery task per shard"""
+        # Imported here: the worker module builds on this service
+        from ..worker import crawl_shard
+        
+        try:
+            job.status = "running"
+            job.started_at = datetime.datetime.utcnow()
+            job.completed_at = None
+            shard_ids = [shard.id for shard in ShardService(self.db).create_shards(job, settings.crawl_shard_size)]
+            self.db.commit()
             
+            logger.info(f"Starting crawl job {job.id}: {job.name} in {len(shard_ids)} shards")
+            for shard_id in shard_ids:
+                crawl_shard.delay(shard_id)
+            return True
+        
         except Exception as e:
+            self.db.rollback()
             job.status = "failed"
             job.completed_at = datetime.datetime.utcnow()
+            notified = WebhookService(self.db).enqueue_job_event(job.id, "failed")
             self.db.commit()
+            if notified:
+                webhook_sender.notify()
             
-            logger.error(f"Crawl job {job_id} failed: {e}")
+            logger.error(f"Crawl job {job.id} failed to fan out: {e}")
             return False
     
-    async def _run_crawler(self, job: CrawlJob) -> List[Dict]:
-        """Run the crawler asynchronously"""
-        async with SimpleCrawler(
-            max_concurrent=3,  # Conservative for local development
-            delay_range=(1, 2),
-            respect_robots=True,
-            verify_ssl=True
-        ) as crawler:
-            return await crawler.crawl_urls(job.target_urls, job.extraction_rules)
-    
-    def get_extracted_data(self, job_id: int, user_id: int) -> List[ExtractedData]:
+    def execute_shard(self, shard_id: int) -> int:
+        """Crawl one shard with its own crawler, writing results as they arrive.
+        
+        Returns the number of results; a shard that is gone or finished is
+        skipped. Raises ShardLeaseHeld while another worker's lease on the
+        shard is live, so a redelivered task can retry once it expires.
+        """
+        shard_service = ShardService(self.db)
+        shard = shard_service.start_shard(shard_id)
+        if shard is None:
+            retry_in = shard_service.lease_remaining(shard_id)
+            if retry_in is not None:
+                raise ShardLeaseHeld(shard_id, retry_in)
+            logger.warning(f"Skipping crawl shard {shard_id}: not pending")
+            return 0
+        
+        attempt = shard.attempt
+        job = self.db.get(CrawlJob, shard.crawl_job_id)
+        if job is None or job.status == "cancelled":
+            shard_service.finish_shard(shard_id, attempt, 0, cancelled=True)
+            return 0
+        
+        job_id = job.id
+        urls = shard.urls or []
+        resumed = 0
+        if attempt > 1:
+            # Claimed again after its worker died: what that worker stored stays
+            stored_urls = shard_service.stored_urls(job_id, urls)
+            urls = [url for url in urls if url not in stored_urls]
+            resumed = len(shard.urls) - len(urls)
+            logger.info(f"Resuming crawl shard {shard_id} (attempt {attempt}): {resumed} URLs already stored")
+        pending = []
+        stored = 0
+        cancelled = False
+        lease_lost = False
+        
+        def flush():
+            nonlocal stored, lease_lost
+            # Renewed with every batch, so a worker whose lease lapsed stores nothing more
+            if not shard_service.renew_lease(shard_id, attempt):
+                lease_lost = True
+                pending.clear()
+                return
+            self.store_results(job_id, pending)
+            stored += len(pending)
+            pending.clear()
+        
+        def on_result(result: Dict):
+            if lease_lost:
+                return
+            pending.append(result)
+            if len(pending) >= settings.ingest_batch_size:
+                flush()
+        
+        async def crawl():
+            nonlocal cancelled, lease_lost
+            crawler = SimpleCrawler(
+                max_concurrent=settings.max_concurrent_requests,
+                delay_range=(settings.request_delay, settings.request_delay * 2),
+                respect_robots=settings.respect_robots,
+                verify_ssl=settings.verify_ssl,
+                fetch_cache=fetch_cache if settings.fetch_cache_enabled else None
+            )
+            async with crawler:
+                task = asyncio.create_task(crawler.crawl_urls(
+                    urls, job.extraction_rules, on_result, keep_html=job.archive_pages
+                ))
+                # The job's status is polled to follow cancel, pause and resume,
+                # and the shard's lease is renewed once a third of it is used
+                lease_renewed = time.monotonic()
+                while not task.done():
+                    status = self.get_job_status(job_id)
+                    if status in (None, "cancelled"):
+                        cancelled = True
+                        task.cancel()
+                        break
+                    if not lease_lost and time.monotonic() - lease_renewed >= settings.shard_lease_seconds / 3:
+                        lease_renewed = time.monotonic()
+                        lease_lost = not shard_service.renew_lease(shard_id, attempt)
+                    if lease_lost:
+                        logger.warning(f"Crawl shard {shard_id} was finished or claimed by another worker; stopping")
+                        cancelled = True
+                        task.cancel()
+                        break
+                    if status == "paused":
+                        crawler.pause()
+                    else:
+                        crawler.resume()
+                    await asyncio.wait({task}, timeout=settings.job_control_poll_seconds)
+                
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        try:
+            asyncio.run(crawl())
+            if pending:
+                flush()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Crawl shard {shard_id} of job {job_id} failed: {e}")
+            shard_service.finish_shard(shard_id, attempt, resumed + stored, error=str(e))
+            return stored
+        
+        logger.info(f"Crawl shard {shard_id} of job {job_id} {'cancelled' if cancelled else 'completed'} "
+                    f"with {stored} records")
+        shard_service.finish_shard(shard_id, attempt, resumed + stored, cancelled=cancelled)
+        return stored
+    
+    def store_results(self, job_id: int, results: List[Dict]):
+        """Persist a batch of crawl results and their stats in one transaction"""
+        started = time.perf_counter()
+        # Locking the job row keeps a concurrent delete from orphaning the batch
+        job = self.db.query(CrawlJob).filter(CrawlJob.id == job_id).with_for_update().first()
+        if job is None:
+            self.db.rollback()
+            logger.warning(f"Dropping {len(results)} results of deleted crawl job {job_id}")
+            return
+        
+        ArchiveService(self.db).archive_results(job_id, results)
+        rows = PayloadService(self.db).build_extracted_data(job, results)
+        self.db.add_all(rows)
+        
+        # Each row is charged an even share of the batch insert
+        insert_started = time.perf_counter()
+        self.db.flush()
+        db_us = int((time.perf_counter() - insert_started) * 1_000_000 / max(len(rows), 1))
+        
+        # SQLite has no row locks, but once the insert holds the write lock a
+        # delete has either committed already or waits for this batch
+        if self.db.query(CrawlJob.id).filter(CrawlJob.id == job_id).scalar() is None:
+            self.db.rollback()
+            logger.warning(f"Dropping {len(results)} results of deleted crawl job {job_id}")
+            return
+        self.db.add_all(ProfileService(self.db).build_timings(job_id, rows, results, db_us))
+        SearchService(self.db).index_results(rows, results)
+        
+        StatsService(self.db).record_results(job_id, results)
+        self.db.commit()
+        DB_WRITE_DURATION.observe(time.perf_counter() - started)
+        DB_WRITE_ROWS.inc(len(results))
+    
+    def get_extracted_data(self, 
+                           job_id: int, 
+                           user_id: int, 
+                           after_id: Optional[int] = None, 
+                           limit: Optional[int] = None) -> List[ExtractedData]:
+        """Return a page of extracted data ordered by id, starting after ``after_id``"""
         job = self.get_crawl_job(job_id, user_id)
         if not job:
             return []
         
-        return self.db.query(ExtractedData).filter(
+        query = self.db.query(ExtractedData).filter(
+            ExtractedData.crawl_job_id == job_id
+        )
+        if after_id is not None:
+            query = query.filter(ExtractedData.id > after_id)
+        
+        query = query.order_by(ExtractedData.id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        return query.all()
+    
+    def iter_extracted_data(self, 
+                            job_id: int, 
+                            after_id: Optional[int] = None, 
+                            chunk_size: int = 1000) -> Iterator[ExtractedData]:
+        """Yield all extracted data of a job in id order through a server-side cursor.
+        
+        Rows are fetched ``chunk_size`` at a time, so memory use does not grow
+        with the size of the job. Ownership must be checked by the caller.
+        """
+        query = self.db.query(ExtractedData).filter(
             ExtractedData.crawl_job_id == job_id
-        ).all()
\ No newline at end of file
+        )
+        if after_id is not None:
+            query = query.filter(ExtractedData.id > after_id)
+        
+        yield from query.order_by(ExtractedData.id).execution_options(
+            stream_results=True
+        ).yield_per(chunk_size)
+
+class AsyncCrawlService:
+    """CrawlService for an AsyncSession, run through ``AsyncSession.run_sync``.
+    
+    Executing a job stays on the sync service: it runs its own event loop
+    for the crawler and belongs on a worker thread, not in a request.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _run(self, method: Callable[[CrawlService], Any]) -> Any:
+        return await self.db.run_sync(lambda session: method(CrawlService(session)))
+    
+    async def create_crawl_job(self, crawl_job: CrawlJobCreate, user_id: int) -> CrawlJob:
+        return await self._run(lambda service: service.create_crawl_job(crawl_job, user_id))
+    
+    async def get_crawl_jobs(self, 
+                             user_id: int, 
+                             skip: int = 0, 
+                             limit: int = 100, 
+                             after_id: Optional[int] = None) -> List[CrawlJob]:
+        return await self._run(lambda service: service.get_crawl_jobs(user_id, skip, limit, after_id))
+    
+    async def get_crawl_job(self, job_id: int, user_id: int) -> Optional[CrawlJob]:
+        return await self._run(lambda service: service.get_crawl_job(job_id, user_id))
+    
+    async def update_crawl_job(self, job_id: int, user_id: int, job_update: CrawlJobUpdate) -> Optional[CrawlJob]:
+        return await self._run(lambda service: service.update_crawl_job(job_id, user_id, job_update))
+    
+    async def delete_crawl_job(self, job_id: int, user_id: int) -> bool:
+        return await self._run(lambda service: service.delete_crawl_job(job_id, user_id))
+    
+    async def count_archived_pages(self, job_id: int) -> int:
+        return await self._run(lambda service: service.count_archived_pages(job_id))
+    
+    async def cancel_crawl_job(self, job_id: int, user_id: int) -> bool:
+        return await self._run(lambda service: service.cancel_crawl_job(job_id, user_id))
+    
+    async def pause_crawl_job(self, job_id: int, user_id: int) -> bool:
+        return await self._run(lambda service: service.pause_crawl_job(job_id, user_id))
+    
+    async def resume_crawl_job(self, job_id: int, user_id: int) -> bool:
+        return await self._run(lambda service: service.resume_crawl_job(job_id, user_id))
+    
+    async def get_extracted_data(self, 
+                                 job_id: int, 
+                                 user_id: int, 
+                                 after_id: Optional[int] = None, 
+                                 limit: Optional[int] = None) -> List[ExtractedData]:
+        return await self._run(
+            lambda service: service.get_extracted_data(job_id, user_id, after_id, limit)
+        )
+    
+    async def get_job_stats(self, job_id: int) -> Optional[CrawlJobStats]:
+        return await self.db.run_sync(lambda session: StatsService(session).get_job_stats(job_id))
+    
+    async def get_job_progress(self, job_id: int) -> Optional[Dict[str, Any]]:
+        return await self.db.run_sync(lambda session: StatsService(session).get_job_progress(job_id))
+    
+    async def get_shard_counts(self, job_id: int) -> Dict[str, int]:
+        return await self.db.run_sync(lambda session: ShardService(session).get_shard_counts(job_id))
\ No newline at end of file
@@ -0,0 +1,415 @@
+from ..schemas.crawl_job import MAX_PRIORITY
+from ..core.crawler import SimpleCrawler, classify_error
+from ..core.fetch_cache import fetch_cache
+from ..core.metrics import DISPATCH_ACTIVE_JOBS, DISPATCH_IN_FLIGHT, DISPATCH_PENDING_URLS, DISPATCH_QUEUE_WAIT
+from ..config import settings
+from typing import Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Put on a job's result queue once its last URL has finished
+_DONE = object()
+
+class _JobQueue:
+    """A job's URLs in dispatch order, and where the dispatcher is in them"""
+    
+    __slots__ = ("job_id", "user_id", "weight", "urls", "rules", "position", "in_flight",
+                 "virtual_time", "ready_since", "results", "tasks", "paused", "cancelled", "finished",
+                 "keep_html", "user_agent")
+    
+    def __init__(self, job_id: int, user_id: int, priority: int, urls: List[str], rules: Dict[str, str],
+                 keep_html: bool = False):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.weight = min(max(priority or 1, 1), MAX_PRIORITY)
+        self.urls = urls
+        self.rules = rules
+        self.position = 0
+        self.in_flight = 0
+        self.virtual_time = 0.0
+        self.ready_since = time.monotonic()
+        self.results: "queue.Queue" = queue.Queue()
+        self.tasks: Dict[asyncio.Task, str] = {}  # in-flight URL of each task
+        self.paused = False
+        self.cancelled = False
+        self.finished = False
+        self.keep_html = keep_html
+        self.user_agent: Optional[str] = None
+    
+    @property
+    def pending(self) -> int:
+        return len(self.urls) - self.position
+
+class _UserQueue:
+    """A user's jobs that still have URLs to dispatch"""
+    
+    __slots__ = ("user_id", "jobs", "in_flight", "virtual_time", "job_virtual_time")
+    
+    def __init__(self, user_id: int, virtual_time: float):
+        self.user_id = user_id
+        self.jobs: Dict[int, _JobQueue] = {}
+        self.in_flight = 0
+        self.virtual_time = virtual_time
+        self.job_virtual_time = 0.0
+
+class CrawlDispatcher:
+    """Shares the process's crawl capacity between all running jobs, URL by URL.
+    
+    Jobs hand their URLs to one dispatcher with a single event loop and
+    crawler session. Free slots go to users by weighted fair queuing: the
+    user with the lowest virtual time gets the next slot, and each dispatched
+    URL advances it by one, so every active user gets an equal share.
+    Within a user, jobs advance by ``1 / priority``, so a priority 4 job gets
+    four URLs for each one of a priority 1 job. A user returning from idle
+    starts at the current virtual time rather than with banked credit, and
+    no user holds more than ``user_max_concurrent`` slots. A small job
+    submitted next to a 500k-URL job is therefore interleaved right away
+    instead of waiting behind it.
+    
+    Results are handed back to the submitting thread, which persists them.
+    Jobs can be cancelled, paused and resumed from any thread; both cancel
+    and pause abort the job's in-flight requests right away, and a paused
+    job's aborted URLs are fetched again when it resumes.
+    """
+    
+    def __init__(self,
+                 max_concurrent: Optional[int] = None,
+                 user_max_concurrent: Optional[int] = None,
+                 crawler_factory: Optional[Callable[[], SimpleCrawler]] = None):
+        self.max_concurrent = max_concurrent
+        self.user_max_concurrent = user_max_concurrent
+        self.crawler_factory = crawler_factory or self._default_crawler
+        self._users: Dict[int, _UserQueue] = {}
+        self._jobs: Dict[int, _JobQueue] = {}
+        self._virtual_time = 0.0
+        self._in_flight = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._crawler: Optional[SimpleCrawler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._start_lock = threading.Lock()
+    
+    @staticmethod
+    def _default_crawler() -> SimpleCrawler:
+        return SimpleCrawler(
+            max_concurrent=settings.max_concurrent_requests,
+            delay_range=(settings.request_delay, settings.request_delay * 2),
+            respect_robots=settings.respect_robots,
+            verify_ssl=settings.verify_ssl,
+            fetch_cache=fetch_cache if settings.fetch_cache_enabled else None
+        )
+    
+    def crawl(self,
+              job_id: int,
+              user_id: int,
+              priority: int,
+              urls: List[str],
+              extraction_rules: Dict[str, str],
+              on_result: Optional[Callable[[Dict], None]] = None,
+              on_poll: Optional[Callable[[], None]] = None,
+              poll_interval: float = 1.0,
+              keep_html: bool = False) -> int:
+        """Crawl a job's URLs through the shared capacity, blocking until all are done.
+        
+        ``on_result`` is called on the calling thread as each result arrives;
+        returns the number of results. URLs blocked by robots.txt yield none.
+        ``on_poll`` is called on the calling thread at least every
+        ``poll_interval`` seconds, e.g. to pick up control requests made in
+        another process. A cancelled job returns once its in-flight requests
+        are aborted. ``keep_html`` adds each page's HTML to its result.
+        """
+        loop = self._ensure_started()
+        job = _JobQueue(job_id, user_id, priority, list(urls or []), extraction_rules, keep_html)
+        loop.call_soon_threadsafe(self._add_job, job)
+        
+        count = 0
+        polled = time.monotonic()
+        while True:
+            try:
+                result = job.results.get(timeout=poll_interval if on_poll else None)
+            except queue.Empty:
+                result = None
+            
+            if result is _DONE:
+                return count
+            if result is not None:
+                count += 1
+                if on_result:
+                    on_result(result)
+            if on_poll and time.monotonic() - polled >= poll_interval:
+                on_poll()
+                polled = time.monotonic()
+    
+    def cancel(self, job_id: int):
+        """Drop a running job's remaining URLs and abort its in-flight requests"""
+        self._control(self._cancel_job, job_id)
+    
+    def pause(self, job_id: int):
+        """Stop dispatching a job's URLs; its in-flight requests are aborted and re-queued"""
+        self._control(self._pause_job, job_id)
+    
+    def resume(self, job_id: int):
+        """Continue a paused job where it left off"""
+        self._control(self._resume_job, job_id)
+    
+    def _control(self, action: Callable[[_JobQueue], None], job_id: int):
+        # Jobs run by another process or already finished are ignored
+        if self._loop is None:
+            return
+        
+        def apply():
+            job = self._jobs.get(job_id)
+            if job is not None and not job.cancelled:
+                action(job)
+                self._wakeup.set()
+        self._loop.call_soon_threadsafe(apply)
+    
+    def get_stats(self, user_id: Optional[int] = None) -> Dict[str, Dict]:
+        """Per-user slots in use, active jobs and URLs waiting to be dispatched.
+        
+        Limited to one user when ``user_id`` is given.
+        """
+        return {
+            str(user.user_id): {
+                "in_flight": user.in_flight,
+                "jobs": sorted(job.job_id for job in list(self._jobs.values()) if job.user_id == user.user_id),
+                "pending_urls": sum(job.pending for job in list(user.jobs.values()))
+            }
+            for user in list(self._users.values())
+            if user_id is None or user.user_id == user_id
+        }
+    
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """The dispatcher's event loop, started on first use or after it failed"""
+        with self._start_lock:
+            if self._thread is None:
+                self.max_concurrent = self.max_concurrent or settings.max_concurrent_requests
+                self.user_max_concurrent = (
+                    self.user_max_concurrent
+                    or settings.user_max_concurrent_requests
+                    or max(self.max_concurrent // 2, 1)
+                )
+                self._start_error = None
+                self._started.clear()
+                self._thread = threading.Thread(target=asyncio.run, args=(self._run(),),
+                                                name="crawl-dispatcher", daemon=True)
+                self._thread.start()
+                self._started.wait()
+                if self._start_error is not None:
+                    # The loop is gone; the next job starts a new one
+                    self._thread = None
+                    raise self._start_error
+            return self._loop
+    
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            async with self.crawler_factory() as crawler:
+                self._crawler = crawler
+                self._started.set()
+                await self._dispatch()
+        except Exception as e:
+            if self._started.is_set():
+                logger.error(f"Crawl dispatcher failed: {e}")
+                await self._abort_all(e)
+                return
+            # Raised again in the thread waiting for the start
+            logger.error(f"Crawl dispatcher failed to start: {e}")
+            self._start_error = e
+            self._started.set()
+    
+    async def _abort_all(self, error: Exception):
+        """End every job with an error result per unfinished URL, then let the next job restart the loop"""
+        for job in list(self._jobs.values()):
+            job.cancelled = True
+            for url in job.urls[job.position:] + list(job.tasks.values()):
+                job.results.put({"url": url, "error": f"Crawl dispatcher failed: {error}", "error_class": "other",
+                                 "data": {}})
+            DISPATCH_PENDING_URLS.dec(job.pending)
+            del job.urls[job.position:]
+            for task in job.tasks:
+                task.cancel()
+        # Their done callbacks release the slots and finish jobs with nothing left in flight
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for job in list(self._jobs.values()):
+            self._finish(job)
+        
+        with self._start_lock:
+            self._thread = None
+            self._loop = None
+            self._crawler = None
+            self._users = {}
+            self._started.clear()
+    
+    def _add_job(self, job: _JobQueue):
+        if self._loop is not asyncio.get_running_loop():
+            # Submitted as the loop failed; the caller gets errors rather than waiting forever
+            for url in job.urls:
+                job.results.put({"url": url, "error": "Crawl dispatcher failed", "error_class": "other", "data": {}})
+            job.results.put(_DONE)
+            return
+        # The crawler lives as long as the dispatcher; each job still gets its own User-Agent
+        job.user_agent = self._crawler.pick_user_agent()
+        self._jobs[job.job_id] = job
+        DISPATCH_ACTIVE_JOBS.set(len(self._jobs))
+        if not job.urls:
+            self._finish(job)
+            return
+        
+        DISPATCH_PENDING_URLS.inc(len(job.urls))
+        logger.info(f"Dispatching {len(job.urls)} URLs of crawl job {job.job_id} (user {job.user_id}, "
+                    f"priority {job.weight})")
+        self._enqueue(job)
+        self._wakeup.set()
+    
+    def _enqueue(self, job: _JobQueue):
+        user = self._users.get(job.user_id)
+        if user is None:
+            user = self._users[job.user_id] = _UserQueue(job.user_id, self._virtual_time)
+        elif not user.jobs:
+            user.virtual_time = max(user.virtual_time, self._virtual_time)
+        job.virtual_time = max(job.virtual_time, user.job_virtual_time)
+        user.jobs[job.job_id] = job
+    
+    def _dequeue(self, job: _JobQueue):
+        user = self._users.get(job.user_id)
+        if user is None:
+            return
+        user.jobs.pop(job.job_id, None)
+        if not user.jobs and not user.in_flight:
+            self._users.pop(user.user_id, None)
+    
+    def _cancel_job(self, job: _JobQueue):
+        logger.info(f"Cancelling crawl job {job.job_id}: dropping {job.pending} URLs, "
+                    f"aborting {job.in_flight} requests")
+        job.cancelled = True
+        self._dequeue(job)
+        DISPATCH_PENDING_URLS.dec(job.pending)
+        del job.urls[job.position:]
+        for task in job.tasks:
+            task.cancel()
+        if not job.in_flight:
+            self._finish(job)
+    
+    def _pause_job(self, job: _JobQueue):
+        if job.paused:
+            return
+        logger.info(f"Pausing crawl job {job.job_id}: {job.in_flight} requests re-queued")
+        job.paused = True
+        self._dequeue(job)
+        for task in job.tasks:
+            task.cancel()
+    
+    def _resume_job(self, job: _JobQueue):
+        if not job.paused:
+            return
+        logger.info(f"Resuming crawl job {job.job_id} with {job.pending} URLs")
+        job.paused = False
+        job.ready_since = time.monotonic()
+        if job.pending:
+            self._enqueue(job)
+        elif not job.in_flight:
+            self._finish(job)
+    
+    def _next_user(self) -> Optional[_UserQueue]:
+        candidates = [
+            user for user in self._users.values()
+            if user.jobs and user.in_flight < self.user_max_concurrent
+        ]
+        return min(candidates, key=lambda user: user.virtual_time, default=None)
+    
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            
+            while self._in_flight < self.max_concurrent:
+                user = self._next_user()
+                if user is None:
+                    break
+                job = min(user.jobs.values(), key=lambda job: job.virtual_time)
+                
+                self._virtual_time = user.virtual_time
+                user.virtual_time += 1
+                user.job_virtual_time = job.virtual_time
+                job.virtual_time += 1 / job.weight
+                
+                url = job.urls[job.position]
+                job.position += 1
+                if not job.pending:
+                    user.jobs.pop(job.job_id, None)
+                
+                now = time.monotonic()
+                DISPATCH_QUEUE_WAIT.observe(now - job.ready_since)
+                job.ready_since = now
+                DISPATCH_PENDING_URLS.dec()
+                
+                self._in_flight += 1
+                user.in_flight += 1
+                job.in_flight += 1
+                DISPATCH_IN_FLIGHT.inc()
+                task = asyncio.create_task(self._crawl(job, url))
+                self._tasks.add(task)
+                job.tasks[task] = url
+                task.add_done_callback(lambda task, user=user, job=job, url=url: self._crawl_done(user, job, url, task))
+    
+    async def _crawl(self, job: _JobQueue, url: str):
+        try:
+            if await self._allowed(url, job.user_agent):
+                job.results.put(await self._crawler.crawl_url(url, job.rules, job.keep_html, job.user_agent))
+            else:
+                logger.warning(f"URL blocked by robots.txt: {url}")
+        except Exception as e:
+            logger.error(f"Crawl task failed: {e}")
+            job.results.put({"url": url, "error": str(e), "error_class": classify_error(e), "data": {}})
+    
+    def _crawl_done(self, user: _UserQueue, job: _JobQueue, url: str, task: asyncio.Task):
+        """Release a crawl task's slot; runs even for a task cancelled before it started"""
+        self._tasks.discard(task)
+        job.tasks.pop(task, None)
+        if task.cancelled() and not job.cancelled:
+            # Aborted by pause: fetched again on resume. A job resumed before
+            # its aborted URLs came back was left unqueued, so queue it again
+            job.urls.insert(job.position, url)
+            DISPATCH_PENDING_URLS.inc()
+            if not job.paused:
+                self._enqueue(job)
+        
+        self._in_flight -= 1
+        user.in_flight -= 1
+        job.in_flight -= 1
+        DISPATCH_IN_FLIGHT.dec()
+        if not job.in_flight and (job.cancelled or not job.pending):
+            self._finish(job)
+        if not user.jobs and not user.in_flight:
+            self._users.pop(user.user_id, None)
+        self._wakeup.set()
+    
+    async def _allowed(self, url: str, user_agent: Optional[str]) -> bool:
+        checker = self._crawler.robots_checker
+        if checker is None:
+            return True
+        # Fetching robots.txt blocks, so only cache misses leave the loop
+        if checker.is_cached(url):
+            return checker.can_crawl(url, user_agent)
+        return await asyncio.to_thread(checker.can_crawl, url, user_agent)
+    
+    def _finish(self, job: _JobQueue):
+        if job.finished:
+            return
+        job.finished = True
+        if self._jobs.get(job.job_id) is job:
+            del self._jobs[job.job_id]
+        DISPATCH_ACTIVE_JOBS.set(len(self._jobs))
+        job.results.put(_DONE)
+
+dispatcher = CrawlDispatcher()
\ No newline at end of file
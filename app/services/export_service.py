@@ -0,0 +1,240 @@
+from sqlalchemy.orm import Session
+from ..models.crawl_job import CrawlJob, ExtractedData
+from ..config import settings
+from typing import Any, Dict, Iterator, List, Optional
+import csv
+import io
+import json
+import logging
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+EXPORT_COMPRESSIONS = ("none", "gzip", "zstd")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+BASE_COLUMNS = ["crawl_job_id", "id", "url", "extracted_at"]
+
+class ExportError(ValueError):
+    """Raised for export options that cannot be served"""
+
+def flatten_value(value: Any) -> Optional[str]:
+    """Render an extracted value as a single cell; lists and dicts become compact JSON"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+class _Compressor:
+    """Streaming compressor with a no-op passthrough for ``none``"""
+    
+    def __init__(self, compression: str):
+        if compression == "gzip":
+            self._obj = zlib.compressobj(wbits=31)
+        elif compression == "zstd":
+            self._obj = zstandard.ZstdCompressor().compressobj()
+        else:
+            self._obj = None
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) if self._obj else data
+    
+    def flush(self) -> bytes:
+        return self._obj.flush() if self._obj else b""
+
+class _ChunkSink(io.RawIOBase):
+    """Writable file object that hands buffered bytes back on ``drain``"""
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_rule_fields(self, job_ids: List[int]) -> List[str]:
+        """Union of the extraction rule fields of the jobs, in first-seen order"""
+        fields = []
+        for (rules,) in self.db.query(CrawlJob.extraction_rules).filter(
+            CrawlJob.id.in_(job_ids)
+        ).order_by(CrawlJob.id):
+            for field in (rules or {}):
+                if field not in fields:
+                    fields.append(field)
+        return fields
+    
+    def resolve_fields(self, job_ids: List[int], fields: Optional[List[str]] = None) -> List[str]:
+        rule_fields = self.get_rule_fields(job_ids)
+        if not fields:
+            return rule_fields
+        
+        unknown = [field for field in fields if field not in rule_fields]
+        if unknown:
+            raise ExportError(f"Unknown fields for these jobs: {', '.join(unknown)}")
+        return fields
+    
+    def iter_rows(self, job_ids: List[int], chunk_size: int) -> Iterator[ExtractedData]:
+        """Stream the extracted data of the jobs through a server-side cursor"""
+        yield from self.db.query(ExtractedData).filter(
+            ExtractedData.crawl_job_id.in_(job_ids)
+        ).order_by(
+            ExtractedData.crawl_job_id, ExtractedData.id
+        ).execution_options(stream_results=True).yield_per(chunk_size)
+    
+    def iter_chunks(self, job_ids: List[int], chunk_size: int) -> Iterator[List[ExtractedData]]:
+        chunk = []
+        for row in self.iter_rows(job_ids, chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def export(self,
+               job_ids: List[int],
+               format: str = "csv",
+               compression: str = "none",
+               fields: Optional[List[str]] = None,
+               chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Export extracted data of one or more jobs as a stream of byte chunks.
+        
+        At most ``chunk_size`` rows are held in memory at a time, whatever
+        the size of the jobs. ``fields`` projects the extraction rule fields
+        to export; all rule fields are exported by default.
+        """
+        if format not in EXPORT_FORMATS:
+            raise ExportError(f"Unsupported export format: {format}")
+        if compression not in EXPORT_COMPRESSIONS:
+            raise ExportError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ExportError("zstd compression requires the 'zstandard' package")
+        if format == "parquet" and pyarrow is None:
+            raise ExportError("Parquet export requires the 'pyarrow' package")
+        
+        fields = self.resolve_fields(job_ids, fields)
+        chunk_size = chunk_size or settings.export_chunk_size
+        logger.info(f"Exporting jobs {job_ids} as {format} ({compression}), fields: {fields}")
+        
+        if format == "parquet":
+            return self._export_parquet(job_ids, fields, compression, chunk_size)
+        
+        writer = self._write_csv if format == "csv" else self._write_jsonl
+        return self._compressed(writer(job_ids, fields, chunk_size), compression)
+    
+    def _compressed(self, chunks: Iterator[bytes], compression: str) -> Iterator[bytes]:
+        compressor = _Compressor(compression)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        tail = compressor.flush()
+        if tail:
+            yield tail
+    
+    def _write_csv(self, job_ids: List[int], fields: List[str], chunk_size: int) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(BASE_COLUMNS + fields)
+        
+        for chunk in self.iter_chunks(job_ids, chunk_size):
+            for row in chunk:
+                data = row.data or {}
+                writer.writerow(
+                    [row.crawl_job_id, row.id, row.url, row.extracted_at.isoformat() if row.extracted_at else None]
+                    + [flatten_value(data.get(field)) for field in fields]
+                )
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    
+    def _write_jsonl(self, job_ids: List[int], fields: List[str], chunk_size: int) -> Iterator[bytes]:
+        for chunk in self.iter_chunks(job_ids, chunk_size):
+            lines = []
+            for row in chunk:
+                data = row.data or {}
+                lines.append(json.dumps({
+                    "crawl_job_id": row.crawl_job_id,
+                    "id": row.id,
+                    "url": row.url,
+                    "extracted_at": row.extracted_at.isoformat() if row.extracted_at else None,
+                    "data": {field: data.get(field) for field in fields}
+                }, default=str))
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+    
+    def _export_parquet(self,
+                        job_ids: List[int],
+                        fields: List[str],
+                        compression: str,
+                        chunk_size: int) -> Iterator[bytes]:
+        """Write one Parquet row group per chunk; compression is applied by the Parquet codec"""
+        schema = pyarrow.schema(
+            [
+                ("crawl_job_id", pyarrow.int64()),
+                ("id", pyarrow.int64()),
+                ("url", pyarrow.string()),
+                ("extracted_at", pyarrow.timestamp("us")),
+            ]
+            + [(field, pyarrow.string()) for field in fields]
+        )
+        sink = _ChunkSink()
+        codec = {"none": "none", "gzip": "gzip", "zstd": "zstd"}[compression]
+        
+        with pyarrow.parquet.ParquetWriter(sink, schema, compression=codec) as writer:
+            for chunk in self.iter_chunks(job_ids, chunk_size):
+                columns: Dict[str, list] = {
+                    "crawl_job_id": [row.crawl_job_id for row in chunk],
+                    "id": [row.id for row in chunk],
+                    "url": [row.url for row in chunk],
+                    "extracted_at": [row.extracted_at for row in chunk],
+                }
+                datas = [row.data or {} for row in chunk]
+                for field in fields:
+                    columns[field] = [flatten_value(data.get(field)) for data in datas]
+                
+                writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+                data = sink.drain()
+                if data:
+                    yield data
+        
+        data = sink.drain()
+        if data:
+            yield data
\ No newline at end of file
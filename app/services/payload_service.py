@@ -0,0 +1,125 @@
+from sqlalchemy.orm import Session
+from ..models.crawl_job import CrawlJob, ExtractedData, PayloadDictionary
+from ..core.payload_codec import STORAGE_FORMATS, PayloadCodecError, encode_payload, train_dictionary
+from ..config import settings
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PayloadService:
+    """Stores extracted data in the storage format chosen for its crawl job"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_dictionary(self, job_id: int, codec: str) -> Optional[PayloadDictionary]:
+        return self.db.query(PayloadDictionary).filter(
+            PayloadDictionary.crawl_job_id == job_id,
+            PayloadDictionary.codec == codec
+        ).first()
+    
+    def ensure_dictionary(self, job: CrawlJob) -> Optional[PayloadDictionary]:
+        """Return the job's zstd dictionary, training it once enough rows exist.
+        
+        Rows written before that are compressed without a dictionary. A
+        failed training attempt is recorded as an empty dictionary so it is
+        not retried on every batch.
+        """
+        dictionary = self.get_dictionary(job.id, "zstd")
+        if dictionary is not None:
+            return dictionary if dictionary.dictionary else None
+        
+        samples = self.db.query(ExtractedData).filter(
+            ExtractedData.crawl_job_id == job.id
+        ).order_by(ExtractedData.id).limit(settings.payload_dictionary_samples).all()
+        if len(samples) < settings.payload_dictionary_samples:
+            return None
+        
+        trained = train_dictionary(
+            [row.data or {} for row in samples], settings.payload_dictionary_size
+        )
+        dictionary = PayloadDictionary(crawl_job_id=job.id, codec="zstd", dictionary=trained)
+        self.db.add(dictionary)
+        self.db.flush()
+        
+        logger.info(f"Trained zstd dictionary for crawl job {job.id} ({len(trained or b'')} bytes)")
+        return dictionary if trained else None
+    
+    def encode_into(self,
+                    row: ExtractedData,
+                    data: Dict[str, Any],
+                    codec: str,
+                    dictionary: Optional[PayloadDictionary] = None):
+        """Set a row's data using ``codec``"""
+        if codec == "json":
+            row.data = data
+            return
+        
+        row.raw_data = None
+        row.payload = encode_payload(data, codec, dictionary.dictionary if dictionary else None)
+        row.payload_codec = codec
+        row.payload_dictionary_id = dictionary.id if dictionary else None
+    
+    def build_extracted_data(self, job: CrawlJob, results: List[Dict]) -> List[ExtractedData]:
+        """Create ExtractedData rows for a batch of crawl results, with the outcome of each fetch"""
+        codec = job.storage_format or "json"
+        dictionary = self.ensure_dictionary(job) if codec == "zstd" else None
+        
+        rows = []
+        for result in results:
+            row = ExtractedData(
+                crawl_job_id=job.id,
+                url=result["url"],
+                http_status=result.get("http_status"),
+                error_class=result.get("error_class") or ("other" if result.get("error") else None),
+                error=result.get("error") or None,
+                bytes=result.get("bytes"),
+                elapsed_ms=result.get("elapsed_ms"),
+                final_url=result.get("final_url"),
+                content_hash=result.get("content_hash")
+            )
+            self.encode_into(row, result.get("data", {}), codec, dictionary)
+            rows.append(row)
+        return rows
+    
+    def migrate_job(self, job_id: int, codec: str, batch_size: int = 1000) -> int:
+        """Rewrite all stored data of a job in ``codec`` and make it the job's format.
+        
+        Rows are converted in id order, one committed batch at a time, so the
+        migration can be interrupted and rerun.
+        """
+        if codec not in STORAGE_FORMATS:
+            raise PayloadCodecError(f"Unknown storage format: {codec}")
+        
+        job = self.db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+        if job is None:
+            raise ValueError(f"Crawl job {job_id} not found")
+        
+        job.storage_format = codec
+        self.db.commit()
+        
+        dictionary = self.ensure_dictionary(job) if codec == "zstd" else None
+        
+        migrated = 0
+        last_id = 0
+        while True:
+            rows = self.db.query(ExtractedData).filter(
+                ExtractedData.crawl_job_id == job_id,
+                ExtractedData.id > last_id
+            ).order_by(ExtractedData.id).limit(batch_size).all()
+            if not rows:
+                break
+            
+            for row in rows:
+                self.encode_into(row, row.data, codec, dictionary)
+            
+            last_id = rows[-1].id
+            migrated += len(rows)
+            self.db.commit()
+            # Release converted rows so memory stays flat over large jobs
+            for row in rows:
+                self.db.expunge(row)
+            logger.info(f"Migrated {migrated} rows of crawl job {job_id} to {codec}")
+        
+        return migrated
\ No newline at end of file
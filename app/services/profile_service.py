@@ -0,0 +1,131 @@
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.crawl_job import ExtractedData, FetchTiming
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import math
+
+# Stages in the order a URL passes through them
+TIMING_STAGES = ("dns", "connect", "first_byte", "body", "decode", "parse", "extract", "db")
+PERCENTILES = (50, 90, 99)
+
+def nearest_rank(count: int, pct: float) -> int:
+    """1-based rank of the nearest-rank percentile among ``count`` sorted values"""
+    return max(math.ceil(pct / 100 * count), 1)
+
+def _is_rank(rank, count, pct: int):
+    # rank == nearest_rank(count, pct), in integer arithmetic the database can evaluate
+    return and_(rank * 100 >= count * pct, (rank - 1) * 100 < count * pct)
+
+class ProfileService:
+    """Stores per-URL stage timings and aggregates them into job profiles"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def build_timings(self,
+                      job_id: int,
+                      rows: List[ExtractedData],
+                      results: List[Dict],
+                      db_us: int) -> List[FetchTiming]:
+        """Create timing rows for flushed ExtractedData rows and the results they came from.
+        
+        ``db_us`` is this row's share of the batch insert time.
+        """
+        timings = []
+        for row, result in zip(rows, results):
+            stages = result.get("timings")
+            if not stages:
+                continue
+            
+            timing = FetchTiming(
+                extracted_data_id=row.id,
+                crawl_job_id=job_id,
+                host=urlsplit(result["url"]).hostname or "unknown",
+                db_us=db_us
+            )
+            for stage in TIMING_STAGES[:-1]:
+                setattr(timing, f"{stage}_us", stages.get(f"{stage}_us"))
+            timings.append(timing)
+        return timings
+    
+    def get_job_profile(self, job_id: int) -> Dict[str, Any]:
+        """Percentile breakdown of each stage, for the whole job and per host.
+        
+        Values are ranked by the database, which returns only the rows at a
+        percentile, so memory stays bounded by the number of hosts however
+        many URLs the job crawled.
+        """
+        host = func.coalesce(FetchTiming.host, "unknown")
+        counts = dict(self.db.query(host, func.count()).filter(
+            FetchTiming.crawl_job_id == job_id
+        ).group_by(host).all())
+        
+        overall: Dict[str, Any] = {"samples": sum(counts.values()), "stages": {}}
+        hosts = {name: {"samples": count, "stages": {}} for name, count in sorted(counts.items())}
+        for stage in TIMING_STAGES:
+            for name, summary in self._summarize_stage(job_id, stage).items():
+                profile = overall if name is None else hosts[name]
+                profile["stages"][stage] = summary
+        
+        return {
+            "job_id": job_id,
+            "samples": overall["samples"],
+            "stages": overall["stages"],
+            "hosts": hosts
+        }
+    
+    def _summarize_stage(self, job_id: int, stage: str) -> Dict[Optional[str], Dict[str, float]]:
+        """Percentiles, mean and max of one stage in milliseconds, per host and overall (key None)"""
+        column = getattr(FetchTiming, f"{stage}_us")
+        host = func.coalesce(FetchTiming.host, "unknown")
+        ranked = select(
+            host.label("host"),
+            column.label("value"),
+            func.row_number().over(partition_by=host, order_by=column).label("host_rank"),
+            func.count().over(partition_by=host).label("host_count"),
+            func.avg(column).over(partition_by=host).label("host_mean"),
+            func.row_number().over(order_by=column).label("rank"),
+            func.count().over().label("count"),
+            func.avg(column).over().label("mean")
+        ).where(
+            FetchTiming.crawl_job_id == job_id,
+            column.isnot(None)
+        ).subquery()
+        
+        # The max is the last rank
+        rows = self.db.execute(select(ranked).where(or_(
+            ranked.c.host_rank == ranked.c.host_count,
+            ranked.c.rank == ranked.c.count,
+            *(_is_rank(ranked.c.host_rank, ranked.c.host_count, pct) for pct in PERCENTILES),
+            *(_is_rank(ranked.c.rank, ranked.c.count, pct) for pct in PERCENTILES)
+        ))).all()
+        
+        summaries: Dict[Optional[str], Dict[str, float]] = {}
+        for row in rows:
+            for name, rank, count, mean in ((row.host, row.host_rank, row.host_count, row.host_mean),
+                                            (None, row.rank, row.count, row.mean)):
+                summary = summaries.setdefault(name, {})
+                for pct in PERCENTILES:
+                    if rank == nearest_rank(count, pct):
+                        summary[f"p{pct}_ms"] = row.value / 1000
+                if rank == count:
+                    summary["mean_ms"] = float(mean) / 1000
+                    summary["max_ms"] = row.value / 1000
+        
+        # Same key order as the percentiles were listed in
+        keys = [f"p{pct}_ms" for pct in PERCENTILES] + ["mean_ms", "max_ms"]
+        return {
+            name: {key: summary[key] for key in keys}
+            for name, summary in summaries.items() if "max_ms" in summary
+        }
+
+class AsyncProfileService:
+    """ProfileService for an AsyncSession, run through ``AsyncSession.run_sync``"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_job_profile(self, job_id: int) -> Dict[str, Any]:
+        return await self.db.run_sync(lambda session: ProfileService(session).get_job_profile(job_id))
\ No newline at end of file
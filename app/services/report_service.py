@@ -1,15 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.report import Report
-from ..models.crawl_job import ExtractedData
 from ..schemas.report import ReportCreate
-from typing import List, Optional, Dict, Any
+from ..core.cache import create_cache
+from ..config import settings
+from .stats_service import StatsService
+from typing import Callable, List, Optional, Dict, Any
+import copy
+
+# Computed report data keyed by the user, the requested jobs and their data
+# versions, so an entry stops matching as soon as any of those jobs gets new
+# results or is deleted; unreachable entries age out by TTL and LRU instead of
+# being tracked in an index
+report_cache = create_cache(
+    "reports",
+    maxsize=settings.report_cache_size,
+    ttl=settings.report_cache_ttl,
+    shared_url=settings.cache_redis_url
+)
 
 class ReportService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, read_db: Optional[Session] = None):
         self.db = db
+        # Report data is aggregated from read_db, e.g. a read replica
+        self.read_db = read_db or db
     
     def create_report(self, report: ReportCreate, user_id: int) -> Report:
-        report_data = self._generate_report_data(report.crawl_job_ids, user_id)
+        report_data = self._get_report_data(report.crawl_job_ids, user_id)
         
         db_report = Report(
             user_id=user_id,
@@ -23,10 +40,17 @@ class ReportService:
         self.db.refresh(db_report)
         return db_report
     
-    def get_reports(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Report]:
-        return self.db.query(Report).filter(
-            Report.user_id == user_id
-        ).offset(skip).limit(limit).all()
+    def get_reports(self, 
+                    user_id: int, 
+                    skip: int = 0, 
+                    limit: int = 100, 
+                    after_id: Optional[int] = None) -> List[Report]:
+        """Return a page of the user's reports in id order, starting after ``after_id``"""
+        query = self.db.query(Report).filter(Report.user_id == user_id)
+        if after_id is not None:
+            query = query.filter(Report.id > after_id)
+        
+        return query.order_by(Report.id).offset(skip).limit(limit).all()
     
     def get_report(self, report_id: int, user_id: int) -> Optional[Report]:
         return self.db.query(Report).filter(
@@ -34,6 +58,23 @@ class ReportService:
             Report.user_id == user_id
         ).first()
     
+    def _get_report_data(self, crawl_job_ids: List[int], user_id: int) -> Dict[str, Any]:
+        """Return cached report data when none of the jobs changed since it was computed"""
+        versions = StatsService(self.read_db).get_data_versions(crawl_job_ids)
+        cache_key = f"{user_id}:" + ",".join(
+            f"{job_id}@{versions.get(job_id, '-')}" for job_id in sorted(crawl_job_ids)
+        )
+        
+        report_data = report_cache.get(cache_key)
+        if report_data is None:
+            report_data = self._generate_report_data(crawl_job_ids, user_id)
+            # Jobs without a stats row have no version to key on yet; the
+            # row is backfilled while generating, so the next request caches
+            if versions.keys() >= set(crawl_job_ids):
+                report_cache.set(cache_key, report_data)
+        
+        return copy.deepcopy(report_data)
+    
     def _generate_report_data(self, crawl_job_ids: List[int], user_id: int) -> Dict[str, Any]:
         """Generate analytics and insights from crawl job data"""
         report_data = {
@@ -45,40 +86,83 @@ class ReportService:
             "common_fields": []
         }
         
-        all_data = []
         field_counts = {}
+        bytes_downloaded = 0
+        elapsed_ms_total = 0
+        
+        # Combine the per-job running totals kept at ingest time instead of
+        # rescanning every extracted row
+        stats_by_job = StatsService(self.read_db).get_stats_for_jobs(crawl_job_ids, backfill=False)
+        missing = set(crawl_job_ids) - stats_by_job.keys()
+        if missing:
+            # Backfilling legacy jobs writes, so it always goes to the primary
+            stats_by_job.update(StatsService(self.db).get_stats_for_jobs(missing))
         
         for job_id in crawl_job_ids:
-            extracted_data = self.db.query(ExtractedData).filter(
-                ExtractedData.crawl_job_id == job_id
-            ).all()
+            stats = stats_by_job.get(job_id)
+            if stats is None:
+                continue
+            
+            report_data["total_urls_crawled"] += stats.urls_crawled or 0
+            report_data["successful_extractions"] += stats.successful_extractions or 0
+            report_data["failed_extractions"] += stats.failed_extractions or 0
+            bytes_downloaded += stats.bytes_downloaded or 0
+            elapsed_ms_total += stats.elapsed_ms_total or 0
             
-            for data in extracted_data:
-                report_data["total_urls_crawled"] += 1
-                
-                if data.data and not data.data.get("error"):
-                    report_data["successful_extractions"] += 1
-                    all_data.append(data.data)
-                    
-                    for field in data.data.keys():
-                        field_counts[field] = field_counts.get(field, 0) + 1
-                else:
-                    report_data["failed_extractions"] += 1
+            for field, count in (stats.field_fill_counts or {}).items():
+                field_counts[field] = field_counts.get(field, 0) + count
         
         if field_counts:
-            total_records = len(all_data)
+            total_records = report_data["successful_extractions"]
             report_data["common_fields"] = [
                 field for field, count in field_counts.items()
                 if count >= total_records * 0.5
             ]
         
+        # Outcome breakdowns are aggregated in SQL from the per-row fetch columns
+        stats_service = StatsService(self.read_db)
+        report_data["fetch_outcomes"] = stats_service.get_outcome_counts(crawl_job_ids)
+        report_data["fetch_outcomes"]["slowest_hosts"] = stats_service.get_slowest_hosts(
+            crawl_job_ids, settings.report_slowest_hosts
+        )
+        
         report_data["data_summary"] = {
-            "total_records": len(all_data),
+            "total_records": report_data["successful_extractions"],
             "field_distribution": field_counts,
+            "bytes_downloaded": bytes_downloaded,
+            "average_response_time_ms": (
+                elapsed_ms_total / report_data["total_urls_crawled"]
+                if report_data["total_urls_crawled"] > 0 else 0
+            ),
             "success_rate": (
                 report_data["successful_extractions"] / report_data["total_urls_crawled"]
                 if report_data["total_urls_crawled"] > 0 else 0
             )
         }
         
-        return report_data
\ No newline at end of file
+        return report_data
+
+class AsyncReportService:
+    """ReportService for an AsyncSession, run through ``AsyncSession.run_sync``"""
+    
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
+        self.db = db
+        self.read_db = read_db
+    
+    async def _run(self, method: Callable[[ReportService], Any]) -> Any:
+        # Inside run_sync the read session's sync counterpart can be used too
+        read_session = self.read_db.sync_session if self.read_db is not None else None
+        return await self.db.run_sync(lambda session: method(ReportService(session, read_session)))
+    
+    async def create_report(self, report: ReportCreate, user_id: int) -> Report:
+        return await self._run(lambda service: service.create_report(report, user_id))
+    
+    async def get_reports(self, 
+                          user_id: int, 
+                          skip: int = 0, 
+                          limit: int = 100, 
+                          after_id: Optional[int] = None) -> List[Report]:
+        return await self._run(lambda service: service.get_reports(user_id, skip, limit, after_id))
+    
+    async def get_report(self, report_id: int, user_id: int) -> Optional[Report]:
+        return await self._run(lambda service: service.get_report(report_id, user_id))
\ No newline at end of file
@@ -0,0 +1,223 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..models.crawl_job import CrawlJob
+from ..core.cron import CronSchedule
+from ..core.leader_lock import LeaderLock
+from ..core.metrics import SCHEDULER_LEADER, SCHEDULER_RUNS
+from ..config import settings
+from ..database import SessionLocal, engine
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import logging
+import datetime
+
+logger = logging.getLogger(__name__)
+
+# Upcoming runs loaded per refresh; later ones are picked up by the next refresh
+MAX_LOADED_RUNS = 10000
+
+def next_run_time(scheduled_at: Optional[datetime.datetime],
+                  schedule: Optional[str],
+                  now: datetime.datetime) -> Optional[datetime.datetime]:
+    """When a job should next run, or None if it runs immediately (or never again).
+    
+    Recurring jobs run at the first cron occurrence at or after
+    ``scheduled_at`` (or after now, if that has passed). One-off jobs run at
+    a future ``scheduled_at``; without one they run as soon as they're created.
+    """
+    start = max(scheduled_at or now, now)
+    if schedule:
+        cron = CronSchedule(schedule)
+        candidate = cron.next_after(start - datetime.timedelta(minutes=1))
+        return candidate if candidate >= start else cron.next_after(start)
+    if scheduled_at and scheduled_at > now:
+        return scheduled_at
+    return None
+
+class ScheduleService:
+    """Database side of the scheduler: finding due runs and claiming them"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_upcoming_runs(self, until: datetime.datetime, limit: int = MAX_LOADED_RUNS) -> List[Tuple[int, datetime.datetime]]:
+        return self.db.query(CrawlJob.id, CrawlJob.next_run_at).filter(
+            CrawlJob.next_run_at <= until
+        ).order_by(CrawlJob.next_run_at).limit(limit).all()
+    
+    def claim_run(self,
+                  job_id: int,
+                  due_at: datetime.datetime,
+                  now: datetime.datetime) -> Tuple[bool, Optional[datetime.datetime]]:
+        """Advance a due job to its next run; returns (whether to run it now, next run).
+        
+        The update only applies while ``next_run_at`` still equals ``due_at``,
+        so a run is claimed once even if two schedulers race. A recurring job
+        that is still running from its previous occurrence skips this one.
+        """
+        job = self.db.get(CrawlJob, job_id)
+        if job is None or job.next_run_at != due_at:
+            return False, None
+        
+        next_run_at = CronSchedule(job.schedule).next_after(max(now, due_at)) if job.schedule else None
+        claimed = self.db.execute(
+            update(CrawlJob).where(
+                CrawlJob.id == job_id,
+                CrawlJob.next_run_at == due_at
+            ).values(next_run_at=next_run_at)
+        ).rowcount == 1
+        self.db.commit()
+        
+        if not claimed:
+            return False, None
+        if job.status in ("running", "paused"):
+            logger.warning(f"Skipping scheduled run of crawl job {job_id}: previous run still in progress")
+            SCHEDULER_RUNS.labels("skipped").inc()
+            return False, next_run_at
+        return True, next_run_at
+
+class CrawlScheduler:
+    """Runs crawl jobs at their ``next_run_at``, from one elected API instance.
+    
+    Upcoming runs (up to two refresh intervals ahead) sit in a heap, and the
+    loop sleeps until the earliest deadline or the next refresh, whichever
+    comes first; jobs scheduled through this instance wake it early. Idle
+    cost is one indexed query per refresh, however many jobs are scheduled.
+    Instances that lose the leader election only retry the lock.
+    """
+    
+    def __init__(self,
+                 session_factory: Callable[[], Session] = SessionLocal,
+                 lock: Optional[LeaderLock] = None,
+                 refresh_seconds: Optional[float] = None):
+        self.session_factory = session_factory
+        self.lock = lock or LeaderLock(engine, "crawl-scheduler")
+        self.refresh_seconds = refresh_seconds or settings.scheduler_refresh_seconds
+        self.is_leader = False
+        self._heap: List[Tuple[datetime.datetime, int]] = []
+        self._deadlines: Dict[int, datetime.datetime] = {}
+        self._next_refresh: Optional[datetime.datetime] = None
+        self._run_job: Optional[Callable[[int], Any]] = None
+        self._runs: Set[asyncio.Future] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self, run_job: Callable[[int], Any]):
+        """Start the scheduler loop; ``run_job(job_id)`` runs a job on a worker thread"""
+        self._run_job = run_job
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self.lock.release)
+        self.is_leader = False
+        SCHEDULER_LEADER.set(0)
+    
+    def notify(self, job_id: int, run_at: Optional[datetime.datetime]):
+        """Tell the scheduler a job's next run changed, so it needn't wait for a refresh"""
+        if self._task is None or not self.is_leader or run_at is None:
+            return
+        if self._next_refresh is not None and run_at > self._next_refresh + datetime.timedelta(seconds=self.refresh_seconds):
+            return  # beyond the loaded window; the refresh that reaches it will load it
+        
+        earliest = self._heap[0][0] if self._heap else None
+        self._push(job_id, run_at)
+        if earliest is None or run_at < earliest:
+            self._wakeup.set()
+    
+    def _push(self, job_id: int, run_at: datetime.datetime):
+        self._deadlines[job_id] = run_at
+        heapq.heappush(self._heap, (run_at, job_id))
+    
+    async def _loop(self):
+        while True:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.error(f"Scheduler iteration failed: {e}")
+            
+            timeout = self._seconds_until_next_wakeup()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _tick(self):
+        was_leader = self.is_leader
+        if was_leader:
+            self.is_leader = await asyncio.to_thread(self.lock.is_held)
+        else:
+            self.is_leader = await asyncio.to_thread(self.lock.try_acquire)
+        
+        if self.is_leader != was_leader:
+            logger.info(f"Crawl scheduler {'acquired' if self.is_leader else 'lost'} leadership")
+            SCHEDULER_LEADER.set(1 if self.is_leader else 0)
+            self._heap.clear()
+            self._deadlines.clear()
+            self._next_refresh = None
+        if not self.is_leader:
+            return
+        
+        now = datetime.datetime.utcnow()
+        if self._next_refresh is None or now >= self._next_refresh:
+            await self._refresh(now)
+        await self._fire_due()
+    
+    async def _refresh(self, now: datetime.datetime):
+        horizon = now + datetime.timedelta(seconds=self.refresh_seconds * 2)
+        runs = await asyncio.to_thread(self._with_session, lambda service: service.get_upcoming_runs(horizon))
+        
+        self._heap = [(run_at, job_id) for job_id, run_at in runs]
+        heapq.heapify(self._heap)
+        self._deadlines = {job_id: run_at for job_id, run_at in runs}
+        self._next_refresh = now + datetime.timedelta(seconds=self.refresh_seconds)
+        if len(runs) >= MAX_LOADED_RUNS:
+            self._next_refresh = min(self._next_refresh, runs[-1][1])
+    
+    async def _fire_due(self):
+        while self._heap and self._heap[0][0] <= datetime.datetime.utcnow():
+            due_at, job_id = heapq.heappop(self._heap)
+            if self._deadlines.get(job_id) != due_at:
+                continue  # superseded by a later notify or refresh
+            del self._deadlines[job_id]
+            
+            now = datetime.datetime.utcnow()
+            run_now, next_run_at = await asyncio.to_thread(
+                self._with_session, lambda service: service.claim_run(job_id, due_at, now)
+            )
+            if next_run_at is not None and next_run_at <= self._next_refresh + datetime.timedelta(seconds=self.refresh_seconds):
+                self._push(job_id, next_run_at)
+            if run_now:
+                self._start_run(job_id)
+    
+    def _start_run(self, job_id: int):
+        logger.info(f"Starting scheduled run of crawl job {job_id}")
+        SCHEDULER_RUNS.labels("started").inc()
+        run = asyncio.get_running_loop().run_in_executor(None, self._run_job, job_id)
+        self._runs.add(run)
+        run.add_done_callback(self._runs.discard)
+    
+    def _with_session(self, func: Callable[[ScheduleService], Any]) -> Any:
+        db = self.session_factory()
+        try:
+            return func(ScheduleService(db))
+        finally:
+            db.close()
+    
+    def _seconds_until_next_wakeup(self) -> float:
+        if not self.is_leader or self._next_refresh is None:
+            return self.refresh_seconds
+        wake_at = min(self._heap[0][0], self._next_refresh) if self._heap else self._next_refresh
+        return max((wake_at - datetime.datetime.utcnow()).total_seconds(), 0)
+
+scheduler = CrawlScheduler()
\ No newline at end of file
@@ -0,0 +1,207 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.crawl_job import ExtractedData
+from ..core.search_index import SEARCH_DIALECTS, SEARCH_TABLE, document_text, sqlite_match_query
+from ..config import settings
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ranked matches among the user's jobs, as (id, score) with higher scores
+# better; :after_score/:after_id continue after the last hit of a page
+SQLITE_SEARCH = f"""
+    SELECT id, score FROM (
+        SELECT rowid AS id, -bm25({SEARCH_TABLE}) AS score
+        FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH :query
+          AND crawl_job_id IN (SELECT id FROM crawl_jobs WHERE user_id = :user_id {{job_filter}})
+    )
+    {{cursor_filter}}
+    ORDER BY score DESC, id
+    LIMIT :limit
+"""
+
+POSTGRESQL_SEARCH = f"""
+    SELECT id, score FROM (
+        SELECT search.extracted_data_id AS id, ts_rank_cd(search.document, terms.query) AS score
+        FROM {SEARCH_TABLE} AS search, plainto_tsquery(CAST(:language AS regconfig), :query) AS terms(query)
+        WHERE search.document @@ terms.query
+          AND search.crawl_job_id IN (SELECT id FROM crawl_jobs WHERE user_id = :user_id {{job_filter}})
+    ) AS hits
+    {{cursor_filter}}
+    ORDER BY score DESC, id
+    LIMIT :limit
+"""
+
+class SearchNotSupportedError(Exception):
+    """Raised when the database has no full-text index"""
+
+def encode_cursor(score: float, row_id: int) -> str:
+    return f"{score!r}:{row_id}"
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """(score, id) of a search cursor; raises ValueError when malformed"""
+    score, _, row_id = cursor.rpartition(":")
+    return float(score), int(row_id)
+
+class SearchService:
+    """Full-text search over the string fields of extracted data.
+    
+    Documents are indexed in the ingest transaction of their rows, so search
+    sees results as soon as they are committed. SQLite uses an FTS5 table
+    ranked by BM25; Postgres a GIN-indexed tsvector ranked by ``ts_rank_cd``.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @property
+    def dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+    
+    @property
+    def supported(self) -> bool:
+        return self.dialect in SEARCH_DIALECTS
+    
+    def index_results(self, rows: List[ExtractedData], results: List[Dict[str, Any]]) -> int:
+        """Index flushed rows from the crawl results they were built from (committed by the caller).
+        
+        The text comes from the results rather than the rows, so compressed
+        payloads are not decoded again. Failed fetches are not indexed.
+        """
+        if not settings.search_enabled or not self.supported:
+            return 0
+        
+        documents = []
+        for row, result in zip(rows, results):
+            if result.get("error"):
+                continue
+            document = document_text(result.get("data"))
+            if document:
+                documents.append({"id": row.id, "crawl_job_id": row.crawl_job_id, "document": document})
+        if not documents:
+            return 0
+        
+        if self.dialect == "sqlite":
+            statement = text(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, document, crawl_job_id) VALUES (:id, :document, :crawl_job_id)"
+            )
+        else:
+            statement = text(
+                f"INSERT INTO {SEARCH_TABLE} (extracted_data_id, crawl_job_id, document) "
+                "VALUES (:id, :crawl_job_id, to_tsvector(CAST(:language AS regconfig), :document)) "
+                "ON CONFLICT (extracted_data_id) DO UPDATE SET document = EXCLUDED.document"
+            )
+            for document in documents:
+                document["language"] = settings.search_language
+        
+        self.db.execute(statement, documents)
+        return len(documents)
+    
+    def delete_job_documents(self, job_id: int):
+        """Drop a job's documents; called before its ExtractedData rows are deleted"""
+        if not self.supported:
+            return
+        if self.dialect == "sqlite":
+            # crawl_job_id is not indexed by FTS5, so documents are found by rowid
+            statement = f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id FROM extracted_data WHERE crawl_job_id = :job_id)"
+        else:
+            statement = f"DELETE FROM {SEARCH_TABLE} WHERE crawl_job_id = :job_id"
+        self.db.execute(text(statement), {"job_id": job_id})
+    
+    def index_job(self, job_id: int, batch_size: int = 1000) -> int:
+        """Rebuild the documents of a job's stored rows, one committed batch at a time.
+        
+        For rows stored before the search index existed.
+        """
+        if not self.supported:
+            raise SearchNotSupportedError(f"Full-text search is not supported on {self.dialect}")
+        
+        self.delete_job_documents(job_id)
+        self.db.commit()
+        
+        indexed = 0
+        last_id = 0
+        while True:
+            rows = self.db.query(ExtractedData).filter(
+                ExtractedData.crawl_job_id == job_id,
+                ExtractedData.id > last_id
+            ).order_by(ExtractedData.id).limit(batch_size).all()
+            if not rows:
+                break
+            
+            indexed += self.index_results(rows, [{"data": row.data, "error": row.error} for row in rows])
+            last_id = rows[-1].id
+            self.db.commit()
+            for row in rows:
+                self.db.expunge(row)
+        
+        logger.info(f"Indexed {indexed} rows of crawl job {job_id} for search")
+        return indexed
+    
+    def search(self,
+               user_id: int,
+               query: str,
+               job_id: Optional[int] = None,
+               limit: int = 20,
+               cursor: Optional[str] = None) -> List[Tuple[ExtractedData, float]]:
+        """Best-ranked rows of the user's jobs matching every word of ``query``, with their scores.
+        
+        Pages continue from ``cursor``, the ``encode_cursor`` of the last hit
+        of the previous page.
+        """
+        if not self.supported:
+            raise SearchNotSupportedError(f"Full-text search is not supported on {self.dialect}")
+        
+        params: Dict[str, Any] = {"user_id": user_id, "limit": limit}
+        if self.dialect == "sqlite":
+            params["query"] = sqlite_match_query(query)
+            if not params["query"]:
+                return []
+            statement = SQLITE_SEARCH
+        else:
+            params["query"] = query
+            params["language"] = settings.search_language
+            statement = POSTGRESQL_SEARCH
+        
+        job_filter = ""
+        if job_id is not None:
+            job_filter = "AND id = :job_id"
+            params["job_id"] = job_id
+        
+        cursor_filter = ""
+        if cursor is not None:
+            params["after_score"], params["after_id"] = decode_cursor(cursor)
+            cursor_filter = "WHERE score < :after_score OR (score = :after_score AND id > :after_id)"
+        
+        hits = self.db.execute(
+            text(statement.format(job_filter=job_filter, cursor_filter=cursor_filter)), params
+        ).all()
+        if not hits:
+            return []
+        
+        rows = {
+            row.id: row
+            for row in self.db.query(ExtractedData).filter(ExtractedData.id.in_([row_id for row_id, _ in hits]))
+        }
+        # A row deleted since the index was read is skipped
+        return [(rows[row_id], score) for row_id, score in hits if row_id in rows]
+
+class AsyncSearchService:
+    """SearchService for an AsyncSession, run through ``AsyncSession.run_sync``"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _run(self, method: Callable[[SearchService], Any]) -> Any:
+        return await self.db.run_sync(lambda session: method(SearchService(session)))
+    
+    async def search(self,
+                     user_id: int,
+                     query: str,
+                     job_id: Optional[int] = None,
+                     limit: int = 20,
+                     cursor: Optional[str] = None) -> List[Tuple[ExtractedData, float]]:
+        return await self._run(lambda service: service.search(user_id, query, job_id, limit, cursor))
\ No newline at end of file
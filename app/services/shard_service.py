@@ -0,0 +1,179 @@
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+from ..models.crawl_job import CrawlJob, CrawlJobShard, ExtractedData
+from ..config import settings
+from .webhook_service import WebhookService, webhook_sender
+from typing import Dict, List, Optional, Set
+import logging
+import datetime
+
+logger = logging.getLogger(__name__)
+
+SHARD_STATUSES = ("pending", "running", "completed", "failed", "cancelled")
+
+class ShardLeaseHeld(Exception):
+    """Raised for a shard another worker is still running; retry after ``retry_in`` seconds"""
+    
+    def __init__(self, shard_id: int, retry_in: float):
+        super().__init__(f"Crawl shard {shard_id} is leased for another {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+def split_urls(urls: List[str], shard_size: int) -> List[List[str]]:
+    """Consecutive slices of at most ``shard_size`` URLs"""
+    return [urls[start:start + shard_size] for start in range(0, len(urls), shard_size)]
+
+class ShardService:
+    """Tracks the shards of a fanned-out job and derives the job's status from them.
+    
+    Every state change is a compare-and-set on the current status, so a
+    shard runs once even if its task is delivered twice, and the job is
+    finished by whichever shard completes last. A running shard holds a
+    lease its worker keeps renewing; once the lease expires (the worker
+    died mid-crawl) a redelivered task claims the shard again. Each claim
+    bumps the shard's ``attempt``, and renewing or finishing requires the
+    caller's attempt, so a worker whose lease lapsed can't act on it.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def create_shards(self, job: CrawlJob, shard_size: int) -> List[CrawlJobShard]:
+        """Split the job's URLs into new pending shards, replacing those of earlier runs.
+        
+        Committed by the caller.
+        """
+        self.db.query(CrawlJobShard).filter(CrawlJobShard.crawl_job_id == job.id).delete()
+        shards = [
+            CrawlJobShard(crawl_job_id=job.id, shard_index=index, urls=urls, status="pending", urls_crawled=0)
+            for index, urls in enumerate(split_urls(job.target_urls or [], shard_size))
+        ]
+        self.db.add_all(shards)
+        self.db.flush()
+        return shards
+    
+    def start_shard(self, shard_id: int) -> Optional[CrawlJobShard]:
+        """Mark a pending shard, or a running one whose lease expired, as running.
+        
+        None if it is gone, finished or leased by another worker. The
+        returned shard's ``attempt`` identifies this claim.
+        """
+        now = datetime.datetime.utcnow()
+        claimed = self.db.execute(
+            update(CrawlJobShard).where(
+                CrawlJobShard.id == shard_id,
+                or_(
+                    CrawlJobShard.status == "pending",
+                    and_(
+                        CrawlJobShard.status == "running",
+                        or_(CrawlJobShard.lease_expires_at.is_(None), CrawlJobShard.lease_expires_at < now)
+                    )
+                )
+            ).values(
+                status="running",
+                attempt=func.coalesce(CrawlJobShard.attempt, 0) + 1,
+                started_at=now,
+                lease_expires_at=now + datetime.timedelta(seconds=settings.shard_lease_seconds)
+            )
+        ).rowcount == 1
+        self.db.commit()
+        return self.db.get(CrawlJobShard, shard_id) if claimed else None
+    
+    def renew_lease(self, shard_id: int, attempt: int) -> bool:
+        """Extend a running shard's lease; False once it is finished or claimed again"""
+        renewed = self.db.execute(
+            update(CrawlJobShard).where(
+                CrawlJobShard.id == shard_id,
+                CrawlJobShard.attempt == attempt,
+                CrawlJobShard.status == "running"
+            ).values(
+                lease_expires_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.shard_lease_seconds)
+            )
+        ).rowcount == 1
+        self.db.commit()
+        return renewed
+    
+    def lease_remaining(self, shard_id: int) -> Optional[float]:
+        """Seconds until a running shard's lease expires; None unless it is running"""
+        shard = self.db.query(CrawlJobShard.status, CrawlJobShard.lease_expires_at).filter(
+            CrawlJobShard.id == shard_id
+        ).first()
+        if shard is None or shard.status != "running":
+            return None
+        if shard.lease_expires_at is None:
+            return 0
+        return max((shard.lease_expires_at - datetime.datetime.utcnow()).total_seconds(), 0)
+    
+    def stored_urls(self, job_id: int, urls: List[str], batch_size: int = 500) -> Set[str]:
+        """The URLs among ``urls`` the job already has results for"""
+        stored = set()
+        for start in range(0, len(urls), batch_size):
+            stored.update(url for url, in self.db.query(ExtractedData.url).filter(
+                ExtractedData.crawl_job_id == job_id,
+                ExtractedData.url.in_(urls[start:start + batch_size])
+            ))
+        return stored
+    
+    def finish_shard(self,
+                     shard_id: int,
+                     attempt: int,
+                     urls_crawled: int,
+                     error: Optional[str] = None,
+                     cancelled: bool = False) -> Optional[str]:
+        """Record the outcome of a claim on a shard; returns the job's final status once all shards are done"""
+        job_id = self.db.query(CrawlJobShard.crawl_job_id).filter(CrawlJobShard.id == shard_id).scalar()
+        self.db.execute(
+            update(CrawlJobShard).where(
+                CrawlJobShard.id == shard_id,
+                CrawlJobShard.attempt == attempt,
+                CrawlJobShard.status == "running"
+            ).values(
+                status="cancelled" if cancelled else "failed" if error else "completed",
+                urls_crawled=urls_crawled,
+                error=error,
+                completed_at=datetime.datetime.utcnow(),
+                lease_expires_at=None
+            )
+        )
+        self.db.commit()
+        return self.aggregate_job_status(job_id) if job_id is not None else None
+    
+    def get_shard_counts(self, job_id: int) -> Dict[str, int]:
+        """Number of the job's shards in each status; empty if the job was not sharded"""
+        rows = self.db.query(CrawlJobShard.status, func.count()).filter(
+            CrawlJobShard.crawl_job_id == job_id
+        ).group_by(CrawlJobShard.status).all()
+        if not rows:
+            return {}
+        
+        counts = {status: 0 for status in SHARD_STATUSES}
+        counts.update(rows)
+        counts["total"] = sum(count for _, count in rows)
+        return counts
+    
+    def aggregate_job_status(self, job_id: int) -> Optional[str]:
+        """Complete the job if none of its shards are left; None while some still are.
+        
+        Each shard commits its own outcome before counting, so the shard
+        that finishes last always sees every other one as done. The job fails
+        if any shard failed; a cancelled job stays cancelled.
+        """
+        counts = self.get_shard_counts(job_id)
+        if not counts or counts["pending"] or counts["running"]:
+            return None
+        
+        status = "failed" if counts["failed"] else "completed"
+        finished = self.db.execute(
+            update(CrawlJob).where(
+                CrawlJob.id == job_id,
+                CrawlJob.status.in_(("running", "paused"))
+            ).values(status=status, completed_at=datetime.datetime.utcnow())
+        ).rowcount == 1
+        notified = finished and WebhookService(self.db).enqueue_job_event(job_id, status)
+        self.db.commit()
+        
+        if notified:
+            webhook_sender.notify()
+        
+        if finished:
+            logger.info(f"Crawl job {job_id} {status}: {counts['completed']}/{counts['total']} shards completed")
+        return status
\ No newline at end of file
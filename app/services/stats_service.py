@@ -0,0 +1,234 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.crawl_job import CrawlJob, CrawlJobStats, ExtractedData, FetchTiming
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import datetime
+
+logger = logging.getLogger(__name__)
+
+def is_successful_result(result: Dict[str, Any]) -> bool:
+    """A result counts as successful when it has no error and extracted something"""
+    return not result.get("error") and bool(result.get("data"))
+
+def is_filled(value: Any) -> bool:
+    """Whether an extracted field value carries any content"""
+    return value not in (None, "", [], {})
+
+class StatsService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_job_stats(self, job_id: int) -> Optional[CrawlJobStats]:
+        return self.db.query(CrawlJobStats).filter(
+            CrawlJobStats.crawl_job_id == job_id
+        ).first()
+    
+    def get_job_progress(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """A job's status and progress counters in one lookup; None if the job doesn't exist"""
+        row = self.db.query(
+            CrawlJob.status,
+            CrawlJobStats.urls_crawled,
+            CrawlJobStats.failed_extractions,
+            CrawlJobStats.bytes_downloaded
+        ).outerjoin(
+            CrawlJobStats, CrawlJobStats.crawl_job_id == CrawlJob.id
+        ).filter(CrawlJob.id == job_id).first()
+        if row is None:
+            return None
+        
+        status, done, failed, bytes_downloaded = row
+        return {"status": status, "done": done or 0, "failed": failed or 0, "bytes_downloaded": bytes_downloaded or 0}
+    
+    def create_job_stats(self, job_id: int) -> CrawlJobStats:
+        """Add an empty stats row for a new job (committed by the caller)"""
+        stats = CrawlJobStats(
+            crawl_job_id=job_id,
+            urls_crawled=0,
+            successful_extractions=0,
+            failed_extractions=0,
+            bytes_downloaded=0,
+            elapsed_ms_total=0,
+            field_fill_counts={},
+            data_version=0
+        )
+        self.db.add(stats)
+        return stats
+    
+    def record_results(self, job_id: int, results: List[Dict[str, Any]]) -> CrawlJobStats:
+        """Fold a batch of crawl results into the job's running totals.
+        
+        The row is locked for the update so concurrent writers for the same
+        job don't lose increments; the caller commits together with the
+        ExtractedData rows of the batch.
+        """
+        stats = self.db.query(CrawlJobStats).filter(
+            CrawlJobStats.crawl_job_id == job_id
+        ).with_for_update().first()
+        if stats is None:
+            stats = self.create_job_stats(job_id)
+        
+        self._apply_results(stats, results)
+        return stats
+    
+    def _apply_results(self, stats: CrawlJobStats, results: List[Dict[str, Any]]):
+        successful = 0
+        field_fill_counts = dict(stats.field_fill_counts or {})
+        
+        for result in results:
+            if is_successful_result(result):
+                successful += 1
+                for field, value in result["data"].items():
+                    if is_filled(value):
+                        field_fill_counts[field] = field_fill_counts.get(field, 0) + 1
+        
+        stats.urls_crawled = (stats.urls_crawled or 0) + len(results)
+        stats.successful_extractions = (stats.successful_extractions or 0) + successful
+        stats.failed_extractions = (stats.failed_extractions or 0) + len(results) - successful
+        stats.bytes_downloaded = (stats.bytes_downloaded or 0) + sum(r.get("bytes") or 0 for r in results)
+        stats.elapsed_ms_total = (stats.elapsed_ms_total or 0) + sum(r.get("elapsed_ms") or 0 for r in results)
+        stats.field_fill_counts = field_fill_counts
+        stats.data_version = (stats.data_version or 0) + 1
+        stats.updated_at = datetime.datetime.utcnow()
+    
+    def get_data_versions(self, job_ids: Iterable[int]) -> Dict[int, str]:
+        """Current data version per job, changed whenever a job gets new results.
+        
+        The counter restarts for a new stats row, and a deleted job's id can
+        be reused, so the version carries the row's last update time as well.
+        """
+        rows = self.db.query(
+            CrawlJobStats.crawl_job_id, CrawlJobStats.data_version, CrawlJobStats.updated_at
+        ).filter(
+            CrawlJobStats.crawl_job_id.in_(set(job_ids))
+        ).all()
+        return {
+            job_id: f"{version}@{updated_at.isoformat() if updated_at else '-'}"
+            for job_id, version, updated_at in rows
+        }
+    
+    def get_outcome_counts(self, job_ids: Iterable[int]) -> Dict[str, Dict[str, int]]:
+        """Row counts per HTTP status and per error class over the jobs.
+        
+        Counted from the (crawl_job_id, http_status, error_class) index without
+        reading rows. Requests that got no response count under "none".
+        """
+        rows = self.db.query(
+            ExtractedData.http_status, ExtractedData.error_class, func.count()
+        ).filter(
+            ExtractedData.crawl_job_id.in_(set(job_ids))
+        ).group_by(ExtractedData.http_status, ExtractedData.error_class).all()
+        
+        status_codes: Dict[str, int] = {}
+        error_classes: Dict[str, int] = {}
+        for status, error_class, count in rows:
+            key = str(status) if status is not None else "none"
+            status_codes[key] = status_codes.get(key, 0) + count
+            if error_class:
+                error_classes[error_class] = error_classes.get(error_class, 0) + count
+        return {"status_codes": status_codes, "error_classes": error_classes}
+    
+    def get_slowest_hosts(self, job_ids: Iterable[int], limit: int = 10) -> List[Dict[str, Any]]:
+        """Hosts of the jobs by average response time, slowest first.
+        
+        Hosts come from the fetch timings, so results without timings (tasks
+        that failed before fetching) are left out.
+        """
+        average = func.avg(ExtractedData.elapsed_ms)
+        rows = self.db.query(
+            FetchTiming.host,
+            func.count(),
+            func.count(ExtractedData.error_class),
+            average
+        ).join(
+            ExtractedData, ExtractedData.id == FetchTiming.extracted_data_id
+        ).filter(
+            FetchTiming.crawl_job_id.in_(set(job_ids))
+        ).group_by(FetchTiming.host).order_by(average.desc()).limit(limit).all()
+        
+        return [
+            {
+                "host": host,
+                "urls_crawled": count,
+                "failed": failed,
+                "average_response_time_ms": float(elapsed or 0)
+            }
+            for host, count, failed, elapsed in rows
+        ]
+    
+    def get_stats_for_jobs(self, job_ids: Iterable[int], backfill: bool = True) -> Dict[int, CrawlJobStats]:
+        """Load stats rows for several jobs, backfilling jobs that predate the stats table"""
+        job_ids = set(job_ids)
+        if not job_ids:
+            return {}
+        
+        stats_by_job = {
+            stats.crawl_job_id: stats
+            for stats in self.db.query(CrawlJobStats).filter(
+                CrawlJobStats.crawl_job_id.in_(job_ids)
+            ).all()
+        }
+        
+        missing = job_ids - stats_by_job.keys()
+        if missing and backfill:
+            existing_jobs = self.db.query(CrawlJob.id).filter(CrawlJob.id.in_(missing)).all()
+            for (job_id,) in existing_jobs:
+                stats_by_job[job_id] = self.rebuild_job_stats(job_id)
+            self.db.commit()
+        
+        return stats_by_job
+    
+    def rebuild_job_stats(self, job_id: int) -> CrawlJobStats:
+        """Recompute a job's stats from its raw extracted data.
+        
+        Only needed for jobs crawled before stats were recorded at ingest
+        time; rows stored before fetch outcomes were recorded add no bytes
+        or latency.
+        """
+        logger.info(f"Rebuilding stats for crawl job {job_id} from extracted data")
+        
+        stats = self.get_job_stats(job_id)
+        if stats is None:
+            stats = self.create_job_stats(job_id)
+        else:
+            stats.urls_crawled = 0
+            stats.successful_extractions = 0
+            stats.failed_extractions = 0
+            stats.bytes_downloaded = 0
+            stats.elapsed_ms_total = 0
+            stats.field_fill_counts = {}
+        
+        rows = self.db.query(ExtractedData).filter(
+            ExtractedData.crawl_job_id == job_id
+        ).yield_per(1000)
+        
+        batch = []
+        for row in rows:
+            batch.append({"data": row.data or {}, "error": row.error, "bytes": row.bytes, "elapsed_ms": row.elapsed_ms})
+            if len(batch) >= 1000:
+                self._apply_results(stats, batch)
+                batch = []
+        if batch:
+            self._apply_results(stats, batch)
+        
+        return stats
+    
+    def reset_job_stats(self, job_id: int):
+        """Zero a job's totals before its results are rebuilt, under a new data version"""
+        stats = self.get_job_stats(job_id)
+        if stats is None:
+            self.create_job_stats(job_id)
+            return
+        stats.urls_crawled = 0
+        stats.successful_extractions = 0
+        stats.failed_extractions = 0
+        stats.bytes_downloaded = 0
+        stats.elapsed_ms_total = 0
+        stats.field_fill_counts = {}
+        stats.data_version = (stats.data_version or 0) + 1
+        stats.updated_at = datetime.datetime.utcnow()
+    
+    def delete_job_stats(self, job_id: int):
+        self.db.query(CrawlJobStats).filter(
+            CrawlJobStats.crawl_job_id == job_id
+        ).delete()
\ No newline at end of file
@@ -1,8 +1,10 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
 from ..core.security import get_password_hash, verify_password
-from typing import Optional
+from ..core.user_cache import invalidate_user
+from typing import Any, Callable, Optional
 
 class UserService:
     def __init__(self, db: Session):
@@ -14,8 +16,8 @@ class UserService:
     def get_user_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(User.email == email).first()
     
-    def create_user(self, user: UserCreate) -> User:
-        hashed_password = get_password_hash(user.password)
+    def create_user(self, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        hashed_password = hashed_password or get_password_hash(user.password)
         db_user = User(
             email=user.email,
             hashed_password=hashed_password,
@@ -34,18 +36,65 @@ class UserService:
             return None
         return user
     
-    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    def update_user(self, 
+                    user_id: int, 
+                    user_update: UserUpdate, 
+                    hashed_password: Optional[str] = None) -> Optional[User]:
         user = self.get_user(user_id)
         if not user:
             return None
         
         update_data = user_update.dict(exclude_unset=True)
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            password = update_data.pop("password")
+            update_data["hashed_password"] = hashed_password or get_password_hash(password)
         
         for field, value in update_data.items():
             setattr(user, field, value)
         
         self.db.commit()
         self.db.refresh(user)
-        return user
\ No newline at end of file
+        invalidate_user(user.email)
+        return user
+    
+    def deactivate_user(self, user_id: int) -> Optional[User]:
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        
+        user.is_active = False
+        self.db.commit()
+        self.db.refresh(user)
+        invalidate_user(user.email)
+        return user
+
+class AsyncUserService:
+    """UserService for an AsyncSession.
+    
+    Each call runs the sync implementation through ``AsyncSession.run_sync``,
+    so queries go over the async driver without blocking the event loop.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _run(self, method: Callable[[UserService], Any]) -> Any:
+        return await self.db.run_sync(lambda session: method(UserService(session)))
+    
+    async def get_user(self, user_id: int) -> Optional[User]:
+        return await self._run(lambda service: service.get_user(user_id))
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        return await self._run(lambda service: service.get_user_by_email(email))
+    
+    async def create_user(self, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        return await self._run(lambda service: service.create_user(user, hashed_password))
+    
+    async def update_user(self, 
+                          user_id: int, 
+                          user_update: UserUpdate, 
+                          hashed_password: Optional[str] = None) -> Optional[User]:
+        return await self._run(lambda service: service.update_user(user_id, user_update, hashed_password))
+    
+    async def deactivate_user(self, user_id: int) -> Optional[User]:
+        return await self._run(lambda service: service.deactivate_user(user_id))
\ No newline at end of file
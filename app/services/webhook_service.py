@@ -0,0 +1,371 @@
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.crawl_job import CrawlJob
+from ..models.webhook import Webhook, WebhookDelivery
+from ..schemas.webhook import WebhookCreate
+from ..core.metrics import WEBHOOK_BATCH_SIZE, WEBHOOK_DELIVERIES
+from ..config import settings
+from ..database import SessionLocal
+from .stats_service import StatsService
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import aiohttp
+import asyncio
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Crawlkit-Signature"
+
+class DeliveryBatch(NamedTuple):
+    """Claimed deliveries of one webhook, sent in a single request"""
+    webhook_id: int
+    url: str
+    secret: Optional[str]
+    delivery_ids: List[int]
+    payloads: List[Dict[str, Any]]
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next try of a delivery that failed ``attempts`` times"""
+    return min(settings.webhook_retry_base_seconds * 2 ** (attempts - 1), settings.webhook_retry_max_seconds)
+
+def sign_body(secret: str, body: bytes) -> str:
+    """Value of the signature header: receivers recompute it over the raw body"""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+class WebhookService:
+    """Webhook targets and the outbox of their deliveries"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def create_webhook(self, webhook: WebhookCreate, user_id: int) -> Webhook:
+        db_webhook = Webhook(
+            user_id=user_id,
+            crawl_job_id=webhook.crawl_job_id,
+            url=webhook.url,
+            secret=webhook.secret,
+            events=webhook.events
+        )
+        self.db.add(db_webhook)
+        self.db.commit()
+        self.db.refresh(db_webhook)
+        return db_webhook
+    
+    def get_webhooks(self, user_id: int) -> List[Webhook]:
+        return self.db.query(Webhook).filter(Webhook.user_id == user_id).order_by(Webhook.id).all()
+    
+    def get_webhook(self, webhook_id: int, user_id: int) -> Optional[Webhook]:
+        return self.db.query(Webhook).filter(
+            Webhook.id == webhook_id,
+            Webhook.user_id == user_id
+        ).first()
+    
+    def delete_webhook(self, webhook_id: int, user_id: int) -> bool:
+        webhook = self.get_webhook(webhook_id, user_id)
+        if not webhook:
+            return False
+        
+        self.db.query(WebhookDelivery).filter(WebhookDelivery.webhook_id == webhook_id).delete()
+        self.db.delete(webhook)
+        self.db.commit()
+        return True
+    
+    def delete_job_webhooks(self, job_id: int):
+        """Drop the webhooks bound to a job that is being deleted; the caller commits"""
+        webhook_ids = [
+            webhook_id for webhook_id, in
+            self.db.query(Webhook.id).filter(Webhook.crawl_job_id == job_id)
+        ]
+        if webhook_ids:
+            self.db.query(WebhookDelivery).filter(
+                WebhookDelivery.webhook_id.in_(webhook_ids)
+            ).delete(synchronize_session=False)
+            self.db.query(Webhook).filter(Webhook.id.in_(webhook_ids)).delete(synchronize_session=False)
+    
+    def get_deliveries(self, webhook_id: int, limit: int = 100) -> List[WebhookDelivery]:
+        """Most recent deliveries of a webhook first"""
+        return self.db.query(WebhookDelivery).filter(
+            WebhookDelivery.webhook_id == webhook_id
+        ).order_by(WebhookDelivery.id.desc()).limit(limit).all()
+    
+    def enqueue_job_event(self, job_id: int, status: str) -> int:
+        """Add a delivery to every webhook following a job that just ended with ``status``.
+        
+        Called before the commit that finishes the job, so the event is
+        recorded if and only if the status change is. Returns the number of
+        deliveries added; the caller commits.
+        """
+        event_type = f"job.{status}"
+        job = self.db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+        if not job:
+            return 0
+        
+        webhooks = [
+            webhook for webhook in self.db.query(Webhook).filter(
+                Webhook.user_id == job.user_id,
+                or_(Webhook.crawl_job_id.is_(None), Webhook.crawl_job_id == job_id)
+            )
+            if event_type in (webhook.events or [])
+        ]
+        if not webhooks:
+            return 0
+        
+        now = datetime.datetime.utcnow()
+        payload = self._job_event(event_type, job, status, now)
+        self.db.add_all([
+            WebhookDelivery(
+                webhook_id=webhook.id,
+                event_type=event_type,
+                payload=payload,
+                status="pending",
+                attempts=0,
+                next_attempt_at=now,
+                created_at=now
+            )
+            for webhook in webhooks
+        ])
+        return len(webhooks)
+    
+    def _job_event(self, event_type: str, job: CrawlJob, status: str, now: datetime.datetime) -> Dict[str, Any]:
+        stats = StatsService(self.db).get_job_stats(job.id)
+        return {
+            "id": uuid.uuid4().hex,
+            "type": event_type,
+            "created_at": now.isoformat(),
+            "job": {
+                "id": job.id,
+                "name": job.name,
+                "status": status,
+                "started_at": job.started_at.isoformat() if job.started_at else None,
+                "completed_at": now.isoformat()
+            },
+            "stats": {
+                "total_urls": len(job.target_urls or []),
+                "urls_crawled": stats.urls_crawled if stats else 0,
+                "successful_extractions": stats.successful_extractions if stats else 0,
+                "failed_extractions": stats.failed_extractions if stats else 0,
+                "bytes_downloaded": stats.bytes_downloaded if stats else 0
+            }
+        }
+    
+    def claim_due_deliveries(self, now: datetime.datetime, limit: int, lease_seconds: float) -> List[DeliveryBatch]:
+        """Take up to ``limit`` due deliveries and group them into per-webhook batches.
+        
+        Each claim pushes ``next_attempt_at`` past the lease, compared against
+        the value just read, so two senders never take the same delivery and
+        deliveries of a sender that dies are retried once the lease runs out.
+        """
+        rows = self.db.query(
+            WebhookDelivery.id, WebhookDelivery.webhook_id, WebhookDelivery.payload, WebhookDelivery.next_attempt_at
+        ).filter(
+            WebhookDelivery.status == "pending",
+            WebhookDelivery.next_attempt_at <= now
+        ).order_by(WebhookDelivery.next_attempt_at).limit(limit).all()
+        
+        lease_until = now + datetime.timedelta(seconds=lease_seconds)
+        claimed: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+        for delivery_id, webhook_id, payload, next_attempt_at in rows:
+            taken = self.db.execute(
+                update(WebhookDelivery).where(
+                    WebhookDelivery.id == delivery_id,
+                    WebhookDelivery.status == "pending",
+                    WebhookDelivery.next_attempt_at == next_attempt_at
+                ).values(next_attempt_at=lease_until)
+            ).rowcount == 1
+            if taken:
+                claimed.setdefault(webhook_id, []).append((delivery_id, payload))
+        self.db.commit()
+        
+        if not claimed:
+            return []
+        webhooks = self.db.query(Webhook.id, Webhook.url, Webhook.secret).filter(
+            Webhook.id.in_(list(claimed))
+        ).all()
+        
+        batches = []
+        for webhook_id, url, secret in webhooks:
+            deliveries = claimed[webhook_id]
+            for start in range(0, len(deliveries), settings.webhook_batch_size):
+                chunk = deliveries[start:start + settings.webhook_batch_size]
+                batches.append(DeliveryBatch(
+                    webhook_id, url, secret,
+                    [delivery_id for delivery_id, _ in chunk],
+                    [payload for _, payload in chunk]
+                ))
+        return batches
+    
+    def record_attempts(self, outcomes: List[Tuple[DeliveryBatch, Optional[str]]], now: datetime.datetime):
+        """Store the outcome of sent batches: an error (None on success) per batch.
+        
+        Failed deliveries are retried with exponential backoff until
+        ``webhook_max_attempts`` is reached, then marked failed.
+        """
+        for batch, error in outcomes:
+            if error is None:
+                self.db.execute(
+                    update(WebhookDelivery).where(
+                        WebhookDelivery.id.in_(batch.delivery_ids)
+                    ).values(
+                        status="delivered",
+                        attempts=WebhookDelivery.attempts + 1,
+                        delivered_at=now,
+                        last_error=None
+                    )
+                )
+                WEBHOOK_DELIVERIES.labels("delivered").inc(len(batch.delivery_ids))
+                continue
+            
+            deliveries = self.db.query(WebhookDelivery).filter(
+                WebhookDelivery.id.in_(batch.delivery_ids)
+            ).all()
+            for delivery in deliveries:
+                delivery.attempts = (delivery.attempts or 0) + 1
+                delivery.last_error = error[:1000]
+                if delivery.attempts >= settings.webhook_max_attempts:
+                    delivery.status = "failed"
+                    WEBHOOK_DELIVERIES.labels("failed").inc()
+                else:
+                    delivery.next_attempt_at = now + datetime.timedelta(seconds=retry_delay(delivery.attempts))
+                    WEBHOOK_DELIVERIES.labels("retried").inc()
+            logger.warning(f"Webhook {batch.webhook_id} delivery of {len(batch.delivery_ids)} events failed: {error}")
+        self.db.commit()
+
+class AsyncWebhookService:
+    """WebhookService for an AsyncSession, run through ``AsyncSession.run_sync``"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _run(self, method: Callable[[WebhookService], Any]) -> Any:
+        return await self.db.run_sync(lambda session: method(WebhookService(session)))
+    
+    async def create_webhook(self, webhook: WebhookCreate, user_id: int) -> Webhook:
+        return await self._run(lambda service: service.create_webhook(webhook, user_id))
+    
+    async def get_webhooks(self, user_id: int) -> List[Webhook]:
+        return await self._run(lambda service: service.get_webhooks(user_id))
+    
+    async def get_webhook(self, webhook_id: int, user_id: int) -> Optional[Webhook]:
+        return await self._run(lambda service: service.get_webhook(webhook_id, user_id))
+    
+    async def delete_webhook(self, webhook_id: int, user_id: int) -> bool:
+        return await self._run(lambda service: service.delete_webhook(webhook_id, user_id))
+    
+    async def get_deliveries(self, webhook_id: int, limit: int = 100) -> List[WebhookDelivery]:
+        return await self._run(lambda service: service.get_deliveries(webhook_id, limit))
+
+class WebhookSender:
+    """Sends the outbox in batches over one pooled HTTP client.
+    
+    Each webhook gets one POST of ``{"events": [...]}`` per batch, signed
+    with its secret. The loop wakes when a job of this process finishes
+    (after ``webhook_batch_window``, so events that end together share a
+    request) and every ``webhook_poll_seconds`` for retries and events
+    written by other processes, such as shard workers.
+    """
+    
+    def __init__(self,
+                 session_factory: Callable[[], Session] = SessionLocal,
+                 poll_seconds: Optional[float] = None,
+                 batch_window: Optional[float] = None):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.webhook_poll_seconds
+        self.batch_window = batch_window if batch_window is not None else settings.webhook_batch_window
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+    
+    def notify(self):
+        """Tell the sender new deliveries are waiting; safe to call from any thread"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+    
+    def create_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=settings.webhook_timeout),
+            connector=aiohttp.TCPConnector(limit=settings.webhook_max_connections)
+        )
+    
+    async def _run(self):
+        async with self.create_session() as session:
+            while True:
+                try:
+                    claimed = await self.send_due(session)
+                except Exception as e:
+                    logger.error(f"Webhook delivery iteration failed: {e}")
+                    claimed = 0
+                if claimed >= settings.webhook_batch_size:
+                    continue  # more may be due already
+                
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                    await asyncio.sleep(self.batch_window)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def send_due(self, session: aiohttp.ClientSession) -> int:
+        """Send every batch that is due once; returns the number of deliveries claimed"""
+        now = datetime.datetime.utcnow()
+        # A claim outlives a request that times out, so it is never sent twice at once
+        lease_seconds = settings.webhook_timeout * 2
+        batches = await asyncio.to_thread(
+            self._with_service,
+            lambda service: service.claim_due_deliveries(now, settings.webhook_batch_size, lease_seconds)
+        )
+        if not batches:
+            return 0
+        
+        errors = await asyncio.gather(*(self._post(session, batch) for batch in batches))
+        finished = datetime.datetime.utcnow()
+        await asyncio.to_thread(
+            self._with_service, lambda service: service.record_attempts(list(zip(batches, errors)), finished)
+        )
+        return sum(len(batch.delivery_ids) for batch in batches)
+    
+    async def _post(self, session: aiohttp.ClientSession, batch: DeliveryBatch) -> Optional[str]:
+        """POST one batch; returns None on a 2xx response, the error otherwise"""
+        body = json.dumps({"events": batch.payloads}).encode()
+        headers = {"Content-Type": "application/json"}
+        if batch.secret:
+            headers[SIGNATURE_HEADER] = sign_body(batch.secret, body)
+        
+        WEBHOOK_BATCH_SIZE.observe(len(batch.payloads))
+        try:
+            async with session.post(batch.url, data=body, headers=headers) as response:
+                if 200 <= response.status < 300:
+                    return None
+                return f"HTTP {response.status}"
+        except Exception as e:
+            return str(e) or type(e).__name__
+    
+    def _with_service(self, func: Callable[[WebhookService], Any]) -> Any:
+        db = self.session_factory()
+        try:
+            return func(WebhookService(db))
+        finally:
+            db.close()
+
+webhook_sender = WebhookSender()
\ No newline at end of file
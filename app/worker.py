@@ -0,0 +1,59 @@
+from celery import Celery
+from .config import settings
+from .database import PROJECT_ROOT, SessionLocal
+from .services.crawl_service import CrawlService
+from .services.shard_service import ShardLeaseHeld
+from typing import Any, Dict
+import os
+
+def broker_options(broker_url: str, folder: str) -> Dict[str, Any]:
+    """Celery settings for a broker URL.
+    
+    The filesystem transport exchanges messages as files in ``folder``
+    (relative to the project root), so shards can be fanned out to workers
+    on one machine without Redis. It has no broadcast support, which remote
+    control needs.
+    """
+    if not broker_url.startswith("filesystem://"):
+        return {}
+    
+    folder = os.path.join(PROJECT_ROOT, folder)
+    queue_folder = os.path.join(folder, "queue")
+    os.makedirs(queue_folder, exist_ok=True)
+    return {
+        "broker_transport_options": {
+            "data_folder_in": queue_folder,
+            "data_folder_out": queue_folder,
+            "control_folder": os.path.join(folder, "control")
+        },
+        "worker_enable_remote_control": False
+    }
+
+celery_app = Celery("crawlkit")
+celery_app.conf.update(
+    broker_url=settings.celery_broker_url or "memory://",
+    broker_connection_retry_on_startup=True,
+    task_always_eager=settings.celery_task_always_eager,
+    # Job and shard status live in the database; there are no results to keep
+    task_ignore_result=True,
+    # A shard is a long task; don't let one worker reserve several of them
+    worker_prefetch_multiplier=1,
+    # Acknowledged only once crawled, so the shard of a worker that died is
+    # redelivered and re-claimed when its lease expires
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    **broker_options(settings.celery_broker_url or "", settings.celery_broker_folder)
+)
+
+@celery_app.task(name="crawlkit.crawl_shard", bind=True)
+def crawl_shard(self, shard_id: int) -> int:
+    """Crawl one shard of a job on its own session; returns the number of results"""
+    db = SessionLocal()
+    try:
+        return CrawlService(db).execute_shard(shard_id)
+    except ShardLeaseHeld as e:
+        # Redelivered while the shard's lease is live: its worker may still
+        # finish it, or the lease expires and this task takes over
+        raise self.retry(exc=e, countdown=e.retry_in + 1, max_retries=None)
+    finally:
+        db.close()
\ No newline at end of file
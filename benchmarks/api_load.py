@@ -0,0 +1,276 @@
+"""Load test the API in-process or through a local uvicorn server.
+
+Seeds a temporary SQLite database (unless ``--database-url`` is given),
+then runs closed-loop scenarios where ``--concurrency`` clients send
+requests back to back:
+
+- ``login``: POST /auth/login for the seeded users (bcrypt bound)
+- ``status``: every user polling GET /crawl-jobs/{id}/status of their job
+- ``list``: GET /crawl-jobs/ where each job has ``--target-urls`` URLs
+- ``data``: pull a job's full result set through GET /crawl-jobs/{id}/data
+  pages, following X-Next-Cursor (one operation per full pull)
+- ``data-ndjson``: the same result set as one ``format=ndjson`` stream
+
+``--target inprocess`` calls the ASGI app directly, which isolates
+dependency, serialization and DB costs; ``--target uvicorn`` adds the HTTP
+server and sockets. Each scenario reports throughput and latency
+percentiles.
+
+Usage:
+    python benchmarks/api_load.py --target inprocess --output api_inprocess.json
+    python benchmarks/api_load.py --target uvicorn --scenarios status,list --concurrency 50
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import tempfile
+import threading
+import time
+from datetime import timedelta
+import httpx
+import uvicorn
+
+SCENARIOS = ("login", "status", "list", "data", "data-ndjson")
+DEFAULT_REQUESTS = {"login": 100, "status": 2000, "list": 500, "data": 10, "data-ndjson": 10}
+PASSWORD = "load-test-password"
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(samples, concurrency: int, wall_seconds: float) -> dict:
+    latencies = [latency for latency, _, _ in samples]
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    received = sum(size for _, _, size in samples)
+    return {
+        "requests": len(samples),
+        "concurrency": concurrency,
+        "wall_seconds": wall_seconds,
+        "throughput_per_s": len(samples) / wall_seconds if wall_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+        "statuses": statuses,
+        "mb_per_s": received / wall_seconds / 1_000_000 if wall_seconds else 0.0,
+    }
+
+def seed(args) -> dict:
+    """Create users, jobs with large target_urls, and one job with many result rows"""
+    from app.database import SessionLocal, migrate_database
+    from app.core.security import create_access_token, get_password_hash
+    from app.models.user import User
+    from app.schemas.crawl_job import CrawlJobCreate
+    from app.services.crawl_service import CrawlService
+    
+    migrate_database()
+    db = SessionLocal()
+    hashed_password = get_password_hash(PASSWORD)
+    run_id = random.randrange(1 << 30)
+    
+    users = []
+    try:
+        crawl_service = CrawlService(db)
+        for index in range(args.users):
+            user = User(email=f"load-{run_id}-{index}@example.com", hashed_password=hashed_password,
+                        full_name=f"Load {index}")
+            db.add(user)
+            db.commit()
+            
+            job_ids = [
+                crawl_service.create_crawl_job(
+                    CrawlJobCreate(
+                        name=f"Load job {job_index}",
+                        target_urls=[f"https://example.com/{job_index}/{n}" for n in range(args.target_urls)],
+                        extraction_rules={"title": "title", "price": ".price", "links": "a"}
+                    ),
+                    user.id
+                ).id
+                for job_index in range(args.jobs_per_user)
+            ]
+            token = create_access_token(
+                data={"sub": user.email, "uid": user.id, "act": True},
+                expires_delta=timedelta(hours=1)
+            )
+            users.append({"email": user.email, "job_ids": job_ids,
+                          "headers": {"Authorization": f"Bearer {token}"}})
+        
+        data_job_id = users[0]["job_ids"][0]
+        for start in range(0, args.data_rows, 1000):
+            crawl_service.store_results(data_job_id, [
+                {
+                    "url": f"https://example.com/item/{n}",
+                    "data": {"title": f"Item {n}", "price": f"${n % 500}.99",
+                             "links": [{"text": f"Related {n + k}", "href": f"/item/{n + k}"} for k in range(5)]},
+                    "error": None
+                }
+                for n in range(start, min(start + 1000, args.data_rows))
+            ])
+    finally:
+        db.close()
+    return {"users": users, "data_job_id": data_job_id}
+
+async def timed(request) -> tuple:
+    started = time.perf_counter()
+    status, size = await request()
+    return time.perf_counter() - started, status, size
+
+def make_operation(scenario: str, client: httpx.AsyncClient, seeded: dict, args):
+    users = seeded["users"]
+    owner = users[0]
+    
+    async def login():
+        user = random.choice(users)
+        response = await client.post("/auth/login", data={"username": user["email"], "password": PASSWORD})
+        return response.status_code, len(response.content)
+    
+    async def status():
+        user = random.choice(users)
+        job_id = random.choice(user["job_ids"])
+        response = await client.get(f"/crawl-jobs/{job_id}/status", headers=user["headers"])
+        return response.status_code, len(response.content)
+    
+    async def list_jobs():
+        user = random.choice(users)
+        response = await client.get("/crawl-jobs/", params={"limit": args.page_size_jobs}, headers=user["headers"])
+        return response.status_code, len(response.content)
+    
+    async def data():
+        received = 0
+        params = {"limit": args.page_size}
+        while True:
+            response = await client.get(f"/crawl-jobs/{seeded['data_job_id']}/data",
+                                        params=params, headers=owner["headers"])
+            received += len(response.content)
+            cursor = response.headers.get("X-Next-Cursor")
+            if response.status_code != 200 or cursor is None:
+                return response.status_code, received
+            params["after_id"] = cursor
+    
+    async def data_ndjson():
+        received = 0
+        async with client.stream("GET", f"/crawl-jobs/{seeded['data_job_id']}/data",
+                                 params={"format": "ndjson"}, headers=owner["headers"]) as response:
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+        return response.status_code, received
+    
+    return {"login": login, "status": status, "list": list_jobs, "data": data, "data-ndjson": data_ndjson}[scenario]
+
+async def run_scenario(operation, requests: int, concurrency: int) -> dict:
+    samples = []
+    remaining = requests
+    
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            samples.append(await timed(operation))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, requests))])
+    return summarize(samples, concurrency, time.perf_counter() - started)
+
+def start_server(port: int) -> uvicorn.Server:
+    from app.main import app
+    
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+async def run(args, seeded: dict) -> dict:
+    from app.database import dispose_async_engines
+    
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(120.0)
+    if args.target == "inprocess":
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   limits=limits, timeout=timeout)
+    else:
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=timeout)
+    
+    results = {}
+    try:
+        async with client:
+            for scenario in args.scenarios.split(","):
+                requests = args.requests or DEFAULT_REQUESTS[scenario]
+                operation = make_operation(scenario, client, seeded, args)
+                # A few untimed requests first, so connection setup and lazy imports are not measured
+                for _ in range(min(3, requests)):
+                    await operation()
+                results[scenario] = await run_scenario(operation, requests, args.concurrency)
+    finally:
+        if args.target == "inprocess":
+            await dispose_async_engines()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, help="Requests per scenario (default depends on the scenario)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--jobs-per-user", type=int, default=20)
+    parser.add_argument("--target-urls", type=int, default=500, help="target_urls per seeded job")
+    parser.add_argument("--data-rows", type=int, default=20000, help="Result rows of the job pulled by data scenarios")
+    parser.add_argument("--page-size", type=int, default=1000, help="limit for /data pages")
+    parser.add_argument("--page-size-jobs", type=int, default=20, help="limit for job listing")
+    parser.add_argument("--database-url", help="Database to seed and test against (default: a temporary SQLite file)")
+    parser.add_argument("--port", type=int, default=0, help="uvicorn port (default: a free port)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    # Settings are read on import, so the database has to be chosen first
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'api_load.db')}"
+        for name in ("ASYNC_DATABASE_URL", "READ_DATABASE_URL", "ASYNC_READ_DATABASE_URL"):
+            os.environ.pop(name, None)
+        # Request logging at INFO would dominate the in-process numbers
+        logging.getLogger().setLevel(logging.WARNING)
+        
+        seeded = seed(args)
+        server = None
+        if args.target == "uvicorn":
+            if not args.port:
+                with socket.socket() as sock:
+                    sock.bind(("127.0.0.1", 0))
+                    args.port = sock.getsockname()[1]
+            server = start_server(args.port)
+        try:
+            scenarios = asyncio.run(run(args, seeded))
+        finally:
+            if server is not None:
+                server.should_exit = True
+        
+        results = {
+            "target": args.target,
+            "seed": {"users": args.users, "jobs_per_user": args.jobs_per_user,
+                     "target_urls": args.target_urls, "data_rows": args.data_rows},
+            "scenarios": scenarios,
+        }
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""Offline crawl throughput benchmark against a local synthetic site.
+
+Serves a synthetic site (see ``synthetic_site.py``) from a child process,
+then measures two phases:
+
+- ``crawler``: SimpleCrawler alone, fetching and extracting every page
+- ``service``: CrawlService.execute_crawl_job end-to-end, writing the results
+  to a temporary SQLite database in ingest batches
+
+Each phase reports pages/s, p50/p99 fetch latency and peak RSS; the service
+phase adds DB rows/s over the time spent in ``store_results``. Peak RSS is
+the process high-water mark, so it includes every phase run before it.
+
+Usage:
+    python benchmarks/crawl_throughput.py --pages 1000 --latency-ms 20 --output crawl.json
+    python benchmarks/crawl_throughput.py --pages 1000 --latency-ms 20 --compare crawl.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import subprocess
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.models import user, crawl_job, report
+from app.models.user import User
+from app.models.crawl_job import ExtractedData
+from app.core.crawler import SimpleCrawler
+from app.core.metrics import DB_WRITE_DURATION
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services.crawl_service import CrawlService
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite
+
+EXTRACTION_RULES = {
+    "title": "title",
+    "heading": "h1",
+    "price": ".price",
+    "author": ".author",
+    "links": "nav a",
+    "images": "img",
+}
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def summarize(results, wall_seconds: float) -> dict:
+    latencies = [r.get("elapsed_ms") or 0 for r in results]
+    errors = sum(1 for r in results if r.get("error"))
+    return {
+        "pages": len(results),
+        "errors": errors,
+        "wall_seconds": wall_seconds,
+        "pages_per_s": len(results) / wall_seconds if wall_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "bytes_downloaded": sum(r.get("bytes") or 0 for r in results),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+async def crawl(urls, args):
+    async with SimpleCrawler(
+        max_concurrent=args.concurrency,
+        delay_range=(args.delay, args.delay),
+        respect_robots=args.respect_robots,
+        verify_ssl=False
+    ) as crawler:
+        return await crawler.crawl_urls(urls, EXTRACTION_RULES)
+
+def bench_crawler(urls, args) -> dict:
+    start = time.perf_counter()
+    results = asyncio.run(crawl(urls, args))
+    summary = summarize(results, time.perf_counter() - start)
+    summary["blocked_by_robots"] = len(urls) - len(results)
+    return summary
+
+def bench_service(urls, args) -> dict:
+    settings.max_concurrent_requests = args.concurrency
+    settings.user_max_concurrent_requests = args.concurrency
+    settings.request_delay = args.delay
+    settings.respect_robots = args.respect_robots
+    settings.verify_ssl = False
+    settings.ingest_batch_size = args.batch_size
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'crawl.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        
+        owner = User(email="bench@example.com", hashed_password="x")
+        db.add(owner)
+        db.commit()
+        service = CrawlService(db)
+        job = service.create_crawl_job(
+            CrawlJobCreate(name="Throughput", target_urls=urls, extraction_rules=EXTRACTION_RULES),
+            owner.id
+        )
+        
+        results = []
+        original_store = service.store_results
+        
+        def store_results(job_id, batch):
+            results.extend(batch)
+            original_store(job_id, batch)
+        
+        service.store_results = store_results
+        db_seconds_before = DB_WRITE_DURATION._default.sum
+        start = time.perf_counter()
+        service.execute_crawl_job(job.id)
+        wall_seconds = time.perf_counter() - start
+        db_seconds = DB_WRITE_DURATION._default.sum - db_seconds_before
+        
+        rows = db.query(ExtractedData).filter(ExtractedData.crawl_job_id == job.id).count()
+        db.close()
+        engine.dispose()
+    
+    summary = summarize(results, wall_seconds)
+    summary.update({
+        "blocked_by_robots": len(urls) - len(results),
+        "db_rows": rows,
+        "db_seconds": db_seconds,
+        "db_rows_per_s": rows / db_seconds if db_seconds else 0.0,
+    })
+    return summary
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Ratio of each phase metric to the baseline run (>1 means higher)"""
+    ratios = {}
+    for phase, metrics in results["phases"].items():
+        previous = baseline.get("phases", {}).get(phase, {})
+        ratios[phase] = {
+            metric: value / previous[metric]
+            for metric, value in metrics.items()
+            if isinstance(value, (int, float)) and previous.get(metric)
+        }
+    return ratios
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl throughput benchmark")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--page-bytes", type=int, default=20_000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--links-per-page", type=int, default=20)
+    parser.add_argument("--disallow-rate", type=float, default=0.05)
+    parser.add_argument("--no-robots", dest="respect_robots", action="store_false",
+                        help="Do not check robots.txt")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.0, help="Per-request politeness delay in seconds")
+    parser.add_argument("--batch-size", type=int, default=settings.ingest_batch_size)
+    parser.add_argument("--phases", default="crawler,service", help="Comma-separated: crawler, service")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run to compare against")
+    args = parser.parse_args()
+    
+    # Per-URL warnings for the synthetic errors and robots blocks would drown the results
+    logging.getLogger("app").setLevel(logging.ERROR)
+    config = SiteConfig(
+        pages=args.pages,
+        page_bytes=args.page_bytes,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        links_per_page=args.links_per_page,
+        disallow_rate=args.disallow_rate,
+        seed=args.seed
+    )
+    benches = {"crawler": bench_crawler, "service": bench_service}
+    
+    results = {
+        "commit": git_commit(),
+        "site": vars(config),
+        "settings": {"concurrency": args.concurrency, "delay": args.delay, "batch_size": args.batch_size,
+                     "respect_robots": args.respect_robots},
+        "phases": {},
+    }
+    with SyntheticSite(config) as site:
+        urls = site.urls()
+        for phase in args.phases.split(","):
+            results["phases"][phase] = benches[phase](urls, args)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            results["compared_to"] = {"file": args.compare, "ratios": compare(results, json.load(f))}
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
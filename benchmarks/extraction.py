@@ -0,0 +1,213 @@
+"""Micro-benchmark of DataExtractor.extract_data on a checked-in HTML corpus.
+
+Runs every rule set against every page in benchmarks/corpus (a news
+article, a product listing and a very large forum thread) without any
+network involved, and reports:
+
+- pages/s and p50 latency of a full ``extract_data`` call
+- HTML parse time on its own
+- the cost of each field's selector on an already parsed document
+- peak memory allocated (tracemalloc) while parsing and while extracting
+
+Timings and allocations are measured in separate passes, since tracing
+allocations slows everything down.
+
+Usage:
+    python benchmarks/extraction.py --output extraction.json
+    python benchmarks/extraction.py --pages large --rules broad --top 10
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from app.core.data_extractor import DataExtractor
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+PAGES = ("small", "medium", "large")
+
+RULE_SETS = {
+    # A typical article job: a handful of targeted fields
+    "article": {
+        "title": "title",
+        "headline": "h1",
+        "author": ".author",
+        "publish_date": "time",
+        "content": "article p",
+        "tags": ".tags a",
+    },
+    # Many fields, as in a product catalogue job
+    "catalogue": {
+        "title": "title",
+        "description": 'meta[name="description"]',
+        "heading": "h1",
+        "product_titles": ".product-title a",
+        "prices": ".price",
+        "ratings": ".rating-count",
+        "product_descriptions": ".product-card .description",
+        "product_links": "a.product-link",
+        "product_images": "img.product-image",
+        "skus": "[data-sku]",
+        "filters": ".filters label",
+        "pagination": ".pagination a",
+        "nav": ".main-nav a",
+        "footer_links": ".site-footer a",
+        "authors": ".author",
+        "dates": "time",
+        "quotes": "blockquote .quote-author",
+        "tables": "table.data td",
+    },
+    # Broad selectors that match much of the document
+    "broad": {
+        "links": "a",
+        "images": "img",
+        "paragraphs": "p",
+        "divs": "div",
+        "spans": "span",
+        "list_items": "li",
+    },
+}
+
+def load_corpus(names):
+    corpus = {}
+    for name in names:
+        with open(os.path.join(CORPUS_DIR, f"{name}.html"), encoding="utf-8") as f:
+            corpus[name] = f.read()
+    return corpus
+
+def timed_runs(func, min_seconds: float, min_runs: int = 3):
+    """Call ``func`` until both ``min_runs`` and ``min_seconds`` are reached; return each duration"""
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < min_runs or time.perf_counter() - started < min_seconds:
+        run_started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - run_started)
+    return durations
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+def count_matches(value) -> int:
+    if value is None:
+        return 0
+    return len(value) if isinstance(value, list) else 1
+
+def bench_fields(html: str, rules: dict, min_seconds: float) -> dict:
+    """Median cost of each selector against one parsed document"""
+    extractor = DataExtractor()
+    extractor.soup = BeautifulSoup(html, "html.parser")
+    per_field_seconds = max(min_seconds / len(rules), 0.01)
+    
+    fields = {}
+    for field, selector in rules.items():
+        durations = timed_runs(lambda: extractor._extract_field(selector), per_field_seconds)
+        fields[field] = {
+            "selector": selector,
+            "matches": count_matches(extractor._extract_field(selector)),
+            "median_us": median(durations) * 1_000_000,
+        }
+    return fields
+
+def bench_allocations(html: str, rules: dict, top: int) -> dict:
+    """Peak traced memory while parsing, and while extracting from the parsed document"""
+    extractor = DataExtractor()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        soup = BeautifulSoup(html, "html.parser")
+        parse_current, parse_peak = tracemalloc.get_traced_memory()
+        
+        extractor.soup = soup
+        tracemalloc.reset_peak()
+        snapshot = tracemalloc.take_snapshot() if top else None
+        # Keep the values alive so the snapshot diff shows what they retain
+        values = [extractor._extract_field(selector) for selector in rules.values()]
+        extract_peak = tracemalloc.get_traced_memory()[1]
+        
+        allocations = {
+            "parse_peak_kb": (parse_peak - before) / 1024,
+            "parsed_tree_kb": (parse_current - before) / 1024,
+            "extract_peak_kb": (extract_peak - parse_current) / 1024,
+        }
+        if top:
+            ignore_tracemalloc = (tracemalloc.Filter(False, tracemalloc.__file__),)
+            diff = tracemalloc.take_snapshot().filter_traces(ignore_tracemalloc).compare_to(
+                snapshot.filter_traces(ignore_tracemalloc), "lineno"
+            )
+            allocations["top_extract_allocations"] = [
+                {"site": str(stat.traceback[0]), "size_kb": stat.size_diff / 1024, "count": stat.count_diff}
+                for stat in diff[:top]
+            ]
+        return allocations
+    finally:
+        tracemalloc.stop()
+
+def bench_page(name: str, html: str, rule_sets: dict, args) -> dict:
+    parse_durations = timed_runs(lambda: BeautifulSoup(html, "html.parser"), args.min_seconds)
+    result = {
+        "bytes": len(html.encode()),
+        "parse_p50_ms": median(parse_durations) * 1000,
+        "rule_sets": {},
+    }
+    
+    extractor = DataExtractor()
+    url = f"https://corpus.example.com/{name}"
+    for rule_name, rules in rule_sets.items():
+        durations = timed_runs(lambda: extractor.extract_data(html, url, rules), args.min_seconds)
+        result["rule_sets"][rule_name] = {
+            "runs": len(durations),
+            "pages_per_s": len(durations) / sum(durations),
+            "p50_ms": median(durations) * 1000,
+            "fields": bench_fields(html, rules, args.min_seconds),
+            "allocations": bench_allocations(html, rules, args.top),
+        }
+    return result
+
+def compare(results: dict, baseline: dict) -> dict:
+    """pages/s of each page and rule set relative to the baseline run (>1 is faster)"""
+    ratios = {}
+    for page, page_result in results["pages"].items():
+        for rule_name, rule_result in page_result["rule_sets"].items():
+            previous = baseline.get("pages", {}).get(page, {}).get("rule_sets", {}).get(rule_name)
+            if previous and previous.get("pages_per_s"):
+                ratios[f"{page}/{rule_name}"] = rule_result["pages_per_s"] / previous["pages_per_s"]
+    return ratios
+
+def main():
+    parser = argparse.ArgumentParser(description="DataExtractor micro-benchmark")
+    parser.add_argument("--pages", default=",".join(PAGES), help="Comma-separated corpus pages")
+    parser.add_argument("--rules", default=",".join(RULE_SETS), help="Comma-separated rule sets")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Minimum timing per measurement")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N biggest allocation sites")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run to compare against")
+    args = parser.parse_args()
+    
+    # Extraction failures are part of the measurement, not something to print per run
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    corpus = load_corpus(args.pages.split(","))
+    rule_sets = {name: RULE_SETS[name] for name in args.rules.split(",")}
+    
+    results = {
+        "min_seconds": args.min_seconds,
+        "pages": {name: bench_page(name, html, rule_sets, args) for name, html in corpus.items()},
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            results["compared_to"] = {"file": args.compare, "pages_per_s_ratios": compare(results, json.load(f))}
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
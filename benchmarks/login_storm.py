@@ -0,0 +1,125 @@
+"""Measure how a burst of logins affects the latency of other requests on the same worker.
+
+Starts the API in a local uvicorn server, then measures GET /health latency
+alone and while ``--logins`` concurrent logins are in flight.
+
+Usage:
+    python benchmarks/login_storm.py --logins 200 --output login_storm.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+import uuid
+import aiohttp
+import uvicorn
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(latencies):
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+def start_server(port: int) -> uvicorn.Server:
+    from app.main import app
+    
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+async def probe(session, base_url, duration: float, interval: float):
+    """Request /health at a steady rate and record each latency"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with session.get(f"{base_url}/health") as response:
+            await response.read()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def login(session, base_url, email, password):
+    start = time.perf_counter()
+    async with session.post(f"{base_url}/auth/login", data={"username": email, "password": password}) as response:
+        await response.read()
+        return response.status, time.perf_counter() - start
+
+async def run(args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    email = f"storm-{uuid.uuid4().hex[:8]}@example.com"
+    password = "storm-password"
+    
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with session.post(f"{base_url}/auth/signup",
+                                json={"email": email, "password": password, "full_name": "Storm"}) as response:
+            response.raise_for_status()
+        
+        baseline = await probe(session, base_url, args.baseline_seconds, args.probe_interval)
+        
+        storm_started = time.perf_counter()
+        probe_task = asyncio.create_task(probe(session, base_url, args.storm_seconds, args.probe_interval))
+        logins = await asyncio.gather(*[login(session, base_url, email, password) for _ in range(args.logins)])
+        storm_seconds = time.perf_counter() - storm_started
+        during_storm = await probe_task
+    
+    statuses = {}
+    for status, _ in logins:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    
+    return {
+        "logins": args.logins,
+        "login_statuses": statuses,
+        "login_throughput_per_s": args.logins / storm_seconds,
+        "login_latency": summarize([latency for _, latency in logins]),
+        "health_baseline": summarize(baseline),
+        "health_during_storm": summarize(during_storm),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Login storm latency benchmark")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--port", type=int, default=0, help="Server port (default: a free port)")
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    parser.add_argument("--storm-seconds", type=float, default=5.0)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    if not args.port:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            args.port = sock.getsockname()[1]
+    
+    server = start_server(args.port)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        server.should_exit = True
+    
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
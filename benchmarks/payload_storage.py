@@ -0,0 +1,142 @@
+"""Compare stored size and read/write speed of the extracted data storage formats.
+
+Usage:
+    python benchmarks/payload_storage.py --rows 5000 --output payload_storage.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import user, crawl_job, report
+from app.models.crawl_job import CrawlJob, ExtractedData
+from app.core.payload_codec import encode_payload, decode_payload, train_dictionary, zstandard
+from app.services.payload_service import PayloadService
+
+NAV_LINKS = [
+    {"text": text, "href": f"/{text.lower().replace(' ', '-')}"}
+    for text in ["Home", "Products", "New Arrivals", "Best Sellers", "Sale", "About Us",
+                 "Contact", "Shipping Policy", "Returns", "Privacy Policy", "Careers", "Blog"]
+]
+
+WORDS = ("quality product design fast shipping warranty premium steel cotton wireless "
+         "battery compact classic modern review rating colour size").split()
+
+def make_payload(rng: random.Random, index: int) -> dict:
+    """An extraction result shaped like a product page crawled with link and image rules"""
+    return {
+        "title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {index}",
+        "price": f"${rng.randint(5, 500)}.{rng.randint(0, 99):02d}",
+        "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))),
+        "links": NAV_LINKS + [
+            {"text": f"Related item {rng.randint(1, 10000)}", "href": f"/products/{rng.randint(1, 10000)}"}
+            for _ in range(rng.randint(5, 30))
+        ],
+        "images": [
+            {"alt": f"{rng.choice(WORDS)} photo", "src": f"https://cdn.example.com/img/{rng.randint(1, 99999)}.jpg"}
+            for _ in range(rng.randint(1, 6))
+        ],
+    }
+
+def bench_codec(payloads, codec, dictionary=None) -> dict:
+    start = time.perf_counter()
+    if codec == "json":
+        blobs = [json.dumps(payload).encode("utf-8") for payload in payloads]
+    else:
+        blobs = [encode_payload(payload, codec, dictionary) for payload in payloads]
+    encode_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for blob in blobs:
+        json.loads(blob) if codec == "json" else decode_payload(blob, codec, dictionary)
+    decode_seconds = time.perf_counter() - start
+    
+    total_bytes = sum(len(blob) for blob in blobs)
+    return {
+        "avg_bytes": total_bytes / len(blobs),
+        "total_bytes": total_bytes,
+        "encode_rows_per_s": len(blobs) / encode_seconds,
+        "decode_rows_per_s": len(blobs) / decode_seconds,
+    }
+
+def bench_database(payloads, storage_format) -> dict:
+    """Write and read the payloads through PayloadService on a scratch SQLite database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        
+        job = CrawlJob(name="bench", target_urls=[], extraction_rules={}, storage_format=storage_format)
+        db.add(job)
+        db.commit()
+        
+        payload_service = PayloadService(db)
+        start = time.perf_counter()
+        for offset in range(0, len(payloads), 500):
+            batch = [{"url": f"https://example.com/{i}", "data": payload}
+                     for i, payload in enumerate(payloads[offset:offset + 500], offset)]
+            db.add_all(payload_service.build_extracted_data(job, batch))
+            db.commit()
+        write_seconds = time.perf_counter() - start
+        
+        db.expunge_all()
+        start = time.perf_counter()
+        rows = 0
+        for row in db.query(ExtractedData).yield_per(1000):
+            row.data
+            rows += 1
+        read_seconds = time.perf_counter() - start
+        
+        db.close()
+        engine.dispose()
+        return {
+            "db_bytes": os.path.getsize(path),
+            "write_rows_per_s": len(payloads) / write_seconds,
+            "read_rows_per_s": rows / read_seconds,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extracted data storage formats")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    payloads = [make_payload(rng, i) for i in range(args.rows)]
+    
+    results = {"rows": args.rows, "codecs": {}, "database": {}}
+    results["codecs"]["json"] = bench_codec(payloads, "json")
+    results["codecs"]["zlib"] = bench_codec(payloads, "zlib")
+    if zstandard is not None:
+        dictionary = train_dictionary(payloads[:200], 16384)
+        results["codecs"]["zstd"] = bench_codec(payloads, "zstd")
+        results["codecs"]["zstd+dict"] = bench_codec(payloads, "zstd", dictionary)
+    
+    for storage_format in ("json", "zlib", "zstd") if zstandard is not None else ("json", "zlib"):
+        results["database"][storage_format] = bench_database(payloads, storage_format)
+    
+    baseline = results["codecs"]["json"]["avg_bytes"]
+    print(f"{'codec':<12}{'avg bytes':>12}{'ratio':>8}{'encode/s':>12}{'decode/s':>12}")
+    for name, stats in results["codecs"].items():
+        print(f"{name:<12}{stats['avg_bytes']:>12.0f}{baseline / stats['avg_bytes']:>8.2f}"
+              f"{stats['encode_rows_per_s']:>12.0f}{stats['decode_rows_per_s']:>12.0f}")
+    
+    print(f"\n{'storage':<12}{'db bytes':>12}{'write/s':>12}{'read/s':>12}")
+    for name, stats in results["database"].items():
+        print(f"{name:<12}{stats['db_bytes']:>12}{stats['write_rows_per_s']:>12.0f}{stats['read_rows_per_s']:>12.0f}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""A local synthetic website for offline crawler tests and benchmarks.
+
+The site runs in its own process so serving pages does not compete with the
+crawler for the GIL or inflate its memory use. Every page is derived from
+its index and the seed, so the same config always produces the same pages,
+link graph, errors and robots.txt.
+
+Usage:
+    with SyntheticSite(SiteConfig(pages=500, page_bytes=20_000, latency_ms=50)) as site:
+        urls = site.urls()
+"""
+import asyncio
+import multiprocessing
+import random
+import socket
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from aiohttp import web
+
+WORDS = ("quality product design fast shipping warranty premium steel cotton wireless "
+         "battery compact classic modern review rating colour size").split()
+
+@dataclass
+class SiteConfig:
+    pages: int = 100
+    page_bytes: int = 10_000          # approximate size of each HTML page
+    latency_ms: float = 0.0           # added before every response
+    latency_jitter_ms: float = 0.0    # uniform extra latency on top of latency_ms
+    error_rate: float = 0.0           # share of pages that answer HTTP 500
+    links_per_page: int = 10          # outgoing links to other pages
+    disallow_rate: float = 0.0        # share of pages under a path robots.txt disallows
+    robots_txt: bool = True           # serve robots.txt (404 otherwise)
+    seed: int = 1
+
+class _Page:
+    __slots__ = ("path", "error", "disallowed", "links")
+    
+    def __init__(self, path: str, error: bool, disallowed: bool, links: List[int]):
+        self.path = path
+        self.error = error
+        self.disallowed = disallowed
+        self.links = links
+
+def _page(config: SiteConfig, index: int) -> _Page:
+    rng = random.Random(config.seed * 1_000_003 + index)
+    error = rng.random() < config.error_rate
+    disallowed = rng.random() < config.disallow_rate
+    path = f"/private/{index}" if disallowed else f"/pages/{index}"
+    links = [rng.randrange(config.pages) for _ in range(config.links_per_page)]
+    return _Page(path, error, disallowed, links)
+
+def page_paths(config: SiteConfig) -> List[str]:
+    return [_page(config, index).path for index in range(config.pages)]
+
+def render_page(config: SiteConfig, index: int) -> bytes:
+    """The HTML of one page: title, price, author, links, images and filler text"""
+    rng = random.Random(config.seed * 7_919 + index)
+    page = _page(config, index)
+    
+    links = "".join(
+        f'<li><a href="{_page(config, target).path}">{rng.choice(WORDS).title()} {target}</a></li>'
+        for target in page.links
+    )
+    images = "".join(
+        f'<img src="/img/{index}-{n}.jpg" alt="{rng.choice(WORDS)} photo">' for n in range(rng.randint(1, 4))
+    )
+    head = (
+        f"<!DOCTYPE html><html><head><title>Page {index}</title>"
+        f'<meta name="description" content="Synthetic page {index}"></head><body>'
+        f'<h1>{rng.choice(WORDS).title()} {rng.choice(WORDS)} {index}</h1>'
+        f'<span class="price">${rng.randint(5, 500)}.{rng.randint(0, 99):02d}</span>'
+        f'<span class="author">Author {rng.randint(1, 50)}</span>'
+        f"<nav><ul>{links}</ul></nav>{images}<article>"
+    )
+    tail = "</article></body></html>"
+    
+    paragraphs = []
+    size = len(head) + len(tail)
+    while size < config.page_bytes:
+        paragraph = "<p>" + " ".join(rng.choice(WORDS) for _ in range(40)) + "</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    return (head + "".join(paragraphs) + tail).encode()
+
+def build_app(config: SiteConfig) -> web.Application:
+    pages = {}
+    for index in range(config.pages):
+        page = _page(config, index)
+        pages[page.path] = (index, page)
+    rendered = {}
+    rng = random.Random(config.seed)
+    
+    async def delay():
+        latency = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+    
+    async def robots(request: web.Request) -> web.Response:
+        if not config.robots_txt:
+            raise web.HTTPNotFound()
+        return web.Response(text="User-agent: *\nDisallow: /private/\n")
+    
+    async def page(request: web.Request) -> web.Response:
+        await delay()
+        entry = pages.get(request.path)
+        if entry is None:
+            raise web.HTTPNotFound()
+        index, page = entry
+        if page.error:
+            raise web.HTTPInternalServerError()
+        if index not in rendered:
+            rendered[index] = render_page(config, index)
+        return web.Response(body=rendered[index], content_type="text/html", charset="utf-8")
+    
+    app = web.Application()
+    app.router.add_get("/robots.txt", robots)
+    app.router.add_get("/pages/{index}", page)
+    app.router.add_get("/private/{index}", page)
+    return app
+
+def _serve(config: SiteConfig, port: int):
+    web.run_app(build_app(config), host="127.0.0.1", port=port, print=None, access_log=None)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class SyntheticSite:
+    """Runs a synthetic site in a child process for the duration of a ``with`` block"""
+    
+    def __init__(self, config: Optional[SiteConfig] = None, port: Optional[int] = None):
+        self.config = config or SiteConfig()
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._process = None
+    
+    def urls(self, include_disallowed: bool = True) -> List[str]:
+        return [
+            self.base_url + path for path in page_paths(self.config)
+            if include_disallowed or not path.startswith("/private/")
+        ]
+    
+    def start(self, timeout: float = 10.0):
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_serve, args=(self.config, self.port), daemon=True
+        )
+        self._process.start()
+        
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.1).close()
+                return
+            except OSError:
+                if not self._process.is_alive():
+                    break
+                time.sleep(0.05)
+        self.stop()
+        raise RuntimeError(f"Synthetic site did not start on port {self.port}")
+    
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(timeout=5)
+            self._process = None
+    
+    def __enter__(self) -> "SyntheticSite":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
\ No newline at end of file
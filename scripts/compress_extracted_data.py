@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app.database import SessionLocal
+from app.models import user, crawl_job, report
+from app.models.crawl_job import CrawlJob
+from app.core.payload_codec import STORAGE_FORMATS, PayloadCodecError
+from app.services.payload_service import PayloadService
+
+def compress_extracted_data():
+    """Convert the stored extracted data of existing crawl jobs to another storage format"""
+    parser = argparse.ArgumentParser(description="Migrate extracted data between storage formats")
+    parser.add_argument("job_ids", type=int, nargs="*", help="Crawl job IDs to migrate")
+    parser.add_argument("--all", action="store_true", help="Migrate every crawl job")
+    parser.add_argument("--format", choices=STORAGE_FORMATS, default="zstd", help="Target storage format")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows converted per transaction")
+    args = parser.parse_args()
+    
+    if not args.job_ids and not args.all:
+        parser.error("give one or more job IDs or --all")
+    
+    db = SessionLocal()
+    try:
+        job_ids = args.job_ids
+        if args.all:
+            job_ids = [job_id for (job_id,) in db.query(CrawlJob.id).order_by(CrawlJob.id)]
+        
+        payload_service = PayloadService(db)
+        for job_id in job_ids:
+            migrated = payload_service.migrate_job(job_id, args.format, args.batch_size)
+            print(f"Crawl job {job_id}: {migrated} rows stored as {args.format}")
+    except (PayloadCodecError, ValueError) as e:
+        print(f"Error migrating data: {e}", file=sys.stderr)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    compress_extracted_data()
\ No newline at end of file
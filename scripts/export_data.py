@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app.database import SessionLocal
+from app.models import user, crawl_job, report
+from app.services.export_service import ExportService, ExportError, EXPORT_FORMATS, EXPORT_COMPRESSIONS
+
+def export_data():
+    """Stream the extracted data of crawl jobs to a file or stdout"""
+    parser = argparse.ArgumentParser(description="Export extracted data of crawl jobs")
+    parser.add_argument("job_ids", type=int, nargs="+", help="Crawl job IDs to export")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--compression", choices=EXPORT_COMPRESSIONS, default="none")
+    parser.add_argument("--fields", help="Comma-separated extraction rule fields to export (default: all)")
+    parser.add_argument("--chunk-size", type=int, help="Rows held in memory at a time")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args()
+    
+    fields = [field.strip() for field in args.fields.split(",")] if args.fields else None
+    db = SessionLocal()
+    
+    try:
+        chunks = ExportService(db).export(
+            args.job_ids, args.format, args.compression, fields, args.chunk_size
+        )
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            written = 0
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if args.output:
+                output.close()
+        
+        if args.output:
+            print(f"Exported jobs {args.job_ids} to {args.output} ({written} bytes)")
+    except ExportError as e:
+        print(f"Error exporting data: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    export_data()
\ No newline at end of file
@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app.database import SessionLocal
+from app.models import user, crawl_job, report, webhook
+from app.models.crawl_job import CrawlJob
+from app.services.search_service import SearchNotSupportedError, SearchService
+
+def index_extracted_data():
+    """Build the full-text search documents of extracted data stored before search existed"""
+    parser = argparse.ArgumentParser(description="Index extracted data for full-text search")
+    parser.add_argument("job_ids", type=int, nargs="*", help="Crawl job IDs to index")
+    parser.add_argument("--all", action="store_true", help="Index every crawl job")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows indexed per transaction")
+    args = parser.parse_args()
+    
+    if not args.job_ids and not args.all:
+        parser.error("give one or more job IDs or --all")
+    
+    db = SessionLocal()
+    try:
+        job_ids = args.job_ids
+        if args.all:
+            job_ids = [job_id for (job_id,) in db.query(CrawlJob.id).order_by(CrawlJob.id)]
+        
+        search_service = SearchService(db)
+        for job_id in job_ids:
+            indexed = search_service.index_job(job_id, args.batch_size)
+            print(f"Crawl job {job_id}: {indexed} rows indexed")
+    except SearchNotSupportedError as e:
+        print(f"Error indexing data: {e}", file=sys.stderr)
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    index_extracted_data()
\ No newline at end of file
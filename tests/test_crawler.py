@@ -1,15 +1,26 @@
+import time
 import pytest
-from backend.app.core.crawler import AdvancedWebCrawler
+from app.config import settings
+from app.core.crawler import SimpleCrawler
+from app.core.robots_checker import RobotsChecker
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite, free_port
+
+@pytest.fixture(scope="module")
+def site():
+    config = SiteConfig(pages=20, page_bytes=2000, error_rate=0.2, links_per_page=3, disallow_rate=0.2, seed=3)
+    with SyntheticSite(config) as site:
+        yield site
 
 @pytest.mark.asyncio
-async def test_crawler_basic_functionality():
+async def test_crawler_basic_functionality(site):
     """Test basic crawler functionality"""
-    crawler = AdvancedWebCrawler(respect_robots=False)
+    crawler = SimpleCrawler(delay_range=(0, 0), respect_robots=False)
     
-    urls = ["https://httpbin.org/html"]
+    urls = site.urls(include_disallowed=False)[:1]
     extraction_rules = {
         "title": "title",
-        "headings": "h1"
+        "headings": "h1",
+        "links": "nav a"
     }
     
     async with crawler:
@@ -18,17 +29,62 @@ async def test_crawler_basic_functionality():
     assert len(results) == 1
     assert "data" in results[0]
     assert "url" in results[0]
+    assert results[0]["data"]["title"].startswith("Page ")
+    assert len(results[0]["data"]["links"]) == 3
+    assert results[0]["bytes"] > 0
+    assert results[0]["timings"]["first_byte_us"] >= 0
 
 @pytest.mark.asyncio
 async def test_crawler_with_invalid_url():
     """Test crawler handling of invalid URLs"""
-    crawler = AdvancedWebCrawler(respect_robots=False)
+    crawler = SimpleCrawler(delay_range=(0, 0), respect_robots=False)
     
-    urls = ["https://invalid-url-that-does-not-exist.com"]
+    urls = [f"http://127.0.0.1:{free_port()}/nothing-listens-here"]
     extraction_rules = {"title": "title"}
     
     async with crawler:
         results = await crawler.crawl_urls(urls, extraction_rules)
     
     assert len(results) == 1
-    assert "error" in results[0]
\ No newline at end of file
+    assert results[0]["error"]
+
+@pytest.mark.asyncio
+async def test_crawler_reports_http_errors_and_respects_robots(site):
+    crawler = SimpleCrawler(max_concurrent=10, delay_range=(0, 0), respect_robots=True, verify_ssl=False)
+    urls = site.urls()
+    
+    async with crawler:
+        results = await crawler.crawl_urls(urls, {"title": "title"})
+    
+    crawled = {result["url"] for result in results}
+    assert crawled == set(site.urls(include_disallowed=False))
+    assert len(crawled) < len(urls)
+    
+    errors = [result for result in results if result["error"]]
+    assert errors and all(result["error"] == "HTTP 500" for result in errors)
+    assert all((result["http_status"], result["error_class"]) == (500, "http") for result in errors)
+    assert all(result["data"]["title"] for result in results if not result["error"])
+    
+    pages = [result for result in results if not result["error"]]
+    assert all(result["http_status"] == 200 and result["error_class"] is None for result in pages)
+    assert all(result["final_url"] == result["url"] and len(result["content_hash"]) == 64 for result in pages)
+
+def test_robots_entries_expire_and_failures_are_retried(site, monkeypatch):
+    monkeypatch.setattr(settings, "robots_cache_size", 1)
+    monkeypatch.setattr(settings, "robots_cache_ttl", 0.2)
+    monkeypatch.setattr(settings, "robots_failure_ttl", 0.1)
+    checker = RobotsChecker("test", verify_ssl=False)
+    disallowed = next(url for url in site.urls() if url not in site.urls(include_disallowed=False))
+    
+    assert not checker.can_crawl(disallowed)
+    assert checker.is_cached(disallowed)
+    time.sleep(0.25)
+    assert not checker.is_cached(disallowed)
+    
+    # Nothing listens: allowed for now, and retried soon
+    unreachable = f"http://127.0.0.1:{free_port()}/page"
+    assert checker.can_crawl(unreachable)
+    assert checker.is_cached(unreachable)
+    assert not checker.is_cached(disallowed)  # one host fits
+    time.sleep(0.15)
+    assert not checker.is_cached(unreachable)
\ No newline at end of file
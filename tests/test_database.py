@@ -0,0 +1,131 @@
+import os
+import tempfile
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, MetaData, String, Table, Text
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, PROJECT_ROOT, engine_options, migrate_database
+from app.core.pool_metrics import TimedQueuePool, attach_pool_metrics, get_pool_stats
+from app.models import user, crawl_job, report
+from app.models.user import User
+from app.models.crawl_job import CrawlJob, CrawlJobStats
+from app.schemas.report import ReportCreate
+from app.services.report_service import ReportService, report_cache
+
+def create_database(name):
+    path = os.path.join(tempfile.mkdtemp(), f"{name}.db")
+    db_engine = create_engine(f"sqlite:///{path}", **engine_options(f"sqlite:///{path}"))
+    Base.metadata.create_all(bind=db_engine)
+    return db_engine
+
+def test_file_databases_use_a_timed_pool_with_metrics():
+    db_engine = create_database("pool")
+    assert isinstance(db_engine.pool, TimedQueuePool)
+    attach_pool_metrics(db_engine, "test_pool")
+    
+    for _ in range(3):
+        with db_engine.connect():
+            pass
+    
+    stats = get_pool_stats()["test_pool"]
+    assert stats["checkouts"] == 3
+    assert stats["checked_out"] == 0
+    assert stats["timeouts"] == 0
+
+def test_memory_databases_keep_the_default_pool():
+    assert "poolclass" not in engine_options("sqlite://")
+    assert "poolclass" not in engine_options("sqlite:///:memory:")
+
+def test_report_data_is_read_from_the_replica():
+    report_cache.clear()
+    primary = sessionmaker(bind=create_database("primary"))()
+    replica = sessionmaker(bind=create_database("replica"))()
+    
+    # The replica holds the job with its stats; the primary only the report owner
+    for db in (primary, replica):
+        db.add(User(id=1, email="replica@example.com", hashed_password="x"))
+    replica.add(CrawlJob(id=1, user_id=1, name="Replica Job", target_urls=[], extraction_rules={}))
+    replica.add(CrawlJobStats(crawl_job_id=1, urls_crawled=4, successful_extractions=3, failed_extractions=1))
+    primary.commit()
+    replica.commit()
+    
+    report = ReportService(primary, replica).create_report(
+        ReportCreate(title="Replica Report", crawl_job_ids=[1]), 1
+    )
+    assert report.report_data["total_urls_crawled"] == 4
+    assert primary.query(CrawlJobStats).count() == 0
+    
+    primary.close()
+    replica.close()
+
+def baseline_metadata():
+    """The tables create_tables() built in the original release"""
+    metadata = MetaData()
+    Table("users", metadata,
+          Column("id", Integer, primary_key=True, index=True),
+          Column("email", String, unique=True, index=True),
+          Column("hashed_password", String),
+          Column("full_name", String),
+          Column("is_active", Boolean),
+          Column("is_verified", Boolean),
+          Column("created_at", DateTime),
+          Column("updated_at", DateTime))
+    Table("crawl_jobs", metadata,
+          Column("id", Integer, primary_key=True, index=True),
+          Column("user_id", Integer, ForeignKey("users.id")),
+          Column("name", String, index=True),
+          Column("description", Text),
+          Column("target_urls", JSON),
+          Column("extraction_rules", JSON),
+          Column("status", String),
+          Column("scheduled_at", DateTime),
+          Column("started_at", DateTime),
+          Column("completed_at", DateTime),
+          Column("created_at", DateTime),
+          Column("updated_at", DateTime))
+    Table("extracted_data", metadata,
+          Column("id", Integer, primary_key=True, index=True),
+          Column("crawl_job_id", Integer, ForeignKey("crawl_jobs.id")),
+          Column("url", String),
+          Column("data", JSON),
+          Column("extracted_at", DateTime))
+    Table("reports", metadata,
+          Column("id", Integer, primary_key=True, index=True),
+          Column("user_id", Integer, ForeignKey("users.id")),
+          Column("title", String),
+          Column("description", Text),
+          Column("crawl_job_ids", JSON),
+          Column("report_data", JSON),
+          Column("created_at", DateTime))
+    return metadata
+
+def alembic_config(db_engine):
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    config.set_main_option("sqlalchemy.url", str(db_engine.url))
+    config.attributes["configure_logger"] = False
+    return config
+
+def test_databases_from_the_original_release_are_migrated():
+    path = os.path.join(tempfile.mkdtemp(), "baseline.db")
+    db_engine = create_engine(f"sqlite:///{path}")
+    baseline_metadata().create_all(bind=db_engine)
+    with db_engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO users (id, email) VALUES (1, 'baseline@example.com')")
+        connection.exec_driver_sql("INSERT INTO crawl_jobs (id, user_id, name) VALUES (1, 1, 'Old Job')")
+    
+    migrate_database(db_engine)
+    
+    command.check(alembic_config(db_engine))
+    assert "crawl_job_stats" in inspect(db_engine).get_table_names()
+    with db_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT name FROM crawl_jobs").scalar() == "Old Job"
+
+def test_databases_matching_the_models_are_stamped_at_head():
+    db_engine = create_database("current")
+    migrate_database(db_engine)
+    
+    command.check(alembic_config(db_engine))
+    with db_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM alembic_version").scalar() == 1
\ No newline at end of file
@@ -0,0 +1,309 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.models import user, crawl_job, report
+from app.models.crawl_job import CrawlJob, ExtractedData
+from app.models.user import User
+from app.core.crawler import SimpleCrawler
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services import crawl_service as crawl_service_module
+from app.services.crawl_service import CrawlService
+from app.services.dispatch_service import CrawlDispatcher, _DONE, _JobQueue
+from app.services.stats_service import StatsService
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite
+
+class FakeCrawler:
+    """Answers every URL after a fixed latency and records concurrency per user"""
+    
+    robots_checker = None
+    
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self.total_in_flight = 0
+        self.max_total_in_flight = 0
+        self.order = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    def pick_user_agent(self):
+        return "test"
+    
+    async def crawl_url(self, url, extraction_rules, keep_html=False, user_agent=None):
+        owner = url.split("/")[2]
+        self.order.append(url)
+        self.in_flight[owner] = self.in_flight.get(owner, 0) + 1
+        self.max_in_flight[owner] = max(self.max_in_flight.get(owner, 0), self.in_flight[owner])
+        self.total_in_flight += 1
+        self.max_total_in_flight = max(self.max_total_in_flight, self.total_in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight[owner] -= 1
+            self.total_in_flight -= 1
+        return {"url": url, "data": {"title": url}, "error": None}
+
+def urls(owner, job, count):
+    return [f"http://{owner}/{job}/{n}" for n in range(count)]
+
+def crawl_in_thread(dispatcher, *args):
+    outcome = {}
+    
+    def run():
+        outcome["count"] = dispatcher.crawl(*args)
+        outcome["finished"] = time.monotonic()
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+def test_small_job_is_interleaved_with_a_large_one():
+    crawler = FakeCrawler(latency=0.01)
+    dispatcher = CrawlDispatcher(max_concurrent=4, user_max_concurrent=4, crawler_factory=lambda: crawler)
+    
+    big_thread, big = crawl_in_thread(dispatcher, 1, 1, 1, urls("alice", 1, 400), {})
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert dispatcher.crawl(2, 2, 1, urls("bob", 2, 20), {}) == 20
+    small_finished = time.monotonic()
+    big_thread.join()
+    
+    # Bob gets half the slots as soon as he shows up: ~20 URLs at 2 slots
+    assert small_finished - started < 0.5
+    assert big["finished"] > small_finished
+    assert big["count"] == 400
+    assert crawler.max_total_in_flight == 4
+
+def test_user_quota_caps_slots_per_user():
+    crawler = FakeCrawler(latency=0.01)
+    dispatcher = CrawlDispatcher(max_concurrent=6, user_max_concurrent=2, crawler_factory=lambda: crawler)
+    
+    threads = [crawl_in_thread(dispatcher, job, 1, 1, urls("alice", job, 30), {})[0] for job in (1, 2, 3)]
+    for thread in threads:
+        thread.join()
+    
+    assert crawler.max_in_flight["alice"] == 2
+    assert len(crawler.order) == 90
+
+def test_priority_weights_jobs_of_the_same_user():
+    crawler = FakeCrawler(latency=0.005)
+    dispatcher = CrawlDispatcher(max_concurrent=1, user_max_concurrent=1, crawler_factory=lambda: crawler)
+    
+    # Hold the only slot so both jobs are queued before dispatch starts
+    blocker, _ = crawl_in_thread(dispatcher, 9, 9, 1, urls("blocker", 9, 1), {})
+    low, _ = crawl_in_thread(dispatcher, 1, 1, 1, urls("alice", "low", 40), {})
+    high, _ = crawl_in_thread(dispatcher, 2, 1, 3, urls("alice", "high", 40), {})
+    for thread in (blocker, low, high):
+        thread.join()
+    
+    first = crawler.order[1:41]
+    high_share = sum(1 for url in first if "/high/" in url) / len(first)
+    assert 0.65 <= high_share <= 0.85
+
+def test_cancel_aborts_in_flight_requests():
+    crawler = FakeCrawler(latency=5)
+    dispatcher = CrawlDispatcher(max_concurrent=4, user_max_concurrent=4, crawler_factory=lambda: crawler)
+    
+    thread, outcome = crawl_in_thread(dispatcher, 1, 1, 1, urls("alice", 1, 50), {})
+    time.sleep(0.1)
+    assert crawler.total_in_flight == 4
+    cancelled = time.monotonic()
+    dispatcher.cancel(1)
+    thread.join(timeout=2)
+    
+    assert outcome["count"] == 0
+    assert outcome["finished"] - cancelled < 0.5
+    assert crawler.total_in_flight == 0
+    assert dispatcher.get_stats() == {}
+    # The freed slots are available to the next job
+    assert dispatcher.crawl(2, 2, 1, [], {}) == 0
+
+def test_crawler_start_errors_are_raised_to_the_caller():
+    attempts = []
+    
+    def crawler_factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("no crawler")
+        return FakeCrawler()
+    
+    dispatcher = CrawlDispatcher(max_concurrent=2, user_max_concurrent=2, crawler_factory=crawler_factory)
+    with pytest.raises(RuntimeError, match="no crawler"):
+        dispatcher.crawl(1, 1, 1, urls("alice", 1, 2), {})
+    
+    # The next job starts the dispatcher again
+    assert dispatcher.crawl(2, 1, 1, urls("alice", 2, 2), {}) == 2
+    assert len(attempts) == 2
+
+def test_dispatch_failures_end_the_jobs_and_restart_the_loop():
+    crawler = FakeCrawler(latency=0.05)
+    dispatcher = CrawlDispatcher(max_concurrent=2, user_max_concurrent=2, crawler_factory=lambda: crawler)
+    next_user = dispatcher._next_user
+    calls = []
+    
+    def failing_next_user():
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("dispatch bug")
+        return next_user()
+    
+    dispatcher._next_user = failing_next_user
+    results = []
+    assert dispatcher.crawl(1, 1, 1, urls("alice", 1, 5), {}, results.append) == 5
+    errors = [result for result in results if result["error"]]
+    assert len(errors) >= 3
+    assert all("dispatch bug" in result["error"] for result in errors)
+    assert dispatcher.get_stats() == {}
+    
+    # The next job starts a new loop
+    assert dispatcher.crawl(2, 1, 1, urls("alice", 2, 3), {}) == 3
+
+def test_control_right_after_dispatch_releases_the_slots():
+    crawler = FakeCrawler(latency=0.05)
+    dispatcher = CrawlDispatcher(max_concurrent=3, user_max_concurrent=3, crawler_factory=lambda: crawler)
+    dispatcher._ensure_started()
+    
+    def add_then(job, *actions):
+        # The actions run before the tasks dispatched for the job take their first step
+        def apply():
+            dispatcher._add_job(job)
+            for action in actions:
+                dispatcher._loop.call_soon(action, job)
+        dispatcher._loop.call_soon_threadsafe(apply)
+    
+    cancelled = _JobQueue(1, 1, 1, urls("alice", 1, 10), {})
+    add_then(cancelled, dispatcher._cancel_job)
+    assert cancelled.results.get(timeout=2) is _DONE
+    assert crawler.order == []
+    
+    paused = _JobQueue(2, 1, 1, urls("alice", 2, 10), {})
+    add_then(paused, dispatcher._pause_job, dispatcher._resume_job)
+    results = [paused.results.get(timeout=2) for _ in range(11)]
+    assert results[-1] is _DONE
+    assert sorted(result["url"] for result in results[:-1]) == sorted(urls("alice", 2, 10))
+    assert dispatcher.get_stats() == {}
+    assert dispatcher._in_flight == 0
+
+def test_pause_and_resume_refetch_aborted_urls():
+    crawler = FakeCrawler(latency=0.05)
+    dispatcher = CrawlDispatcher(max_concurrent=4, user_max_concurrent=4, crawler_factory=lambda: crawler)
+    results = []
+    
+    thread, outcome = crawl_in_thread(dispatcher, 1, 1, 1, urls("alice", 1, 20), {}, results.append)
+    time.sleep(0.07)
+    dispatcher.pause(1)
+    time.sleep(0.05)
+    fetched = len(crawler.order)
+    in_flight = crawler.total_in_flight
+    time.sleep(0.2)
+    
+    # Nothing is dispatched while paused, and nothing is left in flight
+    assert in_flight == 0
+    assert len(crawler.order) == fetched
+    assert thread.is_alive()
+    
+    dispatcher.resume(1)
+    thread.join(timeout=5)
+    assert outcome["count"] == 20
+    assert sorted(result["url"] for result in results) == sorted(urls("alice", 1, 20))
+    assert len(crawler.order) > 20
+
+def test_execute_crawl_job_through_dispatcher(monkeypatch):
+    db_path = os.path.join(tempfile.mkdtemp(), "test_dispatcher.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    
+    with SyntheticSite(SiteConfig(pages=12, page_bytes=1000, error_rate=0.2, disallow_rate=0.2, seed=5)) as site:
+        dispatcher = CrawlDispatcher(
+            max_concurrent=4, user_max_concurrent=2,
+            crawler_factory=lambda: SimpleCrawler(delay_range=(0, 0), respect_robots=True, verify_ssl=False)
+        )
+        monkeypatch.setattr(crawl_service_module, "dispatcher", dispatcher)
+        monkeypatch.setattr(settings, "ingest_batch_size", 5)
+        
+        owner = User(email="dispatch@example.com", hashed_password="x")
+        db.add(owner)
+        db.commit()
+        service = CrawlService(db)
+        job = service.create_crawl_job(
+            CrawlJobCreate(name="Dispatched", target_urls=site.urls(), extraction_rules={"title": "title"}),
+            owner.id
+        )
+        assert service.execute_crawl_job(job.id)
+    
+    allowed = site.urls(include_disallowed=False)
+    stats = StatsService(db).get_job_stats(job.id)
+    assert job.status == "completed"
+    assert 0 < len(allowed) < len(site.urls())
+    assert stats.urls_crawled == len(allowed)
+    assert 0 < stats.failed_extractions < len(allowed)
+    db.close()
+    engine.dispose()
+def test_running_jobs_can_be_cancelled_and_deleted(monkeypatch):
+    db_path = os.path.join(tempfile.mkdtemp(), "test_dispatcher_control.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    
+    dispatcher = CrawlDispatcher(
+        max_concurrent=2, user_max_concurrent=2,
+        crawler_factory=lambda: SimpleCrawler(delay_range=(0, 0), respect_robots=False, verify_ssl=False)
+    )
+    monkeypatch.setattr(crawl_service_module, "dispatcher", dispatcher)
+    monkeypatch.setattr(settings, "ingest_batch_size", 1)
+    monkeypatch.setattr(settings, "job_control_poll_seconds", 0.05)
+    
+    owner = User(email="control@example.com", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    
+    def start_job(name, urls):
+        job = CrawlService(db).create_crawl_job(
+            CrawlJobCreate(name=name, target_urls=urls, extraction_rules={"title": "title"}), owner.id
+        )
+        thread = threading.Thread(
+            target=lambda: CrawlService(session_factory()).execute_crawl_job(job.id), daemon=True
+        )
+        thread.start()
+        deadline = time.monotonic() + 10
+        while StatsService(db).get_job_stats(job.id).urls_crawled < 2 and time.monotonic() < deadline:
+            db.commit()
+            time.sleep(0.02)
+        return job, thread
+    
+    with SyntheticSite(SiteConfig(pages=40, page_bytes=500, latency_ms=100, seed=9)) as site:
+        # A cancel made by another process only reaches the database
+        job, thread = start_job("Cancelled", site.urls())
+        db.query(CrawlJob).filter(CrawlJob.id == job.id).update({"status": "cancelled"})
+        db.commit()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        
+        db.refresh(job)
+        assert job.status == "cancelled"
+        assert 2 <= StatsService(db).get_job_stats(job.id).urls_crawled < 40
+        
+        job, thread = start_job("Deleted", site.urls())
+        job_id = job.id
+        assert CrawlService(db).delete_crawl_job(job_id, owner.id)
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    
+    assert db.query(ExtractedData).filter(ExtractedData.crawl_job_id == job_id).count() == 0
+    assert dispatcher.get_stats() == {}
+    db.close()
+    engine.dispose()
\ No newline at end of file
@@ -0,0 +1,172 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.api import crawl_jobs as crawl_jobs_module
+from app.config import settings
+from app.core.security import create_access_token
+from app.database import Base, get_async_db, get_async_read_db
+from app.models import user, crawl_job, report
+from app.models.user import User
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services.crawl_service import CrawlService
+from app.services.export_service import ExportService, ExportError
+from app.services.payload_service import PayloadService
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def create_job_with_results(db, email, count):
+    user = User(email=email, hashed_password="x")
+    db.add(user)
+    db.commit()
+    
+    crawl_service = CrawlService(db)
+    job = crawl_service.create_crawl_job(
+        CrawlJobCreate(
+            name="Data Job",
+            target_urls=["https://example.com"],
+            extraction_rules={"title": "title", "links": "a"}
+        ),
+        user.id
+    )
+    crawl_service.store_results(job.id, [
+        {
+            "url": f"https://example.com/{i}",
+            "data": {"title": f"Page {i}", "links": [{"text": "a", "href": "/a"}]},
+            "error": None
+        }
+        for i in range(count)
+    ])
+    return user, job
+
+def test_keyset_pagination_covers_all_rows_once():
+    db = TestingSessionLocal()
+    user, job = create_job_with_results(db, "pages@example.com", 25)
+    crawl_service = CrawlService(db)
+    
+    seen = []
+    after_id = None
+    while True:
+        page = crawl_service.get_extracted_data(job.id, user.id, after_id, limit=10)
+        seen.extend(row.url for row in page)
+        if len(page) < 10:
+            break
+        after_id = page[-1].id
+    
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    db.close()
+
+
+def test_data_endpoint_pages_only_when_asked(monkeypatch):
+    db_path = os.path.join(tempfile.mkdtemp(), "test_data.db")
+    file_engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=file_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async_session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+    
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, override_get_async_db)
+    monkeypatch.setitem(app.dependency_overrides, get_async_read_db, override_get_async_db)
+    monkeypatch.setattr(crawl_jobs_module, "DEFAULT_DATA_PAGE_SIZE", 10)
+    
+    db = sessionmaker(bind=file_engine)()
+    user, job = create_job_with_results(db, "api-pages@example.com", 25)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+    client = TestClient(app)
+    
+    # Without a cursor or limit every row comes back, as before paging
+    response = client.get(f"/crawl-jobs/{job.id}/data", headers=headers)
+    assert len(response.json()) == 25
+    assert "X-Next-Cursor" not in response.headers
+    
+    response = client.get(f"/crawl-jobs/{job.id}/data?limit=20", headers=headers)
+    assert len(response.json()) == 20
+    cursor = response.headers["X-Next-Cursor"]
+    
+    # A cursor alone gets the default page size
+    response = client.get(f"/crawl-jobs/{job.id}/data?after_id=0", headers=headers)
+    assert len(response.json()) == 10
+    assert "X-Next-Cursor" in response.headers
+    response = client.get(f"/crawl-jobs/{job.id}/data?after_id={cursor}", headers=headers)
+    assert len(response.json()) == 5
+    db.close()
+
+def test_iter_extracted_data_resumes_after_cursor():
+    db = TestingSessionLocal()
+    user, job = create_job_with_results(db, "stream@example.com", 5)
+    crawl_service = CrawlService(db)
+    
+    rows = list(crawl_service.iter_extracted_data(job.id, chunk_size=2))
+    assert [row.url for row in rows] == [f"https://example.com/{i}" for i in range(5)]
+    
+    rest = list(crawl_service.iter_extracted_data(job.id, after_id=rows[2].id, chunk_size=2))
+    assert [row.id for row in rest] == [rows[3].id, rows[4].id]
+    db.close()
+
+def test_export_csv_gzip_projects_fields():
+    db = TestingSessionLocal()
+    user, job = create_job_with_results(db, "export@example.com", 12)
+    
+    chunks = list(ExportService(db).export([job.id], "csv", "gzip", ["title"], chunk_size=5))
+    rows = list(csv.reader(io.StringIO(gzip.decompress(b"".join(chunks)).decode("utf-8"))))
+    
+    assert rows[0] == ["crawl_job_id", "id", "url", "extracted_at", "title"]
+    assert len(rows) == 13
+    assert rows[1][4] == "Page 0"
+    db.close()
+
+def test_export_flattens_nested_values_and_rejects_unknown_fields():
+    db = TestingSessionLocal()
+    user, job = create_job_with_results(db, "export-jsonl@example.com", 1)
+    export_service = ExportService(db)
+    
+    lines = b"".join(export_service.export([job.id], "csv")).decode("utf-8").splitlines()
+    assert lines[1].endswith('"[{""text"":""a"",""href"":""/a""}]"')
+    
+    with pytest.raises(ExportError):
+        export_service.export([job.id], "jsonl", fields=["missing"])
+    db.close()
+
+def test_migrate_job_compresses_payloads_transparently():
+    db = TestingSessionLocal()
+    user, job = create_job_with_results(db, "zlib@example.com", 3)
+    
+    assert PayloadService(db).migrate_job(job.id, "zlib", batch_size=2) == 3
+    
+    rows = CrawlService(db).get_extracted_data(job.id, user.id)
+    assert all(row.raw_data is None and row.payload_codec == "zlib" for row in rows)
+    assert rows[0].data == {"title": "Page 0", "links": [{"text": "a", "href": "/a"}]}
+    db.close()
+
+def test_zstd_jobs_train_a_dictionary(monkeypatch):
+    pytest.importorskip("zstandard")
+    monkeypatch.setattr(settings, "payload_dictionary_samples", 20)
+    monkeypatch.setattr(settings, "payload_dictionary_size", 1024)
+    
+    db = TestingSessionLocal()
+    user, job = create_job_with_results(db, "zstd@example.com", 40)
+    job.storage_format = "zstd"
+    db.commit()
+    
+    CrawlService(db).store_results(job.id, [
+        {"url": "https://example.com/new", "data": {"title": "New", "links": []}, "error": None}
+    ])
+    
+    row = CrawlService(db).get_extracted_data(job.id, user.id)[-1]
+    assert row.payload_codec == "zstd"
+    assert row.data == {"title": "New", "links": []}
+    db.close()
\ No newline at end of file
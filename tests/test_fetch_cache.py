@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.core.crawler import SimpleCrawler
+from app.core.fetch_cache import FetchCache
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite
+
+def page(size=100, status=200):
+    return {"status": status, "html": "x" * size, "bytes": size, "error": None if status == 200 else f"HTTP {status}"}
+
+class CountingFetch:
+    def __init__(self, result=None, delay=0.05):
+        self.calls = 0
+        self.result = result or page()
+        self.delay = delay
+    
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_one_request():
+    cache = FetchCache(max_bytes=10_000, ttl=60)
+    fetch = CountingFetch()
+    
+    results = await asyncio.gather(*(cache.fetch("http://example.com/", fetch) for _ in range(5)))
+    assert fetch.calls == 1
+    assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["network"]
+    assert all(result is results[0][0] for result, _ in results)
+    
+    assert (await cache.fetch("http://example.com/", fetch))[1] == "cache"
+    assert fetch.calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+def test_fetches_from_other_event_loops_join_the_flight():
+    cache = FetchCache(max_bytes=10_000, ttl=0)
+    fetch = CountingFetch(delay=0.2)
+    sources = []
+    
+    def crawl():
+        sources.append(asyncio.run(cache.fetch("http://example.com/", fetch))[1])
+    
+    threads = [threading.Thread(target=crawl, daemon=True) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert fetch.calls == 1
+    assert sorted(sources) == ["coalesced", "coalesced", "network"]
+    # Nothing is kept without a TTL
+    assert cache.get("http://example.com/") is None
+
+@pytest.mark.asyncio
+async def test_waiters_fetch_themselves_when_the_fetching_caller_is_cancelled():
+    cache = FetchCache(max_bytes=10_000, ttl=60)
+    fetch = CountingFetch(delay=0.1)
+    
+    leader = asyncio.create_task(cache.fetch("http://example.com/", fetch))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(cache.fetch("http://example.com/", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    
+    result, source = await follower
+    assert source == "network" and result["status"] == 200
+    assert fetch.calls == 2
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    cache = FetchCache(max_bytes=10_000, ttl=60)
+    fetch = CountingFetch(page(status=503))
+    
+    for _ in range(2):
+        result, source = await cache.fetch("http://example.com/", fetch)
+        assert (result["error"], source) == ("HTTP 503", "network")
+    assert fetch.calls == 2
+
+class RecordingSharedCache:
+    """Stands in for the Redis cache and records the threads calling it"""
+    
+    def __init__(self):
+        self.pages = {}
+        self.threads = []
+    
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.pages.get(key)
+    
+    def set(self, key, value):
+        self.threads.append(threading.get_ident())
+        self.pages[key] = value
+
+@pytest.mark.asyncio
+async def test_shared_cache_is_called_off_the_event_loop():
+    cache = FetchCache(max_bytes=10_000, ttl=60)
+    cache.shared = RecordingSharedCache()
+    fetch = CountingFetch()
+    
+    assert (await cache.fetch("http://example.com/", fetch))[1] == "network"
+    assert cache.shared.pages["http://example.com/"]["html"] == page()["html"]
+    
+    # Another process's page is found in the shared cache
+    other = FetchCache(max_bytes=10_000, ttl=60)
+    other.shared = cache.shared
+    assert (await other.fetch("http://example.com/", fetch))[1] == "cache"
+    assert fetch.calls == 1
+    
+    assert len(cache.shared.threads) == 3
+    assert threading.get_ident() not in cache.shared.threads
+
+def test_cache_is_bounded_by_size_and_age():
+    cache = FetchCache(max_bytes=250, ttl=0.1, max_page_bytes=150)
+    for n in range(3):
+        cache.set(f"http://example.com/{n}", page(100))
+    
+    # The least recently used page is evicted to stay under 250 bytes
+    assert cache.get("http://example.com/0") is None
+    assert cache.get("http://example.com/2")["html"] == "x" * 100
+    assert cache.stats()["bytes"] == 200
+    assert not cache.is_cacheable(page(200))
+    
+    time.sleep(0.15)
+    assert cache.get("http://example.com/2") is None
+    assert cache.stats()["bytes"] == 100
+
+@pytest.mark.asyncio
+async def test_jobs_apply_their_own_rules_to_shared_pages():
+    config = SiteConfig(pages=10, page_bytes=1000, latency_ms=50, seed=11)
+    cache = FetchCache(max_bytes=1_000_000, ttl=60)
+    
+    with SyntheticSite(config) as site:
+        urls = site.urls()
+        titles = SimpleCrawler(delay_range=(0, 0), respect_robots=False, fetch_cache=cache)
+        headings = SimpleCrawler(delay_range=(0, 0), respect_robots=False, fetch_cache=cache)
+        async with titles, headings:
+            title_results, heading_results = await asyncio.gather(
+                titles.crawl_urls(urls, {"title": "title"}),
+                headings.crawl_urls(urls, {"heading": "h1"})
+            )
+            # A later job within the TTL doesn't reach the site at all
+            repeat = await titles.crawl_urls(urls, {"title": "title"})
+    
+    assert all(result["data"]["title"].startswith("Page ") for result in title_results)
+    assert all(result["data"]["heading"] for result in heading_results)
+    assert [result["data"] for result in repeat] == [result["data"] for result in title_results]
+    
+    stats = cache.stats()
+    assert stats["size"] == len(urls)
+    assert stats["coalesced"] + stats["hits"] == 2 * len(urls)
\ No newline at end of file
@@ -0,0 +1,68 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.metrics import Counter, Histogram, LabelLimiter, REGISTRY, render_metrics
+
+client = TestClient(app)
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_latency_seconds", "Test latency", ["host"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.labels("example.com").observe(value)
+    
+    text = render_metrics()
+    assert 'test_latency_seconds_bucket{host="example.com",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{host="example.com",le="1"} 3' in text
+    assert 'test_latency_seconds_bucket{host="example.com",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{host="example.com"} 4' in text
+    REGISTRY.remove(histogram)
+
+def test_counter_children_are_reused_per_label_set():
+    counter = Counter("test_responses_total", "Test responses", ["host", "status"])
+    counter.labels("example.com", 200).inc()
+    counter.labels("example.com", "200").inc(2)
+    
+    assert counter.labels("example.com", 200).value == 3
+    assert 'test_responses_total{host="example.com",status="200"} 3' in render_metrics()
+    REGISTRY.remove(counter)
+
+def test_label_limiter_folds_hosts_past_the_cap_into_other():
+    hosts = LabelLimiter(2)
+    
+    assert [hosts(host) for host in ("a.com", "b.com", "c.com", "a.com", "d.com")] == [
+        "a.com", "b.com", "other", "a.com", "other"
+    ]
+
+def test_counters_mirror_totals_kept_elsewhere():
+    counter = Counter("test_checkouts_total", "Test checkouts", ["engine"])
+    counter.labels("primary").set_total(7)
+    counter.labels("primary").set_total(9)
+    
+    assert 'test_checkouts_total{engine="primary"} 9' in render_metrics()
+    REGISTRY.remove(counter)
+
+def test_metrics_endpoint_reports_route_templates():
+    client.get("/health")
+    client.get("/does-not-exist")
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert 'route="unmatched",status="404"' in response.text
+    assert "# TYPE crawler_fetch_duration_seconds histogram" in response.text
+
+def test_unhandled_errors_are_recorded_as_500():
+    async def broken():
+        raise RuntimeError("boom")
+    
+    app.add_api_route("/test-broken", broken)
+    try:
+        response = TestClient(app, raise_server_exceptions=False).get("/test-broken")
+    finally:
+        app.router.routes.pop()
+    
+    assert response.status_code == 500
+    assert 'http_request_duration_seconds_count{method="GET",route="/test-broken",status="500"} 1' in render_metrics()
+
+def test_stats_endpoints_require_authentication():
+    for path in ("/dispatch/stats", "/cache/stats", "/db/pool/stats"):
+        assert client.get(path).status_code == 403
\ No newline at end of file
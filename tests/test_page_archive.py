@@ -0,0 +1,104 @@
+import os
+import tempfile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.models import user, crawl_job, report, webhook
+from app.models.crawl_job import ArchivedPage, ExtractedData
+from app.models.user import User
+from app.core.crawler import SimpleCrawler
+from app.core.page_archive import PageArchive, content_hash, parse_warc_record
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services import archive_service as archive_service_module
+from app.services import crawl_service as crawl_service_module
+from app.services.archive_service import ArchiveService
+from app.services.crawl_service import CrawlService
+from app.services.dispatch_service import CrawlDispatcher
+from app.services.stats_service import StatsService
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite
+
+def test_pages_are_read_back_from_warc_segments():
+    archive = PageArchive(tempfile.mkdtemp(), segment_bytes=300)
+    bodies = [f"<html><title>Page {n}</title></html>".encode() * 10 for n in range(3)]
+    locations = [archive.write(f"http://example.com/{n}", body, content_hash(body)) for n, body in enumerate(bodies)]
+    
+    # Each full segment is closed for the next record
+    assert len({segment for segment, _, _ in locations}) > 1
+    assert [archive.read(*location) for location in locations] == bodies
+    
+    segment, offset, length = locations[1]
+    with open(os.path.join(archive.root, segment), "rb") as f:
+        f.seek(offset)
+        headers, block = parse_warc_record(f.read(length))
+    assert headers["WARC-Type"] == "resource"
+    assert headers["WARC-Target-URI"] == "http://example.com/1"
+    assert headers["WARC-Block-Digest"] == f"sha256:{content_hash(bodies[1])}"
+    assert block == bodies[1]
+    archive.close()
+
+def test_jobs_are_re_extracted_from_the_archive_without_fetching(monkeypatch):
+    db_path = os.path.join(tempfile.mkdtemp(), "test_page_archive.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    
+    archive = PageArchive(tempfile.mkdtemp())
+    monkeypatch.setattr(archive_service_module, "page_archive", archive)
+    monkeypatch.setattr(settings, "ingest_batch_size", 4)
+    monkeypatch.setattr(settings, "reextract_chunk_size", 3)
+    monkeypatch.setattr(settings, "reextract_workers", 2)
+    monkeypatch.setattr(crawl_service_module, "dispatcher", CrawlDispatcher(
+        max_concurrent=4, user_max_concurrent=4,
+        crawler_factory=lambda: SimpleCrawler(delay_range=(0, 0), respect_robots=False, verify_ssl=False)
+    ))
+    
+    owner = User(email="archive@example.com", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    service = CrawlService(db)
+    
+    def crawl(name, urls):
+        job = service.create_crawl_job(
+            CrawlJobCreate(name=name, target_urls=urls, extraction_rules={"title": "title"}, archive_pages=True),
+            owner.id
+        )
+        assert service.execute_crawl_job(job.id)
+        return job
+    
+    with SyntheticSite(SiteConfig(pages=10, page_bytes=1000, error_rate=0.2, seed=7)) as site:
+        job = crawl("Archived", site.urls())
+        ok_urls = {row.url for row in db.query(ExtractedData).filter(ExtractedData.crawl_job_id == job.id) if row.data.get("title")}
+        segments = os.listdir(archive.root)
+        written = sum(os.path.getsize(os.path.join(archive.root, name)) for name in segments)
+        
+        # The same pages crawled by another job are not stored twice
+        crawl("Archived again", site.urls())
+        assert sum(os.path.getsize(os.path.join(archive.root, name)) for name in os.listdir(archive.root)) == written
+    
+    # Failed fetches have no page to archive
+    assert 0 < len(ok_urls) < 10
+    assert {page.url for page in db.query(ArchivedPage).filter(ArchivedPage.crawl_job_id == job.id)} == ok_urls
+    
+    # The site is gone: everything comes from the archive
+    assert service.reextract_crawl_job(job.id, {"heading": "h1", "title": "title"})
+    db.expire_all()
+    rows = db.query(ExtractedData).filter(ExtractedData.crawl_job_id == job.id).all()
+    assert {row.url for row in rows} == ok_urls
+    assert all(row.data["heading"] and row.data["title"].startswith("Page ") for row in rows)
+    assert job.status == "completed" and job.extraction_rules == {"heading": "h1", "title": "title"}
+    
+    stats = StatsService(db).get_job_stats(job.id)
+    assert (stats.urls_crawled, stats.successful_extractions, stats.field_fill_counts["heading"]) == (len(ok_urls),) * 3
+    
+    # Running jobs are left alone
+    job.status = "running"
+    db.commit()
+    assert not service.reextract_crawl_job(job.id)
+    
+    job.status = "completed"
+    db.commit()
+    assert service.delete_crawl_job(job.id, owner.id)
+    assert ArchiveService(db, archive).count_pages(job.id) == 0
+    db.close()
+    engine.dispose()
\ No newline at end of file
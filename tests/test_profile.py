@@ -0,0 +1,66 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import user, crawl_job, report
+from app.models.user import User
+from app.models.crawl_job import FetchTiming
+from app.schemas.crawl_job import CrawlJobCreate
+from app.core.crawler import network_timings
+from app.services.crawl_service import CrawlService
+from app.services.profile_service import ProfileService
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def timings(scale):
+    return {
+        "dns_us": 1000 * scale, "connect_us": 2000 * scale, "first_byte_us": 3000 * scale,
+        "body_us": 4000 * scale, "decode_us": 100 * scale, "parse_us": 500 * scale, "extract_us": 50 * scale
+    }
+
+def test_network_timings_split_stages():
+    marks = {"request_start": 1.0, "dns": 0.002, "connect": 0.010, "headers": 1.025}
+    stages = network_timings(marks, body_done=1.040)
+    assert stages == {"dns_us": 2000, "connect_us": 8000, "first_byte_us": 15000, "body_us": 15000}
+    assert network_timings({}) == {"dns_us": 0, "connect_us": 0}
+
+def test_job_profile_percentiles_per_host():
+    db = TestingSessionLocal()
+    user = User(email="profile@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    
+    crawl_service = CrawlService(db)
+    job = crawl_service.create_crawl_job(
+        CrawlJobCreate(name="Profile Job", target_urls=["https://a.example.com"],
+                       extraction_rules={"title": "title"}),
+        user.id
+    )
+    results = [
+        {"url": f"https://a.example.com/{i}", "data": {"title": "A"}, "error": None, "timings": timings(i)}
+        for i in range(1, 11)
+    ]
+    results.append({"url": "https://b.example.com/", "data": {}, "error": "Timeout", "timings": {"dns_us": 9000}})
+    results.append({"url": "https://b.example.com/old", "data": {"title": "B"}, "error": None})
+    crawl_service.store_results(job.id, results)
+    
+    profile = ProfileService(db).get_job_profile(job.id)
+    assert profile["samples"] == 11
+    assert sorted(profile["hosts"]) == ["a.example.com", "b.example.com"]
+    
+    host_a = profile["hosts"]["a.example.com"]["stages"]
+    assert host_a["first_byte"]["p50_ms"] == 15.0
+    assert host_a["first_byte"]["p90_ms"] == 27.0
+    assert host_a["first_byte"]["p99_ms"] == host_a["first_byte"]["max_ms"] == 30.0
+    assert host_a["db"]["p50_ms"] >= 0
+    
+    host_b = profile["hosts"]["b.example.com"]
+    assert host_b["samples"] == 1
+    assert set(host_b["stages"]) == {"dns", "db"}
+    assert profile["stages"]["dns"]["max_ms"] == 10.0
+    
+    crawl_service.delete_crawl_job(job.id, user.id)
+    assert db.query(FetchTiming).count() == 0
+    db.close()
\ No newline at end of file
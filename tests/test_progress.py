@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.api import crawl_jobs as crawl_jobs_module
+from app.database import get_async_db, get_async_read_db, Base
+from app.core.progress import ProgressHub
+from app.core.security import create_access_token
+from app.models import user, crawl_job, report
+from app.models.user import User
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services.crawl_service import CrawlService
+
+def follow(hub, job_id, total_urls, loader):
+    async def collect():
+        return [snapshot async for snapshot in hub.subscribe(job_id, total_urls, loader)]
+    return asyncio.create_task(collect())
+
+def test_subscribers_share_the_crawlers_feed():
+    hub = ProgressHub(interval=0.01, poll_interval=0.05, rate_window=1.0)
+    loads = []
+    
+    async def loader(job_id):
+        loads.append(job_id)
+        return {"status": "completed", "done": 3, "failed": 1, "bytes_downloaded": 300}
+    
+    async def main():
+        hub.start(1)
+        followers = [follow(hub, 1, 3, loader) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert hub.get_stats() == {"tracked_jobs": 1, "feeds": 1, "subscribers": 3}
+        
+        # Crawl threads report from outside the event loop
+        for n in range(3):
+            await asyncio.to_thread(hub.record, 1, n != 2, 100)
+            await asyncio.sleep(0.03)
+        await asyncio.to_thread(hub.finish, 1)
+        return await asyncio.gather(*followers)
+    
+    for events in asyncio.run(main()):
+        running = [event for event in events if event["status"] == "running"]
+        assert [event["done"] for event in running] == sorted(event["done"] for event in running)
+        assert any(event["rate"] > 0 and event["eta_seconds"] is not None for event in running)
+        assert events[-1] == {
+            "job_id": 1, "status": "completed", "total_urls": 3, "done": 3, "failed": 1,
+            "bytes_downloaded": 300, "rate": events[-1]["rate"], "eta_seconds": 0.0, "percentage": 100.0
+        }
+    
+    # Only the final status was read from the database
+    assert loads == [1]
+    assert hub.get_stats()["feeds"] == 0
+
+def test_jobs_of_other_processes_are_polled_once_for_all_subscribers():
+    hub = ProgressHub(interval=0.01, poll_interval=0.05)
+    state = {"status": "running", "done": 0, "failed": 0, "bytes_downloaded": 0}
+    loads = []
+    
+    async def loader(job_id):
+        loads.append(job_id)
+        return dict(state)
+    
+    async def main():
+        followers = [follow(hub, 2, 10, loader) for _ in range(5)]
+        for done in range(1, 6):
+            state["done"] = done
+            await asyncio.sleep(0.06)
+        state["status"] = "cancelled"
+        return await asyncio.gather(*followers)
+    
+    streams = asyncio.run(main())
+    assert all(events[-1]["status"] == "cancelled" for events in streams)
+    assert all(events[-1]["done"] == 5 for events in streams)
+    assert len(loads) <= 10
+
+def test_resubscribing_as_the_last_subscriber_leaves_starts_a_new_feed():
+    hub = ProgressHub(interval=0.01, poll_interval=0.05)
+    state = {"status": "running", "done": 0, "failed": 0, "bytes_downloaded": 0}
+    
+    async def loader(job_id):
+        return dict(state)
+    
+    async def main():
+        leaving = follow(hub, 3, 10, loader)
+        await asyncio.sleep(0.03)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        # The old feed's task is cancelled but hasn't run its cleanup yet
+        assert hub.get_stats()["feeds"] == 0
+        
+        joining = follow(hub, 3, 10, loader)
+        await asyncio.sleep(0.03)
+        state["status"] = "completed"
+        return await asyncio.wait_for(joining, 1)
+    
+    events = asyncio.run(main())
+    assert events[-1]["status"] == "completed"
+    assert hub.get_stats()["feeds"] == 0
+
+def test_deleted_job_ends_the_stream():
+    hub = ProgressHub(interval=0.01)
+    
+    async def loader(job_id):
+        return None
+    
+    async def main():
+        return await follow(hub, 3, 1, loader)
+    
+    assert asyncio.run(main()) == [{"job_id": 3, "status": "deleted"}]
+
+def test_progress_endpoint_streams_server_sent_events(monkeypatch):
+    db_path = os.path.join(tempfile.mkdtemp(), "test_progress.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async_session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+    
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, override_get_async_db)
+    monkeypatch.setitem(app.dependency_overrides, get_async_read_db, override_get_async_db)
+    monkeypatch.setattr(crawl_jobs_module, "AsyncSessionLocal", async_session_factory)
+    
+    db = sessionmaker(bind=engine)()
+    owner = User(email="progress@example.com", hashed_password="x", is_active=True)
+    db.add(owner)
+    db.commit()
+    service = CrawlService(db)
+    job = service.create_crawl_job(
+        CrawlJobCreate(name="Streamed", target_urls=["https://example.com/a", "https://example.com/b"],
+                       extraction_rules={"title": "title"}),
+        owner.id
+    )
+    service.store_results(job.id, [{"url": "https://example.com/a", "data": {"title": "A"}, "error": None}])
+    job.status = "completed"
+    db.commit()
+    
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': owner.email})}"}
+    client = TestClient(app)
+    response = client.get(f"/crawl-jobs/{job.id}/progress", headers=headers)
+    assert client.get("/crawl-jobs/999999/progress", headers=headers).status_code == 404
+    
+    assert response.headers["content-type"].startswith("text/event-stream")
+    event, data = response.text.strip().split("\n")
+    assert event == "event: progress"
+    snapshot = json.loads(data[len("data: "):])
+    assert snapshot["status"] == "completed"
+    assert (snapshot["done"], snapshot["total_urls"], snapshot["percentage"]) == (1, 2, 50.0)
+    db.close()
+    engine.dispose()
\ No newline at end of file
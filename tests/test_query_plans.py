@@ -0,0 +1,146 @@
+import datetime
+import os
+import re
+import tempfile
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, PROJECT_ROOT
+from app.core.search_index import include_name
+from app.models import user, crawl_job, report, webhook
+from app.models.user import User
+from app.schemas.crawl_job import CrawlJobCreate
+from app.schemas.report import ReportCreate
+from app.schemas.webhook import WebhookCreate
+from app.services.archive_service import ArchiveService
+from app.services.crawl_service import CrawlService
+from app.services.export_service import ExportService
+from app.services.profile_service import ProfileService
+from app.services.report_service import ReportService
+from app.services.schedule_service import ScheduleService
+from app.services.search_service import SearchService
+from app.services.shard_service import ShardService
+from app.services.stats_service import StatsService
+from app.services.user_service import UserService
+from app.services.webhook_service import WebhookService
+
+# The schema is built by the migrations, not create_all, so the plans reflect
+# the indexes that actually ship
+db_path = os.path.join(tempfile.mkdtemp(), "test_query_plans.db")
+database_url = f"sqlite:///{db_path}"
+
+config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+config.set_main_option("sqlalchemy.url", database_url)
+config.attributes["configure_logger"] = False
+command.upgrade(config, "head")
+
+engine = create_engine(database_url)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# "SCAN <table>" is a full table or full index scan; "SEARCH" seeks an index.
+# Virtual tables report every lookup as a SCAN, constrained ones with a
+# non-empty index string (e.g. "INDEX 0:M" for an FTS5 MATCH). Scans of
+# subqueries, such as window function results, read rows their own plan built
+FULL_SCAN = re.compile(r"^SCAN (\S+)(?!\S)(?! VIRTUAL TABLE INDEX \d+:\S)")
+
+def capture_statements(func):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+def full_scans(statements):
+    scans = []
+    with engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for row in plan:
+                match = FULL_SCAN.match(row[-1])
+                if match and match.group(1) in tables:
+                    scans.append((statement, row[-1]))
+    return scans
+
+def seed(db):
+    owner = User(email="plans@example.com", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    
+    crawl_service = CrawlService(db)
+    job = crawl_service.create_crawl_job(
+        CrawlJobCreate(
+            name="Plan Job",
+            target_urls=["https://example.com"],
+            extraction_rules={"title": "title"}
+        ),
+        owner.id
+    )
+    crawl_service.store_results(job.id, [
+        {"url": f"https://example.com/{i}", "data": {"title": f"Page {i}"}, "error": None,
+         "timings": {"dns_us": 1000, "connect_us": 2000, "first_byte_us": 3000, "body_us": 4000}}
+        for i in range(20)
+    ])
+    return owner, job
+
+def test_migrations_match_models():
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_name": include_name})
+        assert compare_metadata(context, Base.metadata) == []
+
+def test_api_queries_do_not_scan_tables():
+    db = TestingSessionLocal()
+    owner, job = seed(db)
+    crawl_service = CrawlService(db)
+    report_service = ReportService(db)
+    
+    def run_queries():
+        UserService(db).get_user_by_email(owner.email)
+        crawl_service.get_crawl_jobs(owner.id, limit=10)
+        crawl_service.get_crawl_jobs(owner.id, limit=10, after_id=job.id)
+        crawl_service.get_crawl_job(job.id, owner.id)
+        crawl_service.get_extracted_data(job.id, owner.id, after_id=5, limit=10)
+        list(crawl_service.iter_extracted_data(job.id, after_id=5))
+        list(ExportService(db).iter_rows([job.id], 100))
+        ProfileService(db).get_job_profile(job.id)
+        ScheduleService(db).get_upcoming_runs(datetime.datetime.utcnow())
+        ShardService(db).aggregate_job_status(job.id)
+        StatsService(db).get_job_progress(job.id)
+        StatsService(db).get_outcome_counts([job.id])
+        search_service = SearchService(db)
+        hits = search_service.search(owner.id, "page", limit=5)
+        search_service.search(owner.id, "page", job.id, limit=5, cursor=f"{hits[-1][1]!r}:{hits[-1][0].id}")
+        StatsService(db).get_slowest_hosts([job.id])
+        archive_service = ArchiveService(db)
+        archive_service.count_pages(job.id)
+        archive_service.get_latest_pages(job.id)
+        webhook_service = WebhookService(db)
+        hook = webhook_service.create_webhook(WebhookCreate(url="https://example.com/hook"), owner.id)
+        webhook_service.get_webhooks(owner.id)
+        webhook_service.enqueue_job_event(job.id, "completed")
+        db.commit()
+        webhook_service.claim_due_deliveries(datetime.datetime.utcnow(), 100, 20)
+        webhook_service.get_deliveries(hook.id)
+        created = report_service.create_report(
+            ReportCreate(title="Plan Report", crawl_job_ids=[job.id]), owner.id
+        )
+        report_service.get_reports(owner.id, limit=10, after_id=0)
+        report_service.get_report(created.id, owner.id)
+        crawl_service.delete_crawl_job(job.id, owner.id)
+    
+    statements = capture_statements(run_queries)
+    db.close()
+    
+    assert statements
+    assert full_scans(statements) == []
\ No newline at end of file
@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import user, crawl_job, report
+from app.models.user import User
+from app.models.crawl_job import CrawlJob
+from app.core.cron import CronSchedule
+from app.core.leader_lock import LeaderLock
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services.crawl_service import CrawlService
+from app.services.schedule_service import CrawlScheduler, ScheduleService, next_run_time
+
+db_path = os.path.join(tempfile.mkdtemp(), "test_scheduler.db")
+engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def create_job(db, email, **schedule):
+    owner = User(email=email, hashed_password="x")
+    db.add(owner)
+    db.commit()
+    return CrawlService(db).create_crawl_job(
+        CrawlJobCreate(name="Scheduled", target_urls=["https://example.com"],
+                       extraction_rules={"title": "title"}, **schedule),
+        owner.id
+    )
+
+def test_cron_next_occurrence():
+    after = datetime.datetime(2024, 1, 31, 23, 59, 30)
+    assert CronSchedule("*/15 * * * *").next_after(after) == datetime.datetime(2024, 2, 1, 0, 0)
+    assert CronSchedule("0 9 * * 1-5").next_after(datetime.datetime(2024, 2, 2, 10)) == datetime.datetime(2024, 2, 5, 9, 0)
+    assert CronSchedule("0 0 29 2 *").next_after(after) == datetime.datetime(2024, 2, 29)
+    assert CronSchedule("@monthly").next_after(after) == datetime.datetime(2024, 2, 1)
+    # Day of month and day of week restricted together match either
+    assert CronSchedule("0 0 13 * 5").next_after(datetime.datetime(2024, 1, 1)) == datetime.datetime(2024, 1, 5)
+    
+    for invalid in ("* * *", "60 * * * *", "*/0 * * * *", "0 0 30 2 *", "x * * * *"):
+        with pytest.raises(ValueError):
+            CronSchedule(invalid)
+
+def test_next_run_time():
+    now = datetime.datetime(2024, 1, 1, 12, 0, 30)
+    later = now + datetime.timedelta(hours=1)
+    assert next_run_time(None, None, now) is None
+    assert next_run_time(now - datetime.timedelta(minutes=5), None, now) is None
+    assert next_run_time(later, None, now) == later
+    assert next_run_time(None, "0 * * * *", now) == datetime.datetime(2024, 1, 1, 13, 0)
+    assert next_run_time(datetime.datetime(2024, 1, 2, 6, 0), "0 6 * * *", now) == datetime.datetime(2024, 1, 2, 6, 0)
+
+def test_claim_run_only_once_and_advances_recurring_jobs():
+    db = TestingSessionLocal()
+    job = create_job(db, "claim@example.com", schedule="0 * * * *")
+    due_at = job.next_run_at
+    assert due_at is not None
+    
+    service = ScheduleService(db)
+    run_now, next_run_at = service.claim_run(job.id, due_at, due_at)
+    assert run_now
+    assert next_run_at == due_at + datetime.timedelta(hours=1)
+    assert service.claim_run(job.id, due_at, due_at) == (False, None)
+    
+    db.refresh(job)
+    assert job.next_run_at == next_run_at
+    db.close()
+
+def test_only_one_leader_per_database():
+    first = LeaderLock(engine, "test-leader")
+    second = LeaderLock(engine, "test-leader")
+    try:
+        assert first.try_acquire()
+        assert not second.try_acquire()
+        first.release()
+        assert second.try_acquire()
+    finally:
+        first.release()
+        second.release()
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_when_due():
+    db = TestingSessionLocal()
+    one_off = create_job(db, "due@example.com",
+                         scheduled_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=0.3))
+    recurring = create_job(db, "recurring@example.com", schedule="0 0 1 1 *")
+    
+    ran = []
+    scheduler = CrawlScheduler(TestingSessionLocal, LeaderLock(engine, "test-scheduler"), refresh_seconds=60)
+    scheduler.start(ran.append)
+    try:
+        await asyncio.sleep(0.1)
+        assert scheduler.is_leader
+        assert ran == []
+        
+        # A job scheduled through this instance wakes the scheduler before its next refresh
+        notified = create_job(db, "notified@example.com",
+                              scheduled_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=0.2))
+        scheduler.notify(notified.id, notified.next_run_at)
+        
+        await asyncio.sleep(0.6)
+        assert sorted(ran) == sorted([one_off.id, notified.id])
+    finally:
+        await scheduler.stop()
+    
+    db.expire_all()
+    assert db.get(CrawlJob, one_off.id).next_run_at is None
+    assert db.get(CrawlJob, recurring.id).next_run_at.month == 1
+    db.close()
\ No newline at end of file
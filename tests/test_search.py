@@ -0,0 +1,104 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import user, crawl_job, report, webhook
+from app.models.user import User
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services.crawl_service import CrawlService
+from app.services.search_service import SearchService, encode_cursor
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def create_job(db, email, storage_format="json"):
+    owner = User(email=email, hashed_password="x")
+    db.add(owner)
+    db.commit()
+    
+    job = CrawlService(db).create_crawl_job(
+        CrawlJobCreate(
+            name="Search Job",
+            target_urls=["https://shop.example.com"],
+            extraction_rules={"title": "h1", "links": "a@href"},
+            storage_format=storage_format
+        ),
+        owner.id
+    )
+    return owner, job
+
+def product(n, title, description=None):
+    data = {"title": title, "links": [{"text": description or "", "href": f"/products/{n}"}], "price": n}
+    return {"url": f"https://shop.example.com/products/{n}", "data": data, "error": None}
+
+def test_results_are_searchable_once_stored():
+    db = TestingSessionLocal()
+    owner, job = create_job(db, "search@example.com", storage_format="zlib")
+    other, other_job = create_job(db, "other-search@example.com")
+    crawl_service = CrawlService(db)
+    
+    crawl_service.store_results(job.id, [
+        product(1, "Blue Widget", "A widget for widget collectors"),
+        product(2, "Red Gadget", "Pairs well with any widget"),
+        product(3, "Green Gizmo"),
+        {"url": "https://shop.example.com/products/4", "data": {}, "error": "HTTP 500"}
+    ])
+    crawl_service.store_results(other_job.id, [product(5, "Another Widget")])
+    search_service = SearchService(db)
+    
+    # Nested strings are indexed, stemmed and ranked; other users' jobs are not searched
+    hits = search_service.search(owner.id, "widgets")
+    assert [row.url.rsplit("/", 1)[1] for row, _ in hits] == ["1", "2"]
+    assert hits[0][1] > hits[1][1]
+    assert hits[0][0].data["title"] == "Blue Widget"
+    
+    assert [row.url for row, _ in search_service.search(owner.id, "red widget")] == ["https://shop.example.com/products/2"]
+    assert search_service.search(owner.id, "widget", job_id=other_job.id) == []
+    assert len(search_service.search(other.id, "widget")) == 1
+    # Query syntax in user input is searched as text
+    assert search_service.search(owner.id, 'gizmo" OR "widget') == []
+    assert search_service.search(owner.id, "- *") == []
+    db.close()
+
+def test_search_pages_follow_the_ranking():
+    db = TestingSessionLocal()
+    owner, job = create_job(db, "pages@example.com")
+    # Ties in score are ordered by id
+    CrawlService(db).store_results(job.id, [
+        product(n, "Lamp " * (n % 4 + 1), "desk lamp") for n in range(25)
+    ])
+    search_service = SearchService(db)
+    ranked = search_service.search(owner.id, "lamp", limit=100)
+    
+    pages = []
+    cursor = None
+    while True:
+        hits = search_service.search(owner.id, "lamp", limit=10, cursor=cursor)
+        pages.append(hits)
+        if len(hits) < 10:
+            break
+        cursor = encode_cursor(hits[-1][1], hits[-1][0].id)
+    
+    assert [len(hits) for hits in pages] == [10, 10, 5]
+    assert [row.id for hits in pages for row, _ in hits] == [row.id for row, _ in ranked]
+    db.close()
+
+def test_documents_follow_their_rows():
+    db = TestingSessionLocal()
+    owner, job = create_job(db, "rebuild@example.com")
+    crawl_service = CrawlService(db)
+    search_service = SearchService(db)
+    crawl_service.store_results(job.id, [product(1, "Copper Kettle"), product(2, "Copper Pan")])
+    
+    # Rows stored before search existed are indexed by index_job
+    search_service.delete_job_documents(job.id)
+    db.commit()
+    assert search_service.search(owner.id, "copper") == []
+    assert search_service.index_job(job.id, batch_size=1) == 2
+    assert len(search_service.search(owner.id, "copper")) == 2
+    
+    assert crawl_service.delete_crawl_job(job.id, owner.id)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM extracted_data_search WHERE extracted_data_search MATCH 'copper'")).scalar() == 0
+    db.close()
\ No newline at end of file
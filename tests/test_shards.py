@@ -0,0 +1,237 @@
+import datetime
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from celery.contrib.testing.worker import start_worker
+from app import worker
+from app.config import settings
+from app.database import Base
+from app.models import user, crawl_job, report
+from app.models.crawl_job import CrawlJob, CrawlJobShard, ExtractedData
+from app.models.user import User
+from app.schemas.crawl_job import CrawlJobCreate
+from app.services.crawl_service import CrawlService
+from app.services.shard_service import ShardLeaseHeld, ShardService, split_urls
+from app.services.stats_service import StatsService
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite
+import threading
+import time
+
+def make_session_factory():
+    db_path = os.path.join(tempfile.mkdtemp(), "test_shards.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)
+
+def create_job(db, urls):
+    owner = User(email="shards@example.com", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    return CrawlService(db).create_crawl_job(
+        CrawlJobCreate(name="Sharded", target_urls=urls, extraction_rules={"title": "title"}),
+        owner.id
+    )
+
+def configure(monkeypatch, session_factory, **celery_conf):
+    monkeypatch.setattr(worker, "SessionLocal", session_factory)
+    monkeypatch.setattr(settings, "crawl_shard_size", 5)
+    monkeypatch.setattr(settings, "ingest_batch_size", 2)
+    monkeypatch.setattr(settings, "request_delay", 0)
+    monkeypatch.setattr(settings, "verify_ssl", False)
+    for key, value in celery_conf.items():
+        monkeypatch.setitem(worker.celery_app.conf, key, value)
+    # Connections of earlier tests are pooled for the broker they were opened with
+    monkeypatch.setattr(worker.celery_app, "_pool", None)
+    monkeypatch.setattr(worker.celery_app.amqp, "_producer_pool", None)
+
+def test_split_urls():
+    assert split_urls(list("abcdefg"), 3) == [["a", "b", "c"], ["d", "e", "f"], ["g"]]
+    assert split_urls([], 3) == []
+
+def test_small_jobs_are_not_sharded(monkeypatch):
+    monkeypatch.setattr(settings, "celery_task_always_eager", True)
+    monkeypatch.setattr(settings, "crawl_shard_size", 5)
+    assert not CrawlService._should_shard(CrawlJob(target_urls=["http://example.com/"] * 5))
+    assert CrawlService._should_shard(CrawlJob(target_urls=["http://example.com/"] * 6))
+    
+    monkeypatch.setattr(settings, "celery_task_always_eager", False)
+    monkeypatch.setattr(settings, "celery_broker_url", None)
+    assert not CrawlService._should_shard(CrawlJob(target_urls=["http://example.com/"] * 6))
+
+def test_job_status_is_aggregated_from_shards():
+    engine, session_factory = make_session_factory()
+    db = session_factory()
+    job = create_job(db, [f"http://example.com/{n}" for n in range(7)])
+    job.status = "running"
+    shards = ShardService(db).create_shards(job, 3)
+    db.commit()
+    
+    service = ShardService(db)
+    assert [len(shard.urls) for shard in shards] == [3, 3, 1]
+    assert service.get_shard_counts(job.id) == {"pending": 3, "running": 0, "completed": 0, "failed": 0, "cancelled": 0, "total": 3}
+    
+    assert service.start_shard(shards[0].id) is not None
+    assert service.start_shard(shards[0].id) is None  # a redelivered task doesn't run it again
+    assert service.finish_shard(shards[0].id, 1, 3) is None
+    
+    service.start_shard(shards[1].id)
+    service.start_shard(shards[2].id)
+    assert service.finish_shard(shards[1].id, 1, 0, error="boom") is None
+    assert service.finish_shard(shards[2].id, 1, 1) == "failed"
+    
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.completed_at is not None
+    assert service.get_shard_counts(job.id)["failed"] == 1
+    db.close()
+    engine.dispose()
+
+def test_shards_of_lost_workers_are_claimed_again_once_their_lease_expires(monkeypatch):
+    engine, session_factory = make_session_factory()
+    db = session_factory()
+    job = create_job(db, [f"http://example.com/{n}" for n in range(3)])
+    job.status = "running"
+    shard = ShardService(db).create_shards(job, 3)[0]
+    db.commit()
+    
+    service = ShardService(db)
+    claimed = service.start_shard(shard.id)
+    assert claimed is not None and claimed.lease_expires_at > claimed.started_at
+    assert claimed.attempt == 1
+    
+    # The worker is still renewing: a redelivered task is told when to retry
+    assert service.renew_lease(shard.id, 1)
+    with pytest.raises(ShardLeaseHeld) as held:
+        CrawlService(db).execute_shard(shard.id)
+    assert 0 < held.value.retry_in <= settings.shard_lease_seconds
+    
+    # The worker died and the lease ran out
+    shard.lease_expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.commit()
+    assert service.lease_remaining(shard.id) == 0
+    assert service.start_shard(shard.id).attempt == 2
+    assert service.start_shard(shard.id) is None
+    
+    # A worker that was only slow has lost its claim
+    assert not service.renew_lease(shard.id, 1)
+    assert service.finish_shard(shard.id, 1, 3) is None
+    assert service.get_shard_counts(job.id)["running"] == 1
+    
+    assert service.finish_shard(shard.id, 2, 3) == "completed"
+    assert not service.renew_lease(shard.id, 2)
+    assert service.lease_remaining(shard.id) is None
+    db.close()
+    engine.dispose()
+
+def test_reclaimed_shards_skip_urls_already_stored(monkeypatch):
+    engine, session_factory = make_session_factory()
+    configure(monkeypatch, session_factory)
+    monkeypatch.setattr(settings, "respect_robots", False)
+    db = session_factory()
+    
+    with SyntheticSite(SiteConfig(pages=6, page_bytes=500, seed=5)) as site:
+        urls = site.urls()
+        job = create_job(db, urls)
+        job.status = "running"
+        shard = ShardService(db).create_shards(job, 6)[0]
+        db.commit()
+        
+        # The first worker stored two results, then died
+        service = CrawlService(db)
+        ShardService(db).start_shard(shard.id)
+        service.store_results(job.id, [{"url": url, "data": {"title": "T"}, "error": None} for url in urls[:2]])
+        shard.lease_expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        db.commit()
+        
+        assert service.execute_shard(shard.id) == 4
+    
+    db.refresh(shard)
+    db.refresh(job)
+    assert (shard.attempt, shard.status, shard.urls_crawled) == (2, "completed", 6)
+    assert job.status == "completed"
+    assert sorted(url for url, in db.query(ExtractedData.url).filter(ExtractedData.crawl_job_id == job.id)) == sorted(urls)
+    assert StatsService(db).get_job_stats(job.id).urls_crawled == 6
+    db.close()
+    engine.dispose()
+
+def test_execute_crawl_job_in_eager_shards(monkeypatch):
+    engine, session_factory = make_session_factory()
+    configure(monkeypatch, session_factory, task_always_eager=True)
+    monkeypatch.setattr(settings, "celery_task_always_eager", True)
+    db = session_factory()
+    
+    with SyntheticSite(SiteConfig(pages=12, page_bytes=1000, error_rate=0.2, disallow_rate=0.2, seed=7)) as site:
+        job = create_job(db, site.urls())
+        assert CrawlService(db).execute_crawl_job(job.id)
+    
+    allowed = site.urls(include_disallowed=False)
+    db.refresh(job)
+    shards = db.query(CrawlJobShard).filter(CrawlJobShard.crawl_job_id == job.id).all()
+    assert job.status == "completed"
+    assert len(shards) == 3
+    assert sum(shard.urls_crawled for shard in shards) == len(allowed)
+    assert StatsService(db).get_job_stats(job.id).urls_crawled == len(allowed)
+    assert db.query(ExtractedData).filter(ExtractedData.crawl_job_id == job.id).count() == len(allowed)
+    db.close()
+    engine.dispose()
+
+def test_filesystem_broker_fans_out_to_a_worker(monkeypatch):
+    engine, session_factory = make_session_factory()
+    folder = tempfile.mkdtemp()
+    configure(
+        monkeypatch, session_factory,
+        task_always_eager=False,
+        broker_url="filesystem://",
+        **worker.broker_options("filesystem://", folder)
+    )
+    monkeypatch.setattr(settings, "celery_broker_url", "filesystem://")
+    db = session_factory()
+    
+    with SyntheticSite(SiteConfig(pages=11, page_bytes=1000, seed=3)) as site:
+        job = create_job(db, site.urls())
+        assert CrawlService(db).execute_crawl_job(job.id)
+        
+        # Queued, not crawled: the shards wait as message files for a worker
+        assert ShardService(db).get_shard_counts(job.id)["pending"] == 3
+        assert len(os.listdir(os.path.join(folder, "queue"))) == 3
+        
+        with start_worker(worker.celery_app, pool="solo", perform_ping_check=False, shutdown_timeout=30):
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline:
+                db.expire_all()
+                if db.get(CrawlJob, job.id).status != "running":
+                    break
+                time.sleep(0.2)
+    
+    db.refresh(job)
+    assert job.status == "completed"
+    assert StatsService(db).get_job_stats(job.id).urls_crawled == len(site.urls(include_disallowed=False))
+    db.close()
+    engine.dispose()
+def test_cancelled_job_stops_its_shards(monkeypatch):
+    engine, session_factory = make_session_factory()
+    configure(monkeypatch, session_factory, task_always_eager=True)
+    monkeypatch.setattr(settings, "celery_task_always_eager", True)
+    monkeypatch.setattr(settings, "job_control_poll_seconds", 0.05)
+    monkeypatch.setattr(settings, "respect_robots", False)
+    db = session_factory()
+    
+    with SyntheticSite(SiteConfig(pages=40, page_bytes=500, latency_ms=100, seed=4)) as site:
+        job = create_job(db, site.urls())
+        thread = threading.Thread(target=lambda: CrawlService(session_factory()).execute_crawl_job(job.id))
+        thread.start()
+        time.sleep(0.5)
+        db.query(CrawlJob).filter(CrawlJob.id == job.id).update({"status": "cancelled"})
+        db.commit()
+        thread.join(timeout=10)
+    
+    db.refresh(job)
+    counts = ShardService(db).get_shard_counts(job.id)
+    assert job.status == "cancelled"
+    assert counts["cancelled"] >= 1
+    assert counts["completed"] + counts["cancelled"] == counts["total"] == 8
+    assert StatsService(db).get_job_stats(job.id).urls_crawled < 40
+    db.close()
+    engine.dispose()
\ No newline at end of file
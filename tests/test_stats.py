@@ -0,0 +1,152 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.user import User
+from app.models.crawl_job import ExtractedData
+from app.schemas.crawl_job import CrawlJobCreate
+from app.schemas.report import ReportCreate
+from app.services.crawl_service import CrawlService
+from app.services.report_service import ReportService, report_cache
+from app.services.stats_service import StatsService
+
+engine = create_engine("sqlite://")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+# Job ids restart with this database, so reports cached by other modules must go
+report_cache.clear()
+
+def create_job(db, email):
+    user = User(email=email, hashed_password="x")
+    db.add(user)
+    db.commit()
+    
+    job = CrawlService(db).create_crawl_job(
+        CrawlJobCreate(
+            name="Stats Job",
+            target_urls=["https://example.com/a", "https://example.com/b"],
+            extraction_rules={"title": "title", "author": ".author"}
+        ),
+        user.id
+    )
+    return user, job
+
+def test_store_results_updates_stats():
+    db = TestingSessionLocal()
+    user, job = create_job(db, "stats@example.com")
+    
+    CrawlService(db).store_results(job.id, [
+        {"url": "https://example.com/a", "data": {"title": "A", "author": None}, "error": None,
+         "bytes": 100, "elapsed_ms": 20},
+        {"url": "https://example.com/b", "data": {}, "error": "HTTP 500", "bytes": 0, "elapsed_ms": 10}
+    ])
+    
+    stats = StatsService(db).get_job_stats(job.id)
+    assert stats.urls_crawled == 2
+    assert stats.successful_extractions == 1
+    assert stats.failed_extractions == 1
+    assert stats.bytes_downloaded == 100
+    assert stats.elapsed_ms_total == 30
+    assert stats.field_fill_counts == {"title": 1}
+    
+    report = ReportService(db).create_report(
+        ReportCreate(title="Stats Report", crawl_job_ids=[job.id]), user.id
+    )
+    assert report.report_data["total_urls_crawled"] == 2
+    assert report.report_data["data_summary"]["success_rate"] == 0.5
+    db.close()
+
+def test_report_backfills_stats_for_legacy_jobs():
+    db = TestingSessionLocal()
+    user, job = create_job(db, "legacy@example.com")
+    
+    StatsService(db).delete_job_stats(job.id)
+    db.add(ExtractedData(crawl_job_id=job.id, url="https://example.com/a", data={"title": "A"}))
+    db.add(ExtractedData(crawl_job_id=job.id, url="https://example.com/b", data={}))
+    db.commit()
+    
+    report = ReportService(db).create_report(
+        ReportCreate(title="Legacy Report", crawl_job_ids=[job.id]), user.id
+    )
+    assert report.report_data["successful_extractions"] == 1
+    assert report.report_data["failed_extractions"] == 1
+    assert StatsService(db).get_job_stats(job.id) is not None
+    db.close()
+
+def test_report_cache_invalidated_by_new_results():
+    db = TestingSessionLocal()
+    user, job = create_job(db, "cache@example.com")
+    crawl_service = CrawlService(db)
+    report_service = ReportService(db)
+    result = {"url": "https://example.com/a", "data": {"title": "A"}, "error": None}
+    
+    crawl_service.store_results(job.id, [result])
+    hits = report_cache.stats()["hits"]
+    
+    first = report_service.create_report(ReportCreate(title="First", crawl_job_ids=[job.id]), user.id)
+    second = report_service.create_report(ReportCreate(title="Second", crawl_job_ids=[job.id]), user.id)
+    assert report_cache.stats()["hits"] == hits + 1
+    assert first.report_data == second.report_data
+    
+    crawl_service.store_results(job.id, [result])
+    third = report_service.create_report(ReportCreate(title="Third", crawl_job_ids=[job.id]), user.id)
+    assert third.report_data["total_urls_crawled"] == 2
+    db.close()
+
+def test_reports_of_deleted_jobs_are_not_served_from_the_cache():
+    db = TestingSessionLocal()
+    user, job = create_job(db, "evict@example.com")
+    crawl_service = CrawlService(db)
+    report_service = ReportService(db)
+    crawl_service.store_results(job.id, [{"url": "https://example.com/a", "data": {"title": "A"}, "error": None}])
+    report_service.create_report(ReportCreate(title="Before", crawl_job_ids=[job.id]), user.id)
+    
+    assert crawl_service.delete_crawl_job(job.id, user.id)
+    
+    # A new job reusing the id starts from an empty report
+    new_user, new_job = create_job(db, "evict-new@example.com")
+    assert new_job.id == job.id
+    report = report_service.create_report(ReportCreate(title="After", crawl_job_ids=[new_job.id]), new_user.id)
+    assert report.report_data["total_urls_crawled"] == 0
+    
+    # Also for the same user, whose key prefix matches the old entry
+    assert crawl_service.delete_crawl_job(new_job.id, new_user.id)
+    same_job = CrawlService(db).create_crawl_job(
+        CrawlJobCreate(name="Again", target_urls=["https://example.com/a"], extraction_rules={}), user.id
+    )
+    assert same_job.id == job.id
+    report = report_service.create_report(ReportCreate(title="Again", crawl_job_ids=[same_job.id]), user.id)
+    assert report.report_data["total_urls_crawled"] == 0
+    db.close()
+
+def test_fetch_outcomes_are_stored_and_aggregated():
+    db = TestingSessionLocal()
+    user, job = create_job(db, "outcomes@example.com")
+    
+    CrawlService(db).store_results(job.id, [
+        {"url": "https://example.com/a", "data": {"title": "A"}, "error": None, "http_status": 200,
+         "final_url": "https://example.com/a/", "content_hash": "ab" * 32, "bytes": 100, "elapsed_ms": 20,
+         "timings": {"first_byte_us": 15_000}},
+        {"url": "https://slow.example.com/b", "data": {}, "error": "HTTP 503", "error_class": "http",
+         "http_status": 503, "bytes": 0, "elapsed_ms": 900, "timings": {"first_byte_us": 890_000}},
+        {"url": "https://slow.example.com/c", "data": {}, "error": "Connection refused",
+         "error_class": "connection", "elapsed_ms": 500, "timings": {"connect_us": 500_000}},
+        # Errors the crawler didn't classify still count as failures
+        {"url": "https://example.com/d", "data": {}, "error": "boom"}
+    ])
+    
+    rows = {row.url: row for row in db.query(ExtractedData).filter(ExtractedData.crawl_job_id == job.id)}
+    assert (rows["https://example.com/a"].final_url, rows["https://example.com/a"].bytes) == ("https://example.com/a/", 100)
+    assert rows["https://slow.example.com/b"].error == "HTTP 503"
+    assert rows["https://example.com/d"].error_class == "other"
+    
+    report = ReportService(db).create_report(
+        ReportCreate(title="Outcome Report", crawl_job_ids=[job.id]), user.id
+    )
+    outcomes = report.report_data["fetch_outcomes"]
+    assert outcomes["status_codes"] == {"200": 1, "503": 1, "none": 2}
+    assert outcomes["error_classes"] == {"http": 1, "connection": 1, "other": 1}
+    assert outcomes["slowest_hosts"][0] == {
+        "host": "slow.example.com", "urls_crawled": 2, "failed": 2, "average_response_time_ms": 700.0
+    }
+    db.close()
\ No newline at end of file
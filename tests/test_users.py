@@ -0,0 +1,109 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import get_async_db, get_async_read_db, Base
+from app.core import security
+from app.core.user_cache import user_cache
+from app.services.user_service import UserService
+import asyncio
+import os
+import tempfile
+import threading
+
+# The API uses the async driver while assertions use a sync session, so
+# both engines share one database file
+db_path = os.path.join(tempfile.mkdtemp(), "test_users.db")
+engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+Base.metadata.create_all(bind=engine)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
+
+client = TestClient(app)
+
+def get_auth_headers(email):
+    client.post(
+        "/auth/signup",
+        json={"email": email, "password": "testpassword", "full_name": "Cache User"}
+    )
+    response = client.post("/auth/login", data={"username": email, "password": "testpassword"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_repeated_requests_use_cached_user():
+    headers = get_auth_headers("cached@example.com")
+    hits = user_cache.stats()["hits"]
+    
+    for _ in range(3):
+        assert client.get("/crawl-jobs/", headers=headers).status_code == 200
+    
+    assert user_cache.stats()["hits"] >= hits + 2
+
+def test_profile_update_invalidates_cached_user():
+    headers = get_auth_headers("update@example.com")
+    client.get("/crawl-jobs/", headers=headers)
+    assert user_cache.get("update@example.com") is not None
+    
+    response = client.put("/users/profile", json={"full_name": "Renamed"}, headers=headers)
+    assert response.json()["full_name"] == "Renamed"
+    assert user_cache.get("update@example.com") is None
+
+def test_deactivated_user_is_rejected_immediately():
+    headers = get_auth_headers("deactivate@example.com")
+    assert client.get("/crawl-jobs/", headers=headers).status_code == 200
+    
+    db = TestingSessionLocal()
+    user_service = UserService(db)
+    user_service.deactivate_user(user_service.get_user_by_email("deactivate@example.com").id)
+    db.close()
+    
+    assert client.get("/crawl-jobs/", headers=headers).status_code == 400
+
+def test_password_work_beyond_the_limit_is_shed(monkeypatch):
+    monkeypatch.setattr(security.settings, "password_hash_max_pending", 2)
+    release = threading.Event()
+    
+    async def scenario():
+        waiting = [asyncio.create_task(security._run_password_work(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        try:
+            await security._run_password_work(release.wait)
+        except security.PasswordHashingBusy:
+            busy = True
+        else:
+            busy = False
+        
+        # A request that stops waiting keeps its slot until the work ends
+        waiting[0].cancel()
+        await asyncio.sleep(0.05)
+        depth_after_cancel = security.get_password_queue_depth()
+        
+        release.set()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        for _ in range(100):
+            if security.get_password_queue_depth() == 0:
+                break
+            await asyncio.sleep(0.01)
+        return busy, depth_after_cancel
+    
+    busy, depth_after_cancel = asyncio.run(scenario())
+    assert busy
+    assert depth_after_cancel == 2
+    assert security.get_password_queue_depth() == 0
+
+def test_busy_password_pool_answers_503_with_retry_after(monkeypatch):
+    get_auth_headers("busy@example.com")
+    monkeypatch.setattr(security.settings, "password_hash_max_pending", 0)
+    
+    response = client.post("/auth/login", data={"username": "busy@example.com", "password": "testpassword"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
\ No newline at end of file
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.models import user, crawl_job, report, webhook
+from app.models.crawl_job import CrawlJob
+from app.models.user import User
+from app.models.webhook import WebhookDelivery
+from app.schemas.crawl_job import CrawlJobCreate
+from app.schemas.webhook import WebhookCreate
+from app.services.crawl_service import CrawlService
+from app.services.shard_service import ShardService
+from app.services.webhook_service import SIGNATURE_HEADER, WebhookSender, WebhookService, retry_delay, sign_body
+
+class Receiver:
+    """Local HTTP endpoint recording webhook requests; answers with the queued statuses, then 200"""
+    
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        receiver = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((dict(self.headers), body))
+                self.send_response(receiver.statuses.pop(0) if receiver.statuses else 200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+    
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def events(self):
+        return [event for _, body in self.requests for event in json.loads(body)["events"]]
+
+def make_session_factory():
+    db_path = os.path.join(tempfile.mkdtemp(), "test_webhooks.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+def create_owner(db, email="hooks@example.com"):
+    owner = User(email=email, hashed_password="x")
+    db.add(owner)
+    db.commit()
+    return owner
+
+def start_job(db, owner, name="Hooked"):
+    job = CrawlService(db).create_crawl_job(
+        CrawlJobCreate(name=name, target_urls=["http://example.com/"], extraction_rules={"title": "title"}),
+        owner.id
+    )
+    job.status = "running"
+    db.commit()
+    return job
+
+def send_due(session_factory):
+    sender = WebhookSender(session_factory)
+    
+    async def main():
+        async with sender.create_session() as session:
+            return await sender.send_due(session)
+    return asyncio.run(main())
+
+def test_finished_jobs_are_delivered_in_one_signed_batch():
+    session_factory = make_session_factory()
+    db = session_factory()
+    owner = create_owner(db)
+    other = create_owner(db, "other@example.com")
+    
+    with Receiver() as receiver:
+        service = WebhookService(db)
+        service.create_webhook(WebhookCreate(url=receiver.url, secret="s3cret"), owner.id)
+        service.create_webhook(WebhookCreate(url=receiver.url, events=["job.failed"]), other.id)
+        
+        jobs = [start_job(db, owner, f"Job {n}") for n in range(3)]
+        assert CrawlService(db).cancel_crawl_job(jobs[0].id, owner.id)
+        assert CrawlService(db)._finish_job(jobs[1].id, "completed") == "completed"
+        assert CrawlService(db)._finish_job(jobs[2].id, "failed") == "failed"
+        # A job that already ended queues nothing more
+        assert CrawlService(db)._finish_job(jobs[2].id, "completed") == "failed"
+        
+        assert send_due(session_factory) == 3
+        assert send_due(session_factory) == 0
+    
+    assert len(receiver.requests) == 1
+    headers, body = receiver.requests[0]
+    assert headers[SIGNATURE_HEADER] == sign_body("s3cret", body)
+    
+    events = receiver.events()
+    assert [(event["type"], event["job"]["id"]) for event in events] == [
+        ("job.cancelled", jobs[0].id), ("job.completed", jobs[1].id), ("job.failed", jobs[2].id)
+    ]
+    assert events[1]["stats"] == {
+        "total_urls": 1, "urls_crawled": 0, "successful_extractions": 0,
+        "failed_extractions": 0, "bytes_downloaded": 0
+    }
+    assert all(delivery.status == "delivered" and delivery.attempts == 1 for delivery in db.query(WebhookDelivery))
+    db.close()
+
+def test_job_webhooks_only_follow_their_job():
+    session_factory = make_session_factory()
+    db = session_factory()
+    owner = create_owner(db)
+    followed, ignored = start_job(db, owner), start_job(db, owner)
+    
+    service = WebhookService(db)
+    hook = service.create_webhook(WebhookCreate(url="http://127.0.0.1/hook", crawl_job_id=followed.id), owner.id)
+    CrawlService(db)._finish_job(ignored.id, "completed")
+    CrawlService(db)._finish_job(followed.id, "completed")
+    assert [delivery.payload["job"]["id"] for delivery in service.get_deliveries(hook.id)] == [followed.id]
+    
+    # Deleting the job takes its webhooks along
+    assert CrawlService(db).delete_crawl_job(followed.id, owner.id)
+    assert service.get_webhooks(owner.id) == []
+    assert db.query(WebhookDelivery).count() == 0
+    db.close()
+
+def test_failed_deliveries_are_retried_with_backoff(monkeypatch):
+    session_factory = make_session_factory()
+    db = session_factory()
+    owner = create_owner(db)
+    monkeypatch.setattr(settings, "webhook_retry_base_seconds", 0)
+    monkeypatch.setattr(settings, "webhook_max_attempts", 3)
+    
+    with Receiver() as receiver:
+        hook = WebhookService(db).create_webhook(WebhookCreate(url=receiver.url), owner.id)
+        job = start_job(db, owner)
+        CrawlService(db)._finish_job(job.id, "completed")
+        
+        receiver.statuses = [500]
+        assert send_due(session_factory) == 1
+        delivery = db.query(WebhookDelivery).one()
+        assert (delivery.status, delivery.attempts, delivery.last_error) == ("pending", 1, "HTTP 500")
+        
+        assert send_due(session_factory) == 1
+        db.refresh(delivery)
+        assert (delivery.status, delivery.attempts, delivery.last_error) == ("delivered", 2, None)
+        
+        # Past the last attempt a delivery is given up
+        other = start_job(db, owner)
+        CrawlService(db)._finish_job(other.id, "failed")
+        receiver.statuses = [503, 503, 503]
+        for _ in range(3):
+            assert send_due(session_factory) == 1
+        assert send_due(session_factory) == 0
+    
+    last = WebhookService(db).get_deliveries(hook.id)[0]
+    assert (last.status, last.attempts, last.last_error) == ("failed", 3, "HTTP 503")
+    assert len(receiver.requests) == 5
+    db.close()
+
+def test_unreachable_webhooks_wait_for_the_backoff():
+    session_factory = make_session_factory()
+    db = session_factory()
+    owner = create_owner(db)
+    
+    # Nothing listens on a port that was just freed
+    with Receiver() as receiver:
+        url = receiver.url
+    WebhookService(db).create_webhook(WebhookCreate(url=url), owner.id)
+    job = start_job(db, owner)
+    CrawlService(db)._finish_job(job.id, "completed")
+    
+    assert send_due(session_factory) == 1
+    delivery = db.query(WebhookDelivery).one()
+    assert delivery.status == "pending" and delivery.attempts == 1 and delivery.last_error
+    assert (delivery.next_attempt_at - delivery.created_at).total_seconds() >= retry_delay(1) - 1
+    assert send_due(session_factory) == 0
+    db.close()
+
+def test_last_shard_queues_the_job_event():
+    session_factory = make_session_factory()
+    db = session_factory()
+    owner = create_owner(db)
+    job = start_job(db, owner)
+    hook = WebhookService(db).create_webhook(WebhookCreate(url="http://127.0.0.1/hook"), owner.id)
+    
+    service = ShardService(db)
+    shard, = service.create_shards(db.query(CrawlJob).get(job.id), 10)
+    db.commit()
+    service.start_shard(shard.id)
+    assert service.finish_shard(shard.id, 1, 1) == "completed"
+    assert [delivery.event_type for delivery in WebhookService(db).get_deliveries(hook.id)] == ["job.completed"]
+    db.close()
+
+def test_webhook_validation():
+    with pytest.raises(ValidationError):
+        WebhookCreate(url="ftp://example.com/hook")
+    with pytest.raises(ValidationError):
+        WebhookCreate(url="https://example.com/hook", events=["job.started"])
+    assert WebhookCreate(url="https://example.com/hook", events=["job.failed", "job.failed"]).events == ["job.failed"]
\ No newline at end of file